@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Cross-run analytics over saved call records, session logs and system reports
+"""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+
+from src.utils.analytics import CallAnalytics
+from src.utils.config import ConfigManager
+from src.utils.helpers import save_json_data
+
+def timed(label: str, query):
+    start = time.perf_counter()
+    result = query()
+    print(f"   ⏱️  {label}: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return result
+
+def main(include_reports: bool = False):
+    config_manager = ConfigManager(str(ROOT / "config"))
+    paths = config_manager.get_paths()
+    log_dirs = [ROOT / "logs", ROOT / paths.get("call_logs", "data/output/call_logs")]
+    report_dirs = [ROOT / paths.get("reports", "data/output/reports")] if include_reports else []
+
+    start = time.perf_counter()
+    analytics = CallAnalytics.from_paths(log_dirs, report_dirs)
+    print(f"📂 Loaded {len(analytics)} calls in {time.perf_counter() - start:.2f}s")
+    if not len(analytics):
+        return
+
+    summary = timed("summary", analytics.summary)
+    by_persona = timed("success by persona", lambda: analytics.success_rates('persona'))
+    by_version = timed("success by agent version", lambda: analytics.success_rates('agent_version'))
+    matrix = timed("persona x version", analytics.persona_version_matrix)
+    objections = timed("objection frequencies", analytics.objection_frequencies)
+    rolling = timed("rolling effectiveness (50 calls)", lambda: analytics.rolling(50))
+
+    print(f"\n🎯 {summary['total_calls']} calls, success rate {summary['success_rate'] * 100:.1f}%, "
+          f"average effectiveness {summary['average_effectiveness']:.2f}, "
+          f"latest rolling effectiveness {rolling.iloc[-1]:.2f}")
+    print(f"\n👥 By persona:\n{by_persona.round(3)}")
+    print(f"\n🔢 By agent version:\n{by_version.round(3)}")
+    print(f"\n🧮 Success rate, persona x version:\n{matrix.round(2)}")
+    print(f"\n🚧 Objections:\n{objections}")
+
+    report_path = ROOT / f"data/output/reports/call_analytics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    if save_json_data(analytics.to_report(), report_path):
+        print(f"\n💾 Analytics report saved: {report_path}")
+
+if __name__ == "__main__":
+    main(include_reports="--reports" in sys.argv[1:])
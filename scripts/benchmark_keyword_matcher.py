@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled keyword matcher against per-keyword substring scans
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+
+from src.utils.keyword_matcher import HINDI_LEXICON, KeywordMatcher
+from src.utils.normalization import normalize_hindi_text
+
+def load_corpus() -> list:
+    """Farmer replies from session logs and persona response patterns"""
+    corpus = []
+    for log_path in sorted((ROOT / "logs").glob("*.json")):
+        try:
+            with open(log_path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        corpus.extend((record.get("analysis") or {}).get("farmer_responses", []))
+
+    personas_path = ROOT / "config" / "farmer_personas.json"
+    if personas_path.exists():
+        with open(personas_path, 'r', encoding='utf-8') as f:
+            personas = json.load(f)
+        for template in personas.get("persona_templates", {}).values():
+            corpus.extend(template.get("characteristics", {}).get("response_patterns", []))
+
+    return [text for text in corpus if text] or ["Haan ji, kitne paise lagenge? Samajh nahi aaya."]
+
+def substring_scan(text: str) -> dict:
+    """Previous approach: one ``kw in text`` scan per keyword per category"""
+    text_lower = text.lower()
+    return {category: [kw for kw in keywords if kw in text_lower] for category, keywords in HINDI_LEXICON.items()}
+
+def time_it(func, corpus: list, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in corpus:
+            func(text)
+    return time.perf_counter() - start
+
+def main(repeats: int = 200):
+    corpus = load_corpus()
+    matcher = KeywordMatcher()
+
+    # Sanity check: both approaches find the same keywords on normalized text (at word starts)
+    normalized_lexicon = {category: [normalize_hindi_text(kw) for kw in keywords]
+                          for category, keywords in HINDI_LEXICON.items()}
+    for text in corpus:
+        normalized = f" {normalize_hindi_text(text)}"
+        expected = {category: [kw for kw, norm in zip(HINDI_LEXICON[category], normalized_lexicon[category])
+                               if f" {norm}" in normalized] for category in HINDI_LEXICON}
+        matches = matcher.scan(text)
+        assert all(matches.keywords(category) == expected[category] for category in HINDI_LEXICON), text
+
+    scans = len(corpus) * repeats
+    results = {
+        'substring scans': time_it(substring_scan, corpus, repeats),
+        'compiled matcher': time_it(lambda text: matcher._scan(normalize_hindi_text(text)), corpus, repeats),
+        'compiled matcher (cached)': time_it(matcher.scan, corpus, repeats)
+    }
+
+    print(f"📊 {len(corpus)} texts x {repeats} repeats, {sum(map(len, HINDI_LEXICON.values()))} keywords "
+          f"in {len(HINDI_LEXICON)} categories")
+    baseline = results['substring scans']
+    for name, elapsed in results.items():
+        print(f"   {name:<28} {elapsed * 1e6 / scans:8.2f} µs/text  ({baseline / elapsed:5.2f}x)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark Hindi text normalization throughput on large transcript batches
+"""
+
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+
+from src.utils.helpers import clean_hindi_text
+from src.utils.normalization import normalize_hindi_text, transliterate_word
+
+DEVANAGARI_SAMPLES = [
+    "हाँ जी, ठीक है। कितने पैसे लगेंगे?",
+    "समझ नहीं आया, आप सरकार से हो क्या?",
+    "अच्छा, ज़रूर बताइए। प्रोसेस क्या है?",
+    "नहीं चाहिए, बाद में कॉल करना।",
+    "राम कुमार बोल रहा हूँ, मेरे पास पाँच एकड़ ज़मीन है।"
+]
+
+def load_replies() -> list:
+    """Romanized farmer replies from session logs plus Devanagari samples"""
+    replies = list(DEVANAGARI_SAMPLES)
+    for log_path in sorted((ROOT / "logs").glob("*.json")):
+        try:
+            with open(log_path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        replies.extend((record.get("analysis") or {}).get("farmer_responses", []))
+    return [reply for reply in replies if reply]
+
+def build_batch(replies: list, transcripts: int, turns: int, seed: int = 7) -> list:
+    """Synthetic transcripts with a small random suffix so most are unique"""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(replies) for _ in range(turns)) + f" {rng.randint(0, 10**6)}"
+            for _ in range(transcripts)]
+
+def run(name: str, func, batch: list):
+    start = time.perf_counter()
+    for text in batch:
+        func(text)
+    elapsed = time.perf_counter() - start
+    megabytes = sum(len(text.encode('utf-8')) for text in batch) / 1e6
+    print(f"   {name:<34} {len(batch) / elapsed:10,.0f} transcripts/s  {megabytes / elapsed:6.1f} MB/s")
+
+def main(transcripts: int = 20000, turns: int = 5):
+    replies = load_replies()
+    batch = build_batch(replies, transcripts, turns)
+    print(f"📊 {transcripts:,} transcripts x {turns} turns from {len(replies)} distinct replies")
+
+    run("clean_hindi_text (display)", clean_hindi_text, batch)
+
+    normalize_hindi_text.cache_clear()
+    transliterate_word.cache_clear()
+    run("normalize_hindi_text (cold)", normalize_hindi_text.__wrapped__, batch)
+    run("normalize_hindi_text (word cache)", normalize_hindi_text.__wrapped__, batch)
+    run("normalize_hindi_text (text cache)", normalize_hindi_text, batch[:10000])
+    run("normalize_hindi_text (text cache hit)", normalize_hindi_text, batch[:10000])
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Rank candidate agent prompts offline by replaying logged calls
+
+Candidates are the final prompts of saved system reports, plus any prompts
+in a JSON file given with --candidates (a list of AgentPrompt-like objects).
+The baseline is the initial prompt from config/prompts.json.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+# Add project root to path
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+
+from src.components.replay_evaluator import ReplayEvaluator
+from src.models.data_models import AgentPrompt
+from src.utils.config import ConfigManager
+from src.utils.helpers import load_json_data, save_json_data
+from src.utils.intent_router import IntentRouter
+
+def to_prompt(data: Dict, version: int) -> AgentPrompt:
+    return AgentPrompt(
+        intro=data["intro"],
+        benefits=list(data.get("benefits", [])),
+        call_to_action=data["call_to_action"],
+        version=data.get("version", version),
+        improvements=list(data.get("improvements") or data.get("improvements_made") or []),
+        tone_instructions=data.get("tone_instructions", "Speak politely and clearly, use simple Hindi"),
+        conversation_style=data.get("conversation_style", "Friendly but professional")
+    )
+
+def load_candidates(reports_dir: Path, candidates_path: str = None) -> List[AgentPrompt]:
+    candidates = []
+    for report_path in sorted(reports_dir.glob("system_report_*.json")):
+        report = load_json_data(report_path) or {}
+        if report.get("final_agent_prompt"):
+            version = report.get("summary", {}).get("final_agent_version", len(candidates) + 2)
+            candidates.append(to_prompt(report["final_agent_prompt"], version))
+
+    if candidates_path:
+        for data in load_json_data(candidates_path) or []:
+            candidates.append(to_prompt(data, len(candidates) + 2))
+    return candidates
+
+def main(candidates_path: str = None):
+    config_manager = ConfigManager(str(ROOT / "config"))
+    replay_config = config_manager.get_simulation_config().get("replay_evaluation", {})
+    replay_config = {**replay_config,
+                     "log_dirs": [str(ROOT / log_dir) for log_dir in replay_config.get("log_dirs", ["logs"])]}
+
+    baseline = to_prompt(config_manager.prompts["initial_agent_prompt"], 1)
+    reports_dir = ROOT / config_manager.get_paths().get("reports", "data/output/reports")
+    candidates = load_candidates(reports_dir, candidates_path)
+    if not candidates:
+        print("📭 No candidate prompts found (no saved reports and no --candidates file)")
+        return
+
+    evaluator = ReplayEvaluator.from_sources(
+        config_manager.farmer_personas, IntentRouter.from_prompts(config_manager.prompts), replay_config,
+        termination_config=config_manager.get_analysis_config().get("early_termination")
+    )
+    report = evaluator.evaluate(candidates, baseline)
+    if not report['candidates']:
+        print("📭 No logged calls to replay")
+        return
+
+    print(f"\n🔁 Replayed {report['episodes']} logged calls "
+          f"(effective sample size {report['effective_sample_size']:.1f})")
+    print(f"📏 Baseline v{baseline.version}: expected effectiveness {report['baseline']['expected_effectiveness']:.3f}")
+    for rank, row in enumerate(report['candidates'], 1):
+        low, high = row['change_interval']
+        print(f"   {rank}. v{row['version']}: {row['expected_effectiveness']:.3f} "
+              f"({row['effectiveness_change']:+.3f}, CI [{low:+.3f}, {high:+.3f}]), "
+              f"success rate {row['success_rate'] * 100:.0f}%")
+
+    report_path = ROOT / f"data/output/reports/prompt_replay_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    if save_json_data({**report, 'stats': evaluator.get_stats()}, report_path):
+        print(f"\n💾 Replay report saved: {report_path}")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(args[args.index("--candidates") + 1] if "--candidates" in args[:-1] else None)
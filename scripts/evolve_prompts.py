@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Evolutionary prompt search on simulated calls
+
+Evolves the initial agent prompt on all cores and prints the Pareto front of
+simulated effectiveness versus opening length. Pass --resume to continue
+from the latest checkpoint.
+"""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+
+from src.components.prompt_evolution import PromptEvolution, prompt_from_dict
+from src.utils.config import ConfigManager
+from src.utils.helpers import save_json_data
+
+def main(resume: bool = False):
+    config_manager = ConfigManager(str(ROOT / "config"))
+    evolution_config = config_manager.get_simulation_config().get("evolution", {})
+    evolution_config = {**evolution_config,
+                        "checkpoint_dir": str(ROOT / evolution_config.get("checkpoint_dir", "data/output/evolution"))}
+
+    initial = config_manager.prompts["initial_agent_prompt"]
+    seed_prompt = prompt_from_dict({key: initial[key] for key in
+                                    ("version", "intro", "benefits", "call_to_action",
+                                     "tone_instructions", "conversation_style")})
+    personas = {name: template["characteristics"]
+                for name, template in config_manager.farmer_personas.get("persona_templates", {}).items()}
+
+    search = PromptEvolution([seed_prompt], config_manager.prompts.get("improvement_templates", {}),
+                             personas, evolution_config)
+    if resume and not search.restore():
+        print("📭 No checkpoint found, starting a new search")
+
+    start = time.perf_counter()
+    front = search.run()
+    stats = search.get_stats()
+    print(f"\n🧬 {stats['generations']} generations, {stats['evaluations']} prompts simulated "
+          f"in {time.perf_counter() - start:.1f}s ({stats['fitness_cache_hits']} cache hits)")
+
+    print(f"\n🏆 Pareto front (effectiveness vs. opening words):")
+    for row in front:
+        print(f"   v{row['prompt']['version']}: {row['effectiveness']:.3f} effectiveness, "
+              f"{row['opening_words']} words, success rate {row['success_rate'] * 100:.1f}%")
+
+    report_path = ROOT / f"data/output/reports/prompt_evolution_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    if save_json_data({'pareto_front': front, 'stats': stats}, report_path):
+        print(f"\n💾 Pareto front saved: {report_path}")
+
+if __name__ == "__main__":
+    main(resume="--resume" in sys.argv[1:])
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Re-analyze saved call records in bulk (e.g. after the objection taxonomy changes)
+"""
+
+import asyncio
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+
+from src.components.call_analyzer import CallAnalyzer
+from src.utils.config import ConfigManager
+from src.utils.helpers import load_json_data, save_json_data, to_serializable
+from src.utils.analysis_store import AnalysisMemoStore
+from src.utils.llm_cache import LLMResponseCache
+
+def load_conversations(log_dir: Path) -> list:
+    """(call_id, agent_messages, farmer_responses) from saved call records"""
+    conversations = []
+    for log_path in sorted(log_dir.glob("*.json")):
+        record = load_json_data(log_path)
+        turns = record.get("conversation_turns") if isinstance(record, dict) else None
+        if turns:
+            conversations.append((
+                record.get("call_id", log_path.stem),
+                [turn.get("agent_message", "") for turn in turns],
+                [turn.get("farmer_response", "") for turn in turns]
+            ))
+    return conversations
+
+async def main():
+    config_manager = ConfigManager(str(ROOT / "config"))
+    api_config = config_manager.get_api_config()
+    cache_config = config_manager.get_cache_config().get("llm_responses", {})
+    memo_config = config_manager.get_cache_config().get("analysis_memo", {})
+
+    analyzer = CallAnalyzer(
+        openai_api_key=api_config.get("openai", {}).get("api_key"),
+        config=api_config,
+        credential_pool=config_manager.get_credential_pools().get("openai"),
+        response_cache=LLMResponseCache(cache_config) if cache_config.get("components", {}).get("call_analyzer") else None,
+        batch_config=config_manager.get_analysis_config().get("batch"),
+        memo_store=AnalysisMemoStore(memo_config) if memo_config.get("enabled") else None
+    )
+
+    log_dir = ROOT / config_manager.get_paths().get("call_logs", "data/output/call_logs")
+    conversations = load_conversations(log_dir)
+    print(f"🔁 Re-analyzing {len(conversations)} saved calls from {log_dir}")
+
+    analyses = await analyzer.analyze_conversations([(agent, farmer) for _, agent, farmer in conversations])
+
+    objections = Counter(objection for analysis in analyses for objection in analysis.objections)
+    report = {
+        "reanalyzed_at": datetime.now().isoformat(),
+        "total_calls": len(analyses),
+        "objection_counts": dict(objections.most_common()),
+        "batch_analysis": analyzer.get_performance_stats().get("batch_analysis"),
+        "analysis_memo": analyzer.get_performance_stats().get("analysis_memo"),
+        "calls": {call_id: to_serializable(analysis) for (call_id, _, _), analysis in zip(conversations, analyses)}
+    }
+
+    report_path = ROOT / f"data/output/reports/reanalysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    if save_json_data(report, report_path):
+        print(f"💾 Re-analysis report saved: {report_path}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
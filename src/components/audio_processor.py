@@ -1,27 +1,41 @@
 import asyncio
 import aiohttp
 import aiofiles
+import hashlib
+import json
 import os
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from deepgram import Deepgram
 import logging
 
+from ..utils.credentials import CredentialPool
 from ..utils.helpers import generate_audio_filename, PerformanceTracker
+from ..utils.hedging import RequestHedger
 
 class AudioProcessor:
     """Handles audio processing with Deepgram and ElevenLabs"""
     
-    def __init__(self, deepgram_key: str, elevenlabs_key: str, config: Dict):
+    def __init__(self, deepgram_key: str, elevenlabs_key: str, config: Dict,
+                 credential_pools: Optional[Dict[str, CredentialPool]] = None):
         self.deepgram_key = deepgram_key
         self.elevenlabs_key = elevenlabs_key
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.performance_tracker = PerformanceTracker()
         
+        # Load-balanced key pools (single-key pools when none are supplied)
+        credential_pools = credential_pools or {}
+        self.deepgram_pool = credential_pools.get("deepgram") or CredentialPool(
+            "deepgram", [deepgram_key] if deepgram_key else [])
+        self.elevenlabs_pool = credential_pools.get("elevenlabs") or CredentialPool(
+            "elevenlabs", [elevenlabs_key] if elevenlabs_key else [])
+        self._deepgram_clients = {}
+        
         # Initialize Deepgram
         if deepgram_key:
             self.deepgram = Deepgram(deepgram_key)
+            self._deepgram_clients[deepgram_key] = self.deepgram
         else:
             self.deepgram = None
             self.logger.warning("Deepgram API key not provided - using mock mode")
@@ -29,6 +43,10 @@ class AudioProcessor:
         # ElevenLabs settings
         self.elevenlabs_voice_id = config.get("elevenlabs", {}).get("voice_id", "pNInz6obpgDQGcFmaJgB")
         self.voice_settings = config.get("elevenlabs", {}).get("voice_settings", {})
+        self.tts_model_id = config.get("elevenlabs", {}).get("model_id", "eleven_multilingual_v2")
+        
+        # Optional request hedging for TTS tail latency
+        self.tts_hedger = RequestHedger(config.get("elevenlabs", {}).get("hedging", {}))
         
     async def text_to_speech(self, text: str, output_path: str) -> Optional[str]:
         """Convert text to speech using ElevenLabs"""
@@ -40,13 +58,39 @@ class AudioProcessor:
         
         headers = {
             "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": self.elevenlabs_key
+            "Content-Type": "application/json"
         }
         
-        data = {
-            "text": text,
-            "model_id": self.config.get("elevenlabs", {}).get("model_id", "eleven_multilingual_v2"),
+        data = {"text": text, **self._tts_voice()}
+        
+        try:
+            audio_content = await self.tts_hedger.run(
+                lambda: self._request_tts_audio(url, data, headers)
+            )
+            
+            if audio_content is None:
+                self.performance_tracker.record_api_call("elevenlabs", False)
+                return None
+            
+            # Ensure output directory exists
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            
+            async with aiofiles.open(output_path, 'wb') as f:
+                await f.write(audio_content)
+            
+            self.performance_tracker.record_api_call("elevenlabs", True)
+            self.logger.info(f"🎵 Generated audio: {output_path}")
+            return output_path
+                        
+        except Exception as e:
+            self.logger.error(f"Text-to-speech error: {e}")
+            self.performance_tracker.record_api_call("elevenlabs", False)
+            return None
+    
+    def _tts_voice(self) -> Dict:
+        """Model and voice settings of ElevenLabs requests"""
+        return {
+            "model_id": self.tts_model_id,
             "voice_settings": {
                 "stability": self.voice_settings.get("stability", 0.5),
                 "similarity_boost": self.voice_settings.get("similarity_boost", 0.5),
@@ -54,32 +98,33 @@ class AudioProcessor:
                 "use_speaker_boost": self.voice_settings.get("use_speaker_boost", True)
             }
         }
-        
-        try:
+    
+    def tts_fingerprint(self) -> str:
+        """Short hash of everything besides the text that shapes synthesized audio (provider, voice, model, settings)"""
+        voice = {"provider": "elevenlabs" if self.elevenlabs_key else "mock",
+                 "voice_id": self.elevenlabs_voice_id, **self._tts_voice()}
+        return hashlib.sha256(json.dumps(voice, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    
+    async def _request_tts_audio(self, url: str, data: Dict, headers: Dict) -> Optional[bytes]:
+        """Issue a single ElevenLabs request and return the audio bytes"""
+        with self.elevenlabs_pool.lease() as lease:
+            headers = {**headers, "xi-api-key": lease.key}
+            
             async with aiohttp.ClientSession() as session:
                 async with session.post(url, json=data, headers=headers) as response:
+                    lease.mark_status(response.status)
                     if response.status == 200:
-                        audio_content = await response.read()
-                        
-                        # Ensure output directory exists
-                        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-                        
-                        async with aiofiles.open(output_path, 'wb') as f:
-                            await f.write(audio_content)
-                        
-                        self.performance_tracker.record_api_call("elevenlabs", True)
-                        self.logger.info(f"🎵 Generated audio: {output_path}")
-                        return output_path
-                    else:
-                        error_text = await response.text()
-                        self.logger.error(f"ElevenLabs error {response.status}: {error_text}")
-                        self.performance_tracker.record_api_call("elevenlabs", False)
-                        return None
-                        
-        except Exception as e:
-            self.logger.error(f"Text-to-speech error: {e}")
-            self.performance_tracker.record_api_call("elevenlabs", False)
-            return None
+                        return await response.read()
+                    
+                    error_text = await response.text()
+                    self.logger.error(f"ElevenLabs error {response.status}: {error_text}")
+                    return None
+    
+    def _get_deepgram_client(self, api_key: str) -> Deepgram:
+        """Get (or create) the Deepgram client for a pooled key"""
+        if api_key not in self._deepgram_clients:
+            self._deepgram_clients[api_key] = Deepgram(api_key)
+        return self._deepgram_clients[api_key]
     
     async def _mock_text_to_speech(self, text: str, output_path: str) -> str:
         """Mock TTS for demo mode"""
@@ -114,7 +159,9 @@ class AudioProcessor:
                     'utterances': True
                 }
                 
-                response = await self.deepgram.transcription.prerecorded(source, options)
+                with self.deepgram_pool.lease() as lease:
+                    deepgram = self._get_deepgram_client(lease.key)
+                    response = await deepgram.transcription.prerecorded(source, options)
                 
                 # Extract transcript and speaker information
                 full_transcript = response['results']['channels'][0]['alternatives'][0]['transcript']
@@ -182,4 +229,6 @@ class AudioProcessor:
     
     def get_performance_stats(self) -> Dict:
         """Get audio processing performance statistics"""
-        return self.performance_tracker.get_summary()
\ No newline at end of file
+        stats = self.performance_tracker.get_summary()
+        stats['tts_hedging'] = self.tts_hedger.get_stats()
+        return stats
\ No newline at end of file
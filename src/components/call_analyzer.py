@@ -1,60 +1,311 @@
 import asyncio
+import hashlib
 import json
-import re
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Type
 import openai
 import logging
 
-from ..models.data_models import CallAnalysis, SentimentType, InterestLevel, CallOutcome
-from ..utils.helpers import extract_keywords, calculate_effectiveness_score, PerformanceTracker
+from pydantic import BaseModel, ValidationError
+
+from ..models.data_models import (
+    CallAnalysis, CallAnalysisBatchAPI, CallAnalysisLabels, SentimentType, InterestLevel, CallOutcome
+)
+from ..utils.context_manager import ConversationContextManager
+from ..utils.credentials import CredentialPool
+from ..utils.llm_cache import LLMResponseCache
+from ..utils.analysis_store import AnalysisMemoStore
+from ..utils.helpers import calculate_effectiveness_score, scoring_version, PerformanceTracker
+from ..utils.keyword_matcher import get_keyword_matcher
+from ..utils.structured_output import (
+    DEFAULT_STRUCTURED_OUTPUT_CONFIG, StructuredOutputParser, function_spec, model_schema, model_to_dict,
+    parse_with_retries, read_completion, validate_model
+)
+from .call_classifier import LocalCallClassifier
+from .turn_analyzer import rule_based_labels
+
+# JSON keys requested from the LLM for every analyzed call
+ANALYSIS_JSON_SCHEMA = """{
+            "sentiment": "positive|neutral|negative",
+            "interest_level": "high|medium|low|confused", 
+            "intro_clarity": true/false,
+            "objections": ["list", "of", "objections"],
+            "call_outcome": "success|failure|follow_up",
+            "conversation_flow": {
+                "farmer_engagement": "high|medium|low",
+                "question_quality": "good|average|poor",
+                "understanding_level": "clear|partial|confused"
+            },
+            "emotional_indicators": ["list", "of", "emotions", "detected"]
+        }"""
+
+ANALYSIS_GUIDELINES = '''Consider:
+        - Farmer's Hindi responses and tone
+        - Questions asked by farmer about cost, process, eligibility
+        - Level of engagement and interest shown
+        - Any objections or concerns raised
+        - Overall conversation flow and outcome
+        - Trust and skepticism indicators
+        - Understanding of the solar scheme concept
+
+        Objection categories: "cost_concern", "trust_issues", "technical_confusion", "time_constraints", "eligibility_doubt", "process_complexity"
+        Emotional indicators: "skeptical", "confused", "interested", "excited", "worried", "trusting", "engaged"'''
+
+# Bump when analysis logic changes in ways the lexicon, scoring and prompt hashes don't capture
+ANALYZER_VERSION = "2"
+
+# Packing limits for analyze_conversations
+DEFAULT_BATCH_CONFIG = {
+    'max_concurrency': 4,  # Concurrent LLM requests
+    'pack_size': 5,  # Max transcripts per packed request
+    'max_transcript_tokens': 400,  # Longer transcripts are analyzed alone
+    'max_pack_tokens': 1600,  # Transcript tokens per packed request
+    'completion_tokens_per_call': 300
+}
 
 class CallAnalyzer:
     """Enhanced analyzer with LLM-based conversation analysis"""
     
-    def __init__(self, openai_api_key: str, config: Dict):
+    def __init__(self, openai_api_key: str, config: Dict,
+                 credential_pool: Optional[CredentialPool] = None,
+                 response_cache: Optional[LLMResponseCache] = None,
+                 context_manager: Optional[ConversationContextManager] = None,
+                 local_classifier: Optional[LocalCallClassifier] = None,
+                 batch_config: Optional[Dict] = None,
+                 memo_store: Optional[AnalysisMemoStore] = None):
         self.openai_api_key = openai_api_key
         self.config = config
+        self.batch_config = {**DEFAULT_BATCH_CONFIG, **(batch_config or {})}
+        self.structured_config = {**DEFAULT_STRUCTURED_OUTPUT_CONFIG,
+                                  **config.get("openai", {}).get("structured_output", {})}
+        self.output_parser = StructuredOutputParser()
+        self.response_cache = response_cache
+        self.local_classifier = local_classifier
+        self.context_manager = context_manager or ConversationContextManager()
         self.logger = logging.getLogger(__name__)
         self.performance_tracker = PerformanceTracker()
         
-        if openai_api_key:
-            openai.api_key = openai_api_key
-        else:
+        # Keys are passed per request so several keys can share the load
+        self.credential_pool = credential_pool or CredentialPool("openai", [openai_api_key] if openai_api_key else [])
+        if not openai_api_key:
             self.logger.warning("OpenAI API key not provided - using rule-based analysis")
         
-        # Hindi keywords for rule-based analysis
-        self.hindi_keywords = {
-            'positive': ['haan', 'achha', 'theek', 'zaroor', 'batayiye', 'details', 'chahiye', 'interested'],
-            'negative': ['nahi', 'mat', 'band', 'pareshan', 'time nahi', 'dhokha', 'problem'],
-            'neutral': ['dekhunga', 'sochenge', 'pata nahi', 'maybe', 'shayad'],
-            'confused': ['samajh nahi', 'kya bol rahe', 'ye kya', 'kaise', 'simple mein'],
-            'interested': ['details', 'batao', 'kaise milega', 'process kya', 'zaroor', 'interested'],
-            'objections': ['kitne ka', 'free mein', 'paisa', 'eligible', 'documents', 'process']
+        # Shared lexicon, compiled once and scanned in a single pass
+        self.keyword_matcher = get_keyword_matcher()
+        
+        # Memoized analyses are keyed by transcript and this version
+        self.memo_store = memo_store
+        self.analysis_version = self._compute_analysis_version()
+        
+        self.batch_metrics = {
+            'batches': 0,
+            'conversations': 0,
+            'packed_requests': 0,
+            'packed_conversations': 0,
+            'single_requests': 0,
+            'pack_fallbacks': 0
         }
     
     async def analyze_conversation(self, agent_messages: List[str], 
                                  farmer_responses: List[str]) -> CallAnalysis:
         """Analyze conversation using LLM and rule-based methods"""
         
+        # Identical transcripts (replays, re-runs, duplicate mocks) reuse the memoized analysis
+        memo_key, memoized = self._memo_lookup(agent_messages, farmer_responses)
+        if memoized is not None:
+            return self._build_call_analysis(memoized, farmer_responses)
+        
         # Combine conversation for analysis
         conversation_text = self._format_conversation(agent_messages, farmer_responses)
         
-        if self.openai_api_key:
+        # Local classifier cascade: confident predictions skip the LLM call
+        local_prediction, use_local = self._local_decision(farmer_responses)
+        
+        if use_local:
+            final_analysis = self._local_analysis(farmer_responses, local_prediction)
+        elif self.openai_api_key:
             # Get LLM analysis
             try:
                 llm_analysis = await self._get_llm_analysis(conversation_text)
-                # Combine with rule-based analysis for validation
-                rule_analysis = self._rule_based_analysis(farmer_responses)
-                
-                # Merge analyses (prefer LLM but validate with rules)
-                final_analysis = self._merge_analyses(llm_analysis, rule_analysis)
+                final_analysis = self._combine_llm_analysis(farmer_responses, llm_analysis, local_prediction)
             except Exception as e:
                 self.logger.error(f"LLM analysis failed: {e}, falling back to rule-based")
                 final_analysis = self._rule_based_analysis(farmer_responses)
+                memo_key = None  # Transient fallback, analyze again next time
         else:
             # Use only rule-based analysis
             final_analysis = self._rule_based_analysis(farmer_responses)
         
+        self._memo_store(memo_key, final_analysis)
+        return self._build_call_analysis(final_analysis, farmer_responses)
+    
+    async def analyze_conversations(self, conversations: List[Tuple[List[str], List[str]]]) -> List[CallAnalysis]:
+        """Analyze many (agent_messages, farmer_responses) conversations
+        
+        LLM requests run with bounded concurrency. Short transcripts are packed
+        several per request with per-call JSON results keyed by call id; calls
+        missing from a packed reply, or a failed pack, fall back to per-call
+        requests. Results are returned in input order.
+        """
+        self.batch_metrics['batches'] += 1
+        self.batch_metrics['conversations'] += len(conversations)
+        
+        results: List[Optional[CallAnalysis]] = [None] * len(conversations)
+        pending = []  # (index, conversation_text, local_prediction)
+        
+        memo_keys: List[Optional[str]] = [None] * len(conversations)
+        
+        def finish(index: int, final_analysis: Dict):
+            self._memo_store(memo_keys[index], final_analysis)
+            results[index] = self._build_call_analysis(final_analysis, conversations[index][1])
+        
+        for index, (agent_messages, farmer_responses) in enumerate(conversations):
+            memo_keys[index], memoized = self._memo_lookup(agent_messages, farmer_responses)
+            if memoized is not None:
+                results[index] = self._build_call_analysis(memoized, farmer_responses)
+                continue
+            
+            local_prediction, use_local = self._local_decision(farmer_responses)
+            if use_local:
+                finish(index, self._local_analysis(farmer_responses, local_prediction))
+            elif not self.openai_api_key:
+                finish(index, self._rule_based_analysis(farmer_responses))
+            else:
+                pending.append((index, self._format_conversation(agent_messages, farmer_responses), local_prediction))
+        
+        semaphore = asyncio.Semaphore(self.batch_config['max_concurrency'])
+        
+        async def analyze_single(index: int, conversation_text: str, local_prediction: Dict):
+            farmer_responses = conversations[index][1]
+            async with semaphore:
+                self.batch_metrics['single_requests'] += 1
+                try:
+                    llm_analysis = await self._get_llm_analysis(conversation_text)
+                    final_analysis = self._combine_llm_analysis(farmer_responses, llm_analysis, local_prediction)
+                except Exception as e:
+                    self.logger.error(f"LLM analysis failed: {e}, falling back to rule-based")
+                    final_analysis = self._rule_based_analysis(farmer_responses)
+                    memo_keys[index] = None  # Transient fallback, analyze again next time
+            finish(index, final_analysis)
+        
+        async def analyze_pack(pack: List[Tuple[int, str, Dict]]):
+            if len(pack) == 1:
+                await analyze_single(*pack[0])
+                return
+            
+            async with semaphore:
+                try:
+                    packed = await self._get_packed_llm_analysis([text for _, text, _ in pack])
+                except Exception as e:
+                    self.logger.warning(f"Packed analysis of {len(pack)} calls failed: {e}, analyzing individually")
+                    packed = [None] * len(pack)
+            
+            retry = []
+            for (index, conversation_text, local_prediction), llm_analysis in zip(pack, packed):
+                if llm_analysis is None:
+                    retry.append((index, conversation_text, local_prediction))
+                    continue
+                farmer_responses = conversations[index][1]
+                finish(index, self._combine_llm_analysis(farmer_responses, llm_analysis, local_prediction))
+            
+            self.batch_metrics['pack_fallbacks'] += len(retry)
+            await asyncio.gather(*(analyze_single(*item) for item in retry))
+        
+        await asyncio.gather(*(analyze_pack(pack) for pack in self._pack_conversations(pending)))
+        self.logger.info(f"🧠 Batch analysis completed for {len(conversations)} conversations")
+        return results
+    
+    def _compute_analysis_version(self) -> str:
+        """Hash of everything an analysis depends on besides the transcript
+        
+        Covers the keyword lexicon, effectiveness scoring, prompt templates and
+        output schema, and whether the LLM or only the rules are used. Local
+        classifier decisions are never memoized (see _memo_store).
+        """
+        mode = self.config.get("openai", {}).get("model", "gpt-4") if self.openai_api_key else "rules"
+        payload = json.dumps({
+            'analyzer': ANALYZER_VERSION,
+            'lexicon': self.keyword_matcher.version,
+            'scoring': scoring_version(),
+            'prompts': [self._analysis_prompt("{conversation}"),
+                        self._packed_analysis_prompt(["{conversation}", "{conversation}"])],
+            'schema': model_schema(CallAnalysisLabels),
+            'mode': mode
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def _memo_lookup(self, agent_messages: List[str], farmer_responses: List[str]) -> Tuple[Optional[str], Optional[Dict]]:
+        """Memo key and memoized analysis for a transcript (None, None without a store)"""
+        if not self.memo_store:
+            return None, None
+        key = self.memo_store.make_key(agent_messages, farmer_responses, self.analysis_version)
+        memoized = self.memo_store.get(key)
+        if memoized is not None:
+            self.logger.info("💾 Memoized conversation analysis reused")
+        return key, memoized
+    
+    def _memo_store(self, key: Optional[str], final_analysis: Dict):
+        """Memoize an analysis, except local classifier decisions
+        
+        The local model retrains as LLM labels arrive, so its decisions are
+        not a function of the transcript and analysis version alone.
+        """
+        if key is not None and final_analysis.get('source') != 'local':
+            self.memo_store.put(key, self.analysis_version, final_analysis)
+    
+    def _pack_conversations(self, pending: List[Tuple[int, str, Dict]]) -> List[List[Tuple[int, str, Dict]]]:
+        """Greedily group short transcripts into packs within the size and token limits"""
+        packs, current, current_tokens = [], [], 0
+        
+        for item in pending:
+            tokens = self.context_manager.count_tokens(item[1])
+            if tokens > self.batch_config['max_transcript_tokens'] or self.batch_config['pack_size'] <= 1:
+                packs.append([item])
+                continue
+            if current and (len(current) >= self.batch_config['pack_size'] or
+                            current_tokens + tokens > self.batch_config['max_pack_tokens']):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(item)
+            current_tokens += tokens
+        
+        if current:
+            packs.append(current)
+        return packs
+    
+    def _local_decision(self, farmer_responses: List[str]) -> Tuple[Dict, bool]:
+        """Run the local classifier and decide whether its prediction replaces the LLM"""
+        if not (self.openai_api_key and self.local_classifier):
+            return {}, False
+        
+        local_prediction, local_confidence = self.local_classifier.predict(farmer_responses)
+        use_local = self.local_classifier.should_use_local(local_confidence)
+        if use_local:
+            self.logger.info(f"🧮 Local classifier analysis used (confidence {local_confidence:.2f})")
+        return local_prediction, use_local
+    
+    def _local_analysis(self, farmer_responses: List[str], local_prediction: Dict) -> Dict:
+        """Complete a local prediction with the rule-based fields"""
+        rule_analysis = self._rule_based_analysis(farmer_responses)
+        return {**self._merge_analyses({**rule_analysis, **local_prediction}, rule_analysis), 'source': 'local'}
+    
+    def _combine_llm_analysis(self, farmer_responses: List[str], llm_analysis: Dict,
+                              local_prediction: Dict) -> Dict:
+        """Validate an LLM analysis with rules and feed it back to the local classifier"""
+        # Combine with rule-based analysis for validation
+        rule_analysis = self._rule_based_analysis(farmer_responses)
+        
+        # Merge analyses (prefer LLM but validate with rules)
+        final_analysis = {**self._merge_analyses(llm_analysis, rule_analysis), 'source': 'llm'}
+        
+        # LLM labels train the local classifier (retrained off the event loop) and measure its agreement
+        if self.local_classifier:
+            self.local_classifier.record_agreement(local_prediction, llm_analysis)
+            self.local_classifier.add_example(farmer_responses, llm_analysis)
+            self.local_classifier.schedule_refit()
+        return final_analysis
+    
+    def _build_call_analysis(self, final_analysis: Dict, farmer_responses: List[str]) -> CallAnalysis:
+        """Score an analysis dict and convert it to a CallAnalysis"""
         # Calculate effectiveness score
         effectiveness = calculate_effectiveness_score(
             final_analysis['sentiment'],
@@ -73,169 +324,187 @@ class CallAnalyzer:
             farmer_responses=farmer_responses,
             agent_effectiveness=effectiveness,
             conversation_flow=final_analysis.get('conversation_flow', {}),
-            emotional_indicators=final_analysis.get('emotional_indicators', [])
+            emotional_indicators=final_analysis.get('emotional_indicators', []),
+            source=final_analysis.get('source')
         )
     
     def _format_conversation(self, agent_messages: List[str], farmer_responses: List[str]) -> str:
-        """Format conversation for LLM analysis"""
-        conversation_text = ""
+        """Format conversation for LLM analysis (older turns summarized to fit the token budget)"""
+        messages = [message for turn in zip(agent_messages, farmer_responses) for message in turn]
+        summary, recent_messages, first_kept = self.context_manager.fit(messages, "call_analyzer")
         
-        for i, (agent_msg, farmer_msg) in enumerate(zip(agent_messages, farmer_responses)):
-            conversation_text += f"Agent {i+1}: {agent_msg}\nFarmer {i+1}: {farmer_msg}\n\n"
+        conversation_text = f"{summary}\n\n" if summary else ""
+        first_turn = first_kept // 2
+        
+        for i in range(0, len(recent_messages) - 1, 2):
+            turn = first_turn + i // 2 + 1
+            conversation_text += f"Agent {turn}: {recent_messages[i]}\nFarmer {turn}: {recent_messages[i + 1]}\n\n"
         
         return conversation_text
     
-    async def _get_llm_analysis(self, conversation_text: str) -> Dict:
-        """Use LLM to analyze conversation"""
-        
-        analysis_prompt = f"""
+    @staticmethod
+    def _analysis_prompt(conversation_text: str) -> str:
+        return f"""
         Analyze this conversation between a solar scheme agent and a farmer. Provide analysis in JSON format:
 
         CONVERSATION:
         {conversation_text}
 
         Analyze and provide JSON with these exact keys:
-        {{
-            "sentiment": "positive|neutral|negative",
-            "interest_level": "high|medium|low|confused", 
-            "intro_clarity": true/false,
-            "objections": ["list", "of", "objections"],
-            "call_outcome": "success|failure|follow_up",
-            "conversation_flow": {{
-                "farmer_engagement": "high|medium|low",
-                "question_quality": "good|average|poor",
-                "understanding_level": "clear|partial|confused"
-            }},
-            "emotional_indicators": ["list", "of", "emotions", "detected"]
-        }}
-
-        Consider:
-        - Farmer's Hindi responses and tone
-        - Questions asked by farmer about cost, process, eligibility
-        - Level of engagement and interest shown
-        - Any objections or concerns raised
-        - Overall conversation flow and outcome
-        - Trust and skepticism indicators
-        - Understanding of the solar scheme concept
+        {ANALYSIS_JSON_SCHEMA}
 
-        Objection categories: "cost_concern", "trust_issues", "technical_confusion", "time_constraints", "eligibility_doubt", "process_complexity"
-        Emotional indicators: "skeptical", "confused", "interested", "excited", "worried", "trusting", "engaged"
+        {ANALYSIS_GUIDELINES}
         """
+    
+    async def _get_llm_analysis(self, conversation_text: str) -> Dict:
+        """Use LLM to analyze conversation"""
+        
+        model = self.config.get("openai", {}).get("model", "gpt-4")
+        messages = [{"role": "user", "content": self._analysis_prompt(conversation_text)}]
+        params = {
+            "max_tokens": self.config.get("openai", {}).get("max_tokens", 500),
+            "temperature": 0.3,
+            **self._function_params("record_call_analysis", "Record the analysis of one call", CallAnalysisLabels)
+        }
+        
+        async def complete(request_messages: List[Dict]) -> Tuple[str, Optional[Dict]]:
+            return await self._chat_completion(model, request_messages, params, "call_analyzer")
         
         try:
-            response = await openai.ChatCompletion.acreate(
-                model=self.config.get("openai", {}).get("model", "gpt-4"),
-                messages=[{"role": "user", "content": analysis_prompt}],
-                max_tokens=self.config.get("openai", {}).get("max_tokens", 500),
-                temperature=0.3
+            # Validated against the schema; truncated JSON is repaired, unusable replies re-asked
+            labels, analysis_text, usage, messages = await parse_with_retries(
+                complete, messages, CallAnalysisLabels, self.output_parser, self.structured_config['max_retries']
             )
-            
-            analysis_text = response.choices[0].message.content.strip()
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', analysis_text, re.DOTALL)
-            if json_match:
-                analysis_result = json.loads(json_match.group())
-                self.performance_tracker.record_api_call("openai", True)
-                self.logger.info("🧠 LLM conversation analysis completed")
-                return analysis_result
-            else:
-                raise ValueError("Could not extract JSON from LLM response")
+            self._record_completion(model, messages, params, analysis_text, usage, "call_analyzer")
+            self.logger.info("🧠 LLM conversation analysis completed")
+            return model_to_dict(labels)
                 
         except Exception as e:
             self.logger.error(f"LLM analysis error: {e}")
             self.performance_tracker.record_api_call("openai", False)
             raise e
     
-    def _rule_based_analysis(self, farmer_responses: List[str]) -> Dict:
-        """Fallback rule-based analysis"""
+    @staticmethod
+    def _packed_analysis_prompt(conversation_texts: List[str]) -> str:
+        call_ids = [f"C{i + 1}" for i in range(len(conversation_texts))]
+        conversations = "\n".join(
+            f"        CONVERSATION {call_id}:\n        {text}" for call_id, text in zip(call_ids, conversation_texts)
+        )
         
-        all_text = " ".join(farmer_responses).lower()
+        return f"""
+        Analyze each of these {len(conversation_texts)} conversations between a solar scheme agent and a farmer independently.
+
+{conversations}
+
+        Return only a JSON object of the form {{"results": [{{"call_id": "C1", ...}}, ...]}} with exactly one
+        entry per conversation id ({", ".join(call_ids)}). Each entry has "call_id" plus these exact keys:
+        {ANALYSIS_JSON_SCHEMA}
+
+        {ANALYSIS_GUIDELINES}
+        """
+    
+    async def _get_packed_llm_analysis(self, conversation_texts: List[str]) -> List[Optional[Dict]]:
+        """Analyze several transcripts in one LLM request
         
-        # Extract keywords
-        keywords = extract_keywords(all_text)
+        Returns one analysis per transcript, or None where the reply has no
+        valid result for that call id.
+        """
+        call_ids = [f"C{i + 1}" for i in range(len(conversation_texts))]
+        analysis_prompt = self._packed_analysis_prompt(conversation_texts)
         
-        # Sentiment analysis
-        pos_count = len(keywords.get('positive', []))
-        neg_count = len(keywords.get('negative', []))
+        model = self.config.get("openai", {}).get("model", "gpt-4")
+        messages = [{"role": "user", "content": analysis_prompt}]
+        params = {
+            "max_tokens": self.batch_config['completion_tokens_per_call'] * len(conversation_texts),
+            "temperature": 0.3,
+            **self._function_params("record_call_analyses", "Record the analysis of every call",
+                                    CallAnalysisBatchAPI)
+        }
         
-        if pos_count > neg_count:
-            sentiment = 'positive'
-        elif neg_count > pos_count:
-            sentiment = 'negative'
-        else:
-            sentiment = 'neutral'
-        
-        # Interest level analysis
-        confused_count = len(keywords.get('confused', []))
-        interested_count = len(keywords.get('interested', []))
-        
-        if confused_count > 1:
-            interest_level = 'confused'
-        elif interested_count >= 2:
-            interest_level = 'high'
-        elif interested_count == 1 or pos_count > 0:
-            interest_level = 'medium'
-        else:
-            interest_level = 'low'
-        
-        # Intro clarity
-        intro_clarity = not any(phrase in all_text for phrase in ['samajh nahi', 'kya bol rahe', 'simple mein'])
-        
-        # Objections detection
-        objections = []
-        if any(word in all_text for word in ['kitne paise', 'paisa', 'cost']):
-            objections.append('cost_concern')
-        if any(word in all_text for word in ['free mein', 'bilkul free']):
-            objections.append('wants_free')
-        if any(word in all_text for word in ['kaun ho', 'sach hai', 'government']):
-            objections.append('trust_issues')
-        if any(word in all_text for word in ['eligible', 'qualification']):
-            objections.append('eligibility_doubt')
-        if any(word in all_text for word in ['time nahi', 'busy']):
-            objections.append('time_constraints')
-        if confused_count > 0:
-            objections.append('technical_confusion')
-        
-        # Call outcome
-        if any(phrase in all_text for phrase in ['dobara call', 'baad mein call']):
-            call_outcome = 'follow_up'
-        elif sentiment == 'positive' and interest_level in ['high', 'medium'] and len(objections) <= 1:
-            call_outcome = 'success'
-        elif any(phrase in all_text for phrase in ['nahi chahiye', 'band karo', 'interested nahi']):
-            call_outcome = 'failure'
-        else:
-            call_outcome = 'follow_up'
+        try:
+            analysis_text, usage = await self._chat_completion(model, messages, params, "call_analyzer_batch")
+        except Exception as e:
+            self.performance_tracker.record_api_call("openai", False)
+            raise e
         
-        # Conversation flow
-        conversation_flow = {
-            'farmer_engagement': 'high' if interested_count > 1 else 'medium' if interested_count > 0 else 'low',
-            'question_quality': 'good' if len(objections) > 0 else 'average',
-            'understanding_level': 'confused' if confused_count > 1 else 'clear' if intro_clarity else 'partial'
-        }
+        # Entries are validated one by one so a single bad entry doesn't sink the pack
+        data, _ = self.output_parser.parse_json(analysis_text)
+        entries = data.get("results", [])
+        
+        # Map results back by call id; anything missing or malformed is retried per call
+        by_id = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if isinstance(entry, dict) and self._is_complete_analysis(entry):
+                by_id.setdefault(str(entry.get("call_id", "")).strip().upper(), entry)
         
-        # Emotional indicators
-        emotional_indicators = []
-        if 'trust_issues' in objections:
-            emotional_indicators.append('skeptical')
-        if confused_count > 0:
-            emotional_indicators.append('confused')
-        if sentiment == 'positive':
-            emotional_indicators.append('interested')
-        if 'cost_concern' in objections:
-            emotional_indicators.append('worried')
+        results = [by_id.get(call_id) for call_id in call_ids]
+        if any(result is not None for result in results):
+            self._record_completion(model, messages, params, analysis_text, usage, "call_analyzer_batch")
+        
+        self.batch_metrics['packed_requests'] += 1
+        self.batch_metrics['packed_conversations'] += sum(result is not None for result in results)
+        self.logger.info(f"🧠 Packed LLM analysis completed ({len(by_id)}/{len(call_ids)} calls mapped)")
+        return results
+    
+    @staticmethod
+    def _is_complete_analysis(analysis: Dict) -> bool:
+        """Check an LLM analysis has every required key with a valid label"""
+        try:
+            validate_model(CallAnalysisLabels, analysis)
+        except ValidationError:
+            return False
+        return True
+    
+    def _function_params(self, name: str, description: str, model_cls: Type[BaseModel]) -> Dict:
+        """Function-calling params constraining the reply to a schema (empty if disabled)"""
+        if not self.structured_config['function_calling']:
+            return {}
+        return function_spec(name, description, model_cls)
+    
+    async def _chat_completion(self, model: str, messages: List[Dict], params: Dict,
+                               component: str) -> Tuple[str, Optional[Dict]]:
+        """Get a completion from the response cache or the API
+        
+        Returns (text, usage); usage is None for cache hits. Streamed replies
+        are read only until their JSON object is complete.
+        """
+        if self.response_cache:
+            cached = self.response_cache.get(model, messages, params, component=component)
+            if cached is not None:
+                return cached, None
+        
+        stream = self.structured_config['stream']
+        prompt_tokens = sum(self.context_manager.count_tokens(message['content']) for message in messages)
+        with self.credential_pool.lease() as lease:
+            response = await openai.ChatCompletion.acreate(
+                model=model,
+                messages=messages,
+                api_key=lease.key,
+                stream=stream,
+                **params
+            )
+            return await read_completion(response, stream, self.context_manager.count_tokens, prompt_tokens)
+    
+    def _record_completion(self, model: str, messages: List[Dict], params: Dict, content: str,
+                           usage: Optional[Dict], component: str):
+        """Count a successful API completion and cache it (no-op for cache hits)"""
+        if usage is None:
+            return
+        self.performance_tracker.record_api_call("openai", True)
+        if self.response_cache:
+            self.response_cache.put(model, messages, params, content, usage=usage, component=component)
+    
+    def _rule_based_analysis(self, farmer_responses: List[str]) -> Dict:
+        """Fallback rule-based analysis"""
+        
+        all_text = " ".join(farmer_responses).lower()
+        
+        # One scan covers every rule category
+        analysis = {**rule_based_labels(self.keyword_matcher.scan(all_text)), 'source': 'rules'}
         
         self.logger.info("🧠 Rule-based conversation analysis completed")
         
-        return {
-            'sentiment': sentiment,
-            'interest_level': interest_level,
-            'intro_clarity': intro_clarity,
-            'objections': objections,
-            'call_outcome': call_outcome,
-            'conversation_flow': conversation_flow,
-            'emotional_indicators': emotional_indicators
-        }
+        return analysis
     
     def _merge_analyses(self, llm_analysis: Dict, rule_analysis: Dict) -> Dict:
         """Merge LLM and rule-based analyses"""
@@ -261,4 +530,14 @@ class CallAnalyzer:
     
     def get_performance_stats(self) -> Dict:
         """Get call analyzer performance statistics"""
-        return self.performance_tracker.get_summary()
\ No newline at end of file
+        stats = self.performance_tracker.get_summary()
+        if self.response_cache:
+            stats['response_cache'] = self.response_cache.get_stats()
+        stats['context_tokens'] = self.context_manager.get_stats().get('call_analyzer', {})
+        stats['batch_analysis'] = dict(self.batch_metrics)
+        stats['structured_output'] = self.output_parser.get_stats()
+        if self.local_classifier:
+            stats['local_classifier'] = self.local_classifier.get_stats()
+        if self.memo_store:
+            stats['analysis_memo'] = {**self.memo_store.get_stats(), 'analyzer_version': self.analysis_version}
+        return stats
\ No newline at end of file
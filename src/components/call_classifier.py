@@ -0,0 +1,342 @@
+import asyncio
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from ..models.data_models import SentimentType, InterestLevel, CallOutcome
+from ..utils.helpers import load_json_data
+from ..utils.keyword_matcher import get_keyword_matcher
+from ..utils.normalization import normalize_hindi_text
+
+# Single-label heads and their classes
+LABEL_HEADS = {
+    'sentiment': [member.value for member in SentimentType],
+    'interest_level': [member.value for member in InterestLevel],
+    'call_outcome': [member.value for member in CallOutcome]
+}
+
+# Objection labels predicted one-vs-rest (LLM prompt categories plus rule-based ones)
+OBJECTION_LABELS = [
+    'cost_concern', 'trust_issues', 'technical_confusion', 'time_constraints',
+    'eligibility_doubt', 'process_complexity', 'wants_free'
+]
+
+TEMPERATURE_GRID = np.linspace(0.1, 3.0, 30)
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+def _sigmoid(logits: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(logits, -30, 30)))
+
+class LocalCallClassifier:
+    """Lightweight local classifier for call analysis, used ahead of the LLM
+
+    Hashed TF-IDF features over normalized farmer replies (word unigrams,
+    bigrams and lexicon categories) feed softmax heads for sentiment,
+    interest and outcome plus one-vs-rest logistic heads for objections,
+    all trained with NumPy gradient descent. Probabilities are calibrated by
+    temperature scaling on a held-out split; the call confidence is the
+    lowest head confidence.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.n_features = config.get("n_features", 2048)
+        self.confidence_threshold = config.get("confidence_threshold", 0.85)
+        self.min_training_samples = config.get("min_training_samples", 30)
+        self.retrain_every = config.get("retrain_every", 25)
+        self.epochs = config.get("epochs", 300)
+        self.learning_rate = config.get("learning_rate", 2.0)
+        self.l2 = config.get("l2", 1e-3)
+        self.holdout_fraction = config.get("holdout_fraction", 0.2)
+        self.max_samples = config.get("max_samples", 5000)
+        self.seed = config.get("seed", 13)
+        self.logger = logging.getLogger(__name__)
+
+        self.samples: List[Tuple[List[str], Dict]] = []
+        self.pending_samples = 0
+        self.refit_task: Optional[asyncio.Task] = None
+        self.idf = None
+        self.weights: Dict[str, np.ndarray] = {}
+        self.temperatures: Dict[str, float] = {}
+        self.ready = False
+
+        self.metrics = {
+            'conversations': 0,
+            'local_decisions': 0,
+            'llm_calls': 0,
+            'shadow_comparisons': 0,
+            'agreement': {head: 0 for head in [*LABEL_HEADS, 'objections']},
+            'retrains': 0
+        }
+
+    # Features
+
+    def _token_features(self, farmer_responses: List[str]) -> Dict[int, float]:
+        text = normalize_hindi_text(" ".join(farmer_responses))
+        words = text.split()
+        tokens = words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+        tokens += [f"cat={category}" for category in get_keyword_matcher().scan(text).categories()]
+
+        counts = {}
+        for token in tokens:
+            index = zlib.crc32(token.encode('utf-8')) % self.n_features
+            counts[index] = counts.get(index, 0) + 1
+        return counts
+
+    def _vectorize(self, samples: List[List[str]]) -> np.ndarray:
+        """Sublinear TF matrix (before IDF weighting)"""
+        matrix = np.zeros((len(samples), self.n_features), dtype=np.float32)
+        for row, farmer_responses in enumerate(samples):
+            for index, count in self._token_features(farmer_responses).items():
+                matrix[row, index] = 1.0 + np.log(count)
+        return matrix
+
+    def _weight(self, tf: np.ndarray, idf: Optional[np.ndarray] = None) -> np.ndarray:
+        """Apply IDF, L2-normalize and append a bias column"""
+        features = tf * (self.idf if idf is None else idf)
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        features = features / np.maximum(norms, 1e-9)
+        return np.hstack([features, np.ones((len(features), 1), dtype=np.float32)])
+
+    # Training
+
+    @staticmethod
+    def _labels(analysis: Dict) -> Optional[Dict]:
+        """Normalize a stored analysis (CallAnalysis or legacy session log) to training labels"""
+        labels = {
+            'sentiment': analysis.get('sentiment') or analysis.get('farmer_sentiment'),
+            'interest_level': analysis.get('interest_level'),
+            'call_outcome': analysis.get('call_outcome')
+        }
+        if any(labels[head] not in classes for head, classes in LABEL_HEADS.items()):
+            return None
+        labels['objections'] = [o for o in analysis.get('objections', []) if o in OBJECTION_LABELS]
+        return labels
+
+    def add_example(self, farmer_responses: List[str], analysis: Dict) -> bool:
+        """Add a labelled conversation (retraining is left to fit or schedule_refit)"""
+        labels = self._labels(analysis)
+        if labels is None or not any(farmer_responses):
+            return False
+
+        self.samples.append((list(farmer_responses), labels))
+        if len(self.samples) > self.max_samples:
+            self.samples = self.samples[-self.max_samples:]
+        self.pending_samples += 1
+        return True
+
+    def refit_due(self) -> bool:
+        """Whether enough new examples accumulated for a (re)train"""
+        return len(self.samples) >= self.min_training_samples and (
+            not self.ready or self.pending_samples >= self.retrain_every)
+
+    def schedule_refit(self) -> Optional[asyncio.Task]:
+        """Retrain in a worker thread when due, without blocking the calling coroutine
+
+        Training runs on a snapshot of the examples; the new model is
+        swapped in on the event loop once done, so predictions never see a
+        half-updated model.
+        """
+        if (self.refit_task and not self.refit_task.done()) or not self.refit_due():
+            return None
+
+        samples, pending = list(self.samples), self.pending_samples
+        self.refit_task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._train, samples))
+
+        def install(task: asyncio.Task):
+            if task.cancelled():
+                return
+            if task.exception():
+                self.logger.error(f"Local classifier retraining failed: {task.exception()}")
+                return
+            self._install(task.result(), len(samples), pending)
+
+        self.refit_task.add_done_callback(install)
+        return self.refit_task
+
+    def _train_heads(self, features: np.ndarray, targets: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Full-batch gradient descent for every head
+
+        Hashed features are sparse, so training runs on the active columns
+        only and the weights are scattered back to the full feature space.
+        """
+        active = np.flatnonzero(features.any(axis=0))
+        dense = np.ascontiguousarray(features[:, active])
+        n = len(dense)
+
+        weights = {}
+        for head, target in targets.items():
+            w = np.zeros((len(active), target.shape[1]), dtype=np.float32)
+            for _ in range(self.epochs):
+                logits = dense @ w
+                probs = _sigmoid(logits) if head == 'objections' else _softmax(logits)
+                gradient = dense.T @ (probs - target) / n + self.l2 * w
+                w -= self.learning_rate * gradient
+            full = np.zeros((features.shape[1], target.shape[1]), dtype=np.float32)
+            full[active] = w
+            weights[head] = full
+        return weights
+
+    def _targets(self, labels: List[Dict]) -> Dict[str, np.ndarray]:
+        targets = {}
+        for head, classes in LABEL_HEADS.items():
+            target = np.zeros((len(labels), len(classes)), dtype=np.float32)
+            for row, label in enumerate(labels):
+                target[row, classes.index(label[head])] = 1.0
+            targets[head] = target
+
+        objections = np.zeros((len(labels), len(OBJECTION_LABELS)), dtype=np.float32)
+        for row, label in enumerate(labels):
+            for objection in label['objections']:
+                objections[row, OBJECTION_LABELS.index(objection)] = 1.0
+        targets['objections'] = objections
+        return targets
+
+    def _fit_temperature(self, head: str, logits: np.ndarray, target: np.ndarray) -> float:
+        """Temperature minimizing held-out negative log-likelihood"""
+        best_temperature, best_loss = 1.0, np.inf
+        for temperature in TEMPERATURE_GRID:
+            if head == 'objections':
+                probs = _sigmoid(logits / temperature)
+                loss = -np.mean(target * np.log(probs + 1e-9) + (1 - target) * np.log(1 - probs + 1e-9))
+            else:
+                probs = _softmax(logits / temperature)
+                loss = -np.mean(np.log((probs * target).sum(axis=1) + 1e-9))
+            if loss < best_loss:
+                best_temperature, best_loss = float(temperature), loss
+        return best_temperature
+
+    def fit(self):
+        """(Re)train all heads on the collected examples"""
+        if len(self.samples) < self.min_training_samples:
+            self.logger.info(f"Local classifier needs {self.min_training_samples} examples, "
+                             f"has {len(self.samples)}")
+            return
+        self._install(self._train(self.samples), len(self.samples), self.pending_samples)
+
+    def _train(self, samples: List[Tuple[List[str], Dict]]) -> Tuple[np.ndarray, Dict[str, np.ndarray], Dict[str, float]]:
+        """IDF, head weights and temperatures for a set of examples (no shared state is modified)"""
+        tf = self._vectorize([responses for responses, _ in samples])
+        targets = self._targets([labels for _, labels in samples])
+        document_frequency = (tf > 0).sum(axis=0)
+        idf = (np.log((1 + len(tf)) / (1 + document_frequency)) + 1).astype(np.float32)
+        features = self._weight(tf, idf)
+
+        # Calibrate on a held-out split, then train on everything
+        rng = np.random.default_rng(self.seed)
+        order = rng.permutation(len(features))
+        holdout = order[:int(len(features) * self.holdout_fraction)]
+        train = order[len(holdout):]
+        temperatures = {head: 1.0 for head in targets}
+        if len(holdout) >= 10:
+            weights = self._train_heads(features[train], {h: t[train] for h, t in targets.items()})
+            for head, target in targets.items():
+                temperatures[head] = self._fit_temperature(
+                    head, features[holdout] @ weights[head], target[holdout])
+
+        return idf, self._train_heads(features, targets), temperatures
+
+    def _install(self, model: Tuple[np.ndarray, Dict[str, np.ndarray], Dict[str, float]],
+                 trained_on: int, pending: int):
+        """Swap in a trained model; examples added while it trained stay pending"""
+        self.idf, self.weights, self.temperatures = model
+        self.ready = True
+        self.pending_samples = max(0, self.pending_samples - pending)
+        self.metrics['retrains'] += 1
+        self.logger.info(f"🧮 Local call classifier trained on {trained_on} conversations")
+
+    @classmethod
+    def from_call_logs(cls, config: Optional[Dict] = None,
+                       log_dirs: Iterable[str] = ("logs", "data/output/call_logs")) -> "LocalCallClassifier":
+        """Build a classifier from the LLM-labelled analyses of saved call records"""
+        classifier = cls(config)
+        for farmer_responses, analysis in cls.load_training_samples(log_dirs):
+            labels = classifier._labels(analysis)
+            if labels is not None and any(farmer_responses):
+                classifier.samples.append((farmer_responses, labels))
+        classifier.fit()
+        return classifier
+
+    @staticmethod
+    def load_training_samples(log_dirs: Iterable[str], sources: Iterable[str] = ("llm",)) -> List[Tuple[List[str], Dict]]:
+        """Collect (farmer_responses, analysis) pairs from JSON call logs
+
+        Only analyses produced by one of ``sources`` are kept, so the model
+        never trains on its own predictions, rule-based fallbacks or legacy
+        session logs (which record no source).
+        """
+        sources = set(sources)
+        samples = []
+        for log_dir in log_dirs:
+            for log_path in sorted(Path(log_dir).glob("*.json")):
+                record = load_json_data(log_path)
+                analysis = record.get("analysis") if isinstance(record, dict) else None
+                if isinstance(analysis, dict) and analysis.get("source") in sources:
+                    samples.append((list(analysis.get("farmer_responses", [])), analysis))
+        return samples
+
+    # Inference
+
+    def predict(self, farmer_responses: List[str]) -> Tuple[Dict, float]:
+        """Predict labels with calibrated confidence (0.0 until trained)"""
+        if not self.ready:
+            return {}, 0.0
+
+        features = self._weight(self._vectorize([farmer_responses]))
+        prediction, confidences = {}, []
+
+        for head, classes in LABEL_HEADS.items():
+            probs = _softmax(features @ self.weights[head] / self.temperatures[head])[0]
+            best = int(probs.argmax())
+            prediction[head] = classes[best]
+            confidences.append(float(probs[best]))
+
+        probs = _sigmoid(features @ self.weights['objections'] / self.temperatures['objections'])[0]
+        prediction['objections'] = [label for label, p in zip(OBJECTION_LABELS, probs) if p >= 0.5]
+        confidences.append(float(np.maximum(probs, 1 - probs).min()))
+
+        return prediction, min(confidences)
+
+    def should_use_local(self, confidence: float) -> bool:
+        """Record one analyzed conversation and decide whether the local prediction suffices"""
+        self.metrics['conversations'] += 1
+        if self.ready and confidence >= self.confidence_threshold:
+            self.metrics['local_decisions'] += 1
+            return True
+        self.metrics['llm_calls'] += 1
+        return False
+
+    def record_agreement(self, prediction: Dict, llm_analysis: Dict):
+        """Compare a local prediction with the LLM analysis of the same call"""
+        labels = self._labels(llm_analysis)
+        if not prediction or labels is None:
+            return
+
+        self.metrics['shadow_comparisons'] += 1
+        for head in LABEL_HEADS:
+            self.metrics['agreement'][head] += int(prediction[head] == labels[head])
+        self.metrics['agreement']['objections'] += int(set(prediction['objections']) == set(labels['objections']))
+
+    def get_stats(self) -> Dict:
+        """Get LLM-call reduction and agreement statistics"""
+        conversations = self.metrics['conversations']
+        comparisons = self.metrics['shadow_comparisons']
+        return {
+            **{key: value for key, value in self.metrics.items() if key != 'agreement'},
+            'training_samples': len(self.samples),
+            'ready': self.ready,
+            'confidence_threshold': self.confidence_threshold,
+            'llm_call_reduction': self.metrics['local_decisions'] / conversations if conversations else 0.0,
+            'agreement_rate': {
+                head: count / comparisons if comparisons else None
+                for head, count in self.metrics['agreement'].items()
+            },
+            'temperatures': dict(self.temperatures)
+        }
@@ -0,0 +1,259 @@
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from ..models.data_models import AgentPrompt, FarmerProfile
+from ..utils.helpers import calculate_effectiveness_scores
+
+# Farmer intents, matching the categories used by VoiceAgent._generate_next_agent_message,
+# IncrementalCallAnalyzer.end_reason and CallAnalyzer._rule_based_analysis.
+# The last three are terminal (the call ends).
+INTENTS = ['trust', 'confused', 'cost', 'eligibility', 'process', 'busy',
+           'interested', 'neutral', 'reject', 'agree', 'call_later']
+INTENT_INDEX = {intent: i for i, intent in enumerate(INTENTS)}
+TERMINAL_INTENTS = ['reject', 'agree', 'call_later']
+
+# Intent -> objection label from the rule-based analyzer
+INTENT_OBJECTIONS = {
+    'cost': 'cost_concern',
+    'trust': 'trust_issues',
+    'eligibility': 'eligibility_doubt',
+    'busy': 'time_constraints',
+    'confused': 'technical_confusion'
+}
+
+# After the agent answers intent A, how much more likely the farmer moves to intent B
+FOLLOW_ON_BONUS = {
+    ('trust', 'trust'): -1.5, ('trust', 'cost'): 0.5, ('trust', 'reject'): 0.3,
+    ('confused', 'confused'): -0.8, ('confused', 'interested'): 0.3,
+    ('cost', 'cost'): -1.0, ('cost', 'process'): 0.6, ('cost', 'interested'): 0.4,
+    ('eligibility', 'eligibility'): -1.5, ('eligibility', 'process'): 0.8,
+    ('process', 'process'): -1.0, ('process', 'interested'): 0.6, ('process', 'agree'): 0.5,
+    ('busy', 'call_later'): 2.0, ('busy', 'busy'): -0.5,
+    ('interested', 'agree'): 1.5, ('interested', 'process'): 0.6, ('interested', 'eligibility'): 0.4,
+    ('neutral', 'interested'): 0.3, ('neutral', 'call_later'): 0.5
+}
+
+def extract_prompt_features(prompt: AgentPrompt) -> Dict[str, float]:
+    """Extract the prompt features the simulator is sensitive to"""
+    text = " ".join([prompt.intro] + list(prompt.benefits) + [prompt.call_to_action]).lower()
+    words = len(text.split())
+
+    return {
+        'trust': float(any(marker in text for marker in ['authorized', 'advisor', 'official', 'website'])),
+        'cost_breakdown': float(any(marker in text for marker in ['10,000', '10%', 'sirf', 'installment'])),
+        'simple': float(any(marker in text for marker in ['matlab', 'simple', 'aasan', 'sun ki energy'])),
+        'process_clarity': float(any(marker in text for marker in ['steps', 'whatsapp', '45 din', 'process'])),
+        'soft_cta': float(any(marker in text for marker in ['2 minute', 'whatsapp', 'sun sakte'])),
+        'length': min(1.0, words / 120.0)
+    }
+
+def persona_parameters(profile: Union[FarmerProfile, Dict]) -> Dict[str, float]:
+    """Normalize a FarmerProfile or persona characteristics dict into simulator parameters"""
+    if isinstance(profile, FarmerProfile):
+        education, income, skepticism = profile.education.value, profile.income.value, profile.skepticism
+    else:
+        education = profile.get('education', 'medium')
+        income = profile.get('income', 'medium')
+        skepticism = profile.get('skepticism', 0.5)
+
+    return {
+        'skepticism': float(skepticism),
+        'edu_low': float(education == 'low'),
+        'edu_high': float(education == 'high'),
+        'income_low': float(income == 'low')
+    }
+
+class ConversationSimulator:
+    """Vectorized Monte Carlo simulator of calls as a farmer-intent Markov process
+
+    Each persona/prompt pair defines an intent transition matrix. Conversations
+    are simulated in NumPy arrays, scored with the rule-based analyzer's logic
+    and the effectiveness formula, so prompt versions can be compared over
+    millions of synthetic calls without any API or mock delays.
+    """
+
+    def __init__(self, max_turns: int = 5, seed: Optional[int] = None, batch_size: int = 500_000):
+        self.max_turns = max_turns
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self.logger = logging.getLogger(__name__)
+
+    def _opening_logits(self, persona: Dict[str, float], features: Dict[str, float]) -> np.ndarray:
+        """Intent logits for the farmer's reply to the opening message"""
+        s = persona['skepticism']
+        logits = {
+            'trust': 2.0 * s - 1.5 * features['trust'] - 0.5,
+            'confused': 1.2 * persona['edu_low'] - 1.5 * features['simple'] + 0.6 * features['length'] - 0.5,
+            'cost': 1.0 * persona['income_low'] - 1.0 * features['cost_breakdown'] + 0.3,
+            'eligibility': -0.5,
+            'process': 0.5 * persona['edu_high'] - 0.8 * features['process_clarity'] + 0.2,
+            'busy': -1.2 - 0.5 * features['soft_cta'] + 0.6 * features['length'],
+            'interested': 0.2 + (1.0 - s) + 0.5 * persona['edu_high'] + 0.3 * features['cost_breakdown'],
+            'neutral': 0.3,
+            'reject': -1.8 + 1.2 * s - 0.5 * features['trust'],
+            'agree': -2.5 + 0.8 * (1.0 - s),
+            'call_later': -2.2 + 0.3 * features['length']
+        }
+        return np.array([logits[intent] for intent in INTENTS])
+
+    def transition_matrix(self, persona: Dict[str, float], features: Dict[str, float]) -> np.ndarray:
+        """Build the (K, K) intent transition matrix for a persona and prompt"""
+        base = self._opening_logits(persona, features)
+        matrix = np.tile(base, (len(INTENTS), 1))
+
+        for (source, target), bonus in FOLLOW_ON_BONUS.items():
+            matrix[INTENT_INDEX[source], INTENT_INDEX[target]] += bonus
+
+        # Terminal intents stay put
+        probs = np.exp(matrix - matrix.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+        for intent in TERMINAL_INTENTS:
+            probs[INTENT_INDEX[intent]] = np.eye(len(INTENTS))[INTENT_INDEX[intent]]
+
+        return probs
+
+    def _simulate_batch(self, opening: np.ndarray, matrix: np.ndarray, n: int) -> Dict[str, np.ndarray]:
+        """Simulate n conversations, returning per-call intent counts and final state"""
+        k = len(INTENTS)
+        counts = np.zeros((n, k), dtype=np.int16)
+        turns = np.zeros(n, dtype=np.int8)
+        active = np.ones(n, dtype=bool)
+        terminal = np.array([intent in TERMINAL_INTENTS for intent in INTENTS])
+        cumulative = np.cumsum(matrix, axis=1)
+        cumulative[:, -1] = 1.0
+
+        state = np.searchsorted(np.cumsum(opening), self.rng.random(n), side='right').clip(0, k - 1)
+        first_state = state.copy()
+
+        for turn in range(self.max_turns):
+            rows = np.flatnonzero(active)
+            counts[rows, state[rows]] += 1
+            turns[rows] += 1
+            active[rows] = ~terminal[state[rows]]
+
+            if turn == self.max_turns - 1 or not active.any():
+                break
+
+            # Sample next intents grouped by current state (inverse CDF per row)
+            rows = np.flatnonzero(active)
+            draws = self.rng.random(rows.size)
+            current = state[rows]
+            next_state = np.empty(rows.size, dtype=state.dtype)
+            for intent_index in np.unique(current):
+                mask = current == intent_index
+                next_state[mask] = np.searchsorted(cumulative[intent_index], draws[mask], side='right')
+            state[rows] = next_state.clip(0, k - 1)
+
+        return {'counts': counts, 'final_state': state, 'first_state': first_state, 'turns': turns}
+
+    def _score(self, batch: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Apply the rule-based analyzer's labelling and the effectiveness formula"""
+        counts = batch['counts'].astype(np.int32)
+        final = batch['final_state']
+        c = {intent: counts[:, INTENT_INDEX[intent]] for intent in INTENTS}
+
+        pos_count = c['interested'] + c['agree']
+        neg_count = c['reject'] + c['busy']
+        sentiment = np.where(pos_count > neg_count, 'positive',
+                             np.where(neg_count > pos_count, 'negative', 'neutral'))
+
+        interested_count = c['interested'] + c['agree']
+        interest = np.where(c['confused'] > 1, 'confused',
+                            np.where(interested_count >= 2, 'high',
+                                     np.where((interested_count == 1) | (pos_count > 0), 'medium', 'low')))
+
+        objection_count = sum((c[intent] > 0).astype(np.int32) for intent in INTENT_OBJECTIONS)
+        intro_clarity = batch['first_state'] != INTENT_INDEX['confused']
+
+        success = ((final == INTENT_INDEX['agree']) |
+                   ((sentiment == 'positive') & np.isin(interest, ['high', 'medium']) & (objection_count <= 1)))
+        outcome = np.where(final == INTENT_INDEX['call_later'], 'follow_up',
+                           np.where(success, 'success',
+                                    np.where(final == INTENT_INDEX['reject'], 'failure', 'follow_up')))
+
+        effectiveness = calculate_effectiveness_scores(sentiment, interest, objection_count, outcome, intro_clarity)
+        return {'outcome': outcome, 'effectiveness': effectiveness, 'objection_count': objection_count}
+
+    def simulate(self, prompt: AgentPrompt, persona: Union[FarmerProfile, Dict],
+                 n_conversations: int) -> Dict[str, np.ndarray]:
+        """Simulate calls for one prompt and persona, returning per-call arrays"""
+        params = persona_parameters(persona)
+        features = extract_prompt_features(prompt)
+        opening = np.exp(self._opening_logits(params, features))
+        opening /= opening.sum()
+        matrix = self.transition_matrix(params, features)
+
+        outcomes, effectiveness, turns, objections = [], [], [], []
+        remaining = n_conversations
+        while remaining > 0:
+            n = min(self.batch_size, remaining)
+            batch = self._simulate_batch(opening, matrix, n)
+            scored = self._score(batch)
+            outcomes.append(scored['outcome'])
+            effectiveness.append(scored['effectiveness'])
+            objections.append(scored['objection_count'])
+            turns.append(batch['turns'])
+            remaining -= n
+
+        return {
+            'outcome': np.concatenate(outcomes),
+            'effectiveness': np.concatenate(effectiveness),
+            'objection_count': np.concatenate(objections),
+            'turns': np.concatenate(turns)
+        }
+
+    @staticmethod
+    def _summarize(results: Dict[str, np.ndarray]) -> Dict[str, float]:
+        effectiveness = results['effectiveness']
+        return {
+            'conversations': int(effectiveness.size),
+            'success_rate': float(np.mean(results['outcome'] == 'success')),
+            'follow_up_rate': float(np.mean(results['outcome'] == 'follow_up')),
+            'failure_rate': float(np.mean(results['outcome'] == 'failure')),
+            'effectiveness_mean': float(effectiveness.mean()),
+            'effectiveness_std': float(effectiveness.std()),
+            'effectiveness_percentiles': {
+                f"p{q}": float(value) for q, value in zip((10, 25, 50, 75, 90),
+                                                          np.percentile(effectiveness, [10, 25, 50, 75, 90]))
+            },
+            'average_turns': float(results['turns'].mean()),
+            'average_objections': float(results['objection_count'].mean())
+        }
+
+    def evaluate_prompt(self, prompt: AgentPrompt, personas: Dict[str, Union[FarmerProfile, Dict]],
+                        n_conversations: int = 100_000,
+                        persona_weights: Optional[Dict[str, float]] = None) -> Dict:
+        """Estimate outcome rates and effectiveness for a prompt over a persona mix"""
+        start = time.perf_counter()
+        weights = persona_weights or {name: 1.0 for name in personas}
+        total_weight = sum(weights.values())
+
+        per_persona = {}
+        combined = []
+        for name, persona in personas.items():
+            n = max(1, int(round(n_conversations * weights.get(name, 0.0) / total_weight)))
+            results = self.simulate(prompt, persona, n)
+            per_persona[name] = self._summarize(results)
+            combined.append(results)
+
+        overall = self._summarize({key: np.concatenate([r[key] for r in combined]) for key in combined[0]})
+        elapsed = time.perf_counter() - start
+        self.logger.info(f"🎲 Simulated {overall['conversations']:,} calls for prompt v{prompt.version} "
+                         f"in {elapsed:.2f}s - effectiveness {overall['effectiveness_mean']:.3f}")
+
+        return {
+            'prompt_version': prompt.version,
+            'prompt_features': extract_prompt_features(prompt),
+            'overall': overall,
+            'per_persona': per_persona,
+            'elapsed_seconds': elapsed
+        }
+
+    def compare_prompts(self, prompts: Sequence[AgentPrompt], personas: Dict[str, Union[FarmerProfile, Dict]],
+                        n_conversations: int = 100_000) -> List[Dict]:
+        """Evaluate several prompt versions, best expected effectiveness first"""
+        evaluations = [self.evaluate_prompt(prompt, personas, n_conversations) for prompt in prompts]
+        return sorted(evaluations, key=lambda e: e['overall']['effectiveness_mean'], reverse=True)
@@ -1,4 +1,6 @@
 import asyncio
+import hashlib
+import json
 import random
 import re
 from typing import Dict, List, Optional
@@ -6,26 +8,64 @@ import openai
 import logging
 
 from ..models.data_models import FarmerProfile
+from .response_model import FarmerResponseModel
+from ..utils.context_manager import ConversationContextManager
+from ..utils.credentials import CredentialPool
+from ..utils.llm_cache import LLMResponseCache
 from ..utils.helpers import clean_hindi_text, PerformanceTracker
 
+# Static instructions shared by every persona prompt. Kept first and byte-stable so
+# provider-side prompt caching can reuse the prefix across farmers and turns.
+PERSONA_INSTRUCTION_PREFIX = """You are role-playing an Indian farmer receiving a phone call about the PM-KUSUM solar scheme.
+
+CONVERSATION STYLE:
+- Speak in Hindi mixed with local dialect
+- Use realistic farmer expressions like "Haan bhai", "Achha", "Samajh nahi aaya"
+- Show appropriate emotions based on content
+- Ask practical questions about cost, eligibility, process
+- Express skepticism about government schemes if skepticism is high
+- Use simple language, avoid technical terms unless education is high
+
+RESPONSE GUIDELINES:
+- Keep responses 1-2 sentences long
+- Show genuine farmer concerns and reactions
+- Ask clarifying questions when confused
+- Express interest if benefits seem genuine and affordable
+- Show hesitation about upfront costs or complex processes
+
+You will receive agent messages about PM-KUSUM solar scheme. Respond as this farmer would naturally react.
+"""
+
 class LLMFarmerPersona:
     """LLM-based farmer persona that generates realistic responses"""
     
-    def __init__(self, openai_api_key: str, config: Dict, personas_config: Dict):
+    def __init__(self, openai_api_key: str, config: Dict, personas_config: Dict,
+                 credential_pool: Optional[CredentialPool] = None,
+                 response_cache: Optional[LLMResponseCache] = None,
+                 context_manager: Optional[ConversationContextManager] = None,
+                 response_model: Optional[FarmerResponseModel] = None):
         self.openai_api_key = openai_api_key
         self.config = config
+        self.response_cache = response_cache
+        self.context_manager = context_manager or ConversationContextManager()
+        self.response_model = response_model
         self.personas_config = personas_config
         self.conversation_history = []
         self.logger = logging.getLogger(__name__)
         self.performance_tracker = PerformanceTracker()
         
-        if openai_api_key:
-            openai.api_key = openai_api_key
-        else:
+        # Keys are passed per request so several keys can share the load
+        self.credential_pool = credential_pool or CredentialPool("openai", [openai_api_key] if openai_api_key else [])
+        if not openai_api_key:
             self.logger.warning("OpenAI API key not provided - using mock mode")
         
         # Load response templates for mock mode
         self.response_templates = self._load_response_templates()
+        
+        # Compiled persona prompts keyed by (profile id, persona type, templates version)
+        self.templates_version = self._compute_templates_version(personas_config)
+        self._compiled_prompts = {}
+        self.prompt_metrics = {'compiled': 0, 'reused': 0, 'prompt_tokens': 0, 'cached_prompt_tokens': 0}
     
     def _load_response_templates(self) -> Dict[str, List[str]]:
         """Load response templates from personas config"""
@@ -38,46 +78,63 @@ class LLMFarmerPersona:
         return templates
     
     def create_farmer_persona_prompt(self, farmer_profile: FarmerProfile) -> str:
-        """Create a detailed persona prompt for the LLM"""
+        """Create a detailed persona prompt for the LLM (compiled once per profile and template version)"""
+        
+        # Profiles are treated as immutable once created, so id + template version identifies the prompt
+        cache_key = (farmer_profile.id, farmer_profile.persona_type, self.templates_version)
+        
+        prompt = self._compiled_prompts.get(cache_key)
+        if prompt is None:
+            prompt = self._compile_persona_prompt(farmer_profile)
+            self._compiled_prompts[cache_key] = prompt
+            self.prompt_metrics['compiled'] += 1
+        else:
+            self.prompt_metrics['reused'] += 1
+        
+        return prompt
+    
+    def _compile_persona_prompt(self, farmer_profile: FarmerProfile) -> str:
+        """Render the profile-specific part of the persona prompt after the static prefix"""
         
         # Get persona template if available
         persona_template = None
         if farmer_profile.persona_type:
             persona_template = self.personas_config.get("persona_templates", {}).get(farmer_profile.persona_type)
         
-        return f"""
-        You are a {farmer_profile.age}-year-old farmer named {farmer_profile.name} from {farmer_profile.location}.
-        
-        FARMER PROFILE:
-        - Education: {farmer_profile.education.value} 
-        - Income: {farmer_profile.income.value}
-        - Primary crops: {', '.join(farmer_profile.crops)}
-        - Land size: {farmer_profile.land_size}
-        - Skepticism level: {farmer_profile.skepticism}/1.0
-        - Previous experience with govt schemes: {farmer_profile.govt_experience}
-        - Language comfort: Primarily Hindi, some broken English
-        - Family size: {farmer_profile.family_size}
-        
-        PERSONALITY TRAITS:
-        - {self._get_personality_traits(farmer_profile, persona_template)}
-        
-        CONVERSATION STYLE:
-        - Speak in Hindi mixed with local dialect
-        - Use realistic farmer expressions like "Haan bhai", "Achha", "Samajh nahi aaya"
-        - Show appropriate emotions based on content
-        - Ask practical questions about cost, eligibility, process
-        - Express skepticism about government schemes if skepticism is high
-        - Use simple language, avoid technical terms unless education is high
-        
-        RESPONSE GUIDELINES:
-        - Keep responses 1-2 sentences long
-        - Show genuine farmer concerns and reactions
-        - Ask clarifying questions when confused
-        - Express interest if benefits seem genuine and affordable
-        - Show hesitation about upfront costs or complex processes
-        
-        You will receive agent messages about PM-KUSUM solar scheme. Respond as this farmer would naturally react.
-        """
+        return PERSONA_INSTRUCTION_PREFIX + f"""
+You are a {farmer_profile.age}-year-old farmer named {farmer_profile.name} from {farmer_profile.location}.
+
+FARMER PROFILE:
+- Education: {farmer_profile.education.value}
+- Income: {farmer_profile.income.value}
+- Primary crops: {', '.join(farmer_profile.crops)}
+- Land size: {farmer_profile.land_size}
+- Skepticism level: {farmer_profile.skepticism}/1.0
+- Previous experience with govt schemes: {farmer_profile.govt_experience}
+- Language comfort: Primarily Hindi, some broken English
+- Family size: {farmer_profile.family_size}
+
+PERSONALITY TRAITS:
+- {self._get_personality_traits(farmer_profile, persona_template)}
+"""
+    
+    @staticmethod
+    def _compute_templates_version(personas_config: Dict) -> str:
+        """Hash the persona templates so compiled prompts can be invalidated on change"""
+        templates = personas_config.get("persona_templates", {})
+        payload = json.dumps(templates, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+    
+    def update_personas_config(self, personas_config: Dict):
+        """Swap in a new personas config, invalidating compiled prompts if templates changed"""
+        new_version = self._compute_templates_version(personas_config)
+        self.personas_config = personas_config
+        self.response_templates = self._load_response_templates()
+        
+        if new_version != self.templates_version:
+            self.templates_version = new_version
+            self._compiled_prompts.clear()
+            self.logger.info(f"🔄 Persona templates changed (v{new_version}), compiled prompts invalidated")
     
     def _get_personality_traits(self, profile: FarmerProfile, persona_template: Optional[Dict]) -> str:
         """Generate personality traits based on profile"""
@@ -108,10 +165,11 @@ class LLMFarmerPersona:
         return "; ".join(traits)
     
     async def generate_response(self, farmer_profile: FarmerProfile, agent_message: str, 
-                              conversation_context: List[str]) -> str:
+                              conversation_context: List[str], conversation_id: Optional[str] = None) -> str:
         """Generate LLM-based farmer response"""
         
-        if not self.openai_api_key:
+        # The offline response model replaces the LLM entirely when configured
+        if not self.openai_api_key or self.response_model is not None:
             return await self._generate_mock_response(farmer_profile, agent_message, conversation_context)
         
         system_prompt = self.create_farmer_persona_prompt(farmer_profile)
@@ -119,30 +177,53 @@ class LLMFarmerPersona:
         # Build conversation context
         context_messages = [{"role": "system", "content": system_prompt}]
         
-        # Add conversation history (limit to last 10 messages)
-        recent_context = conversation_context[-10:] if len(conversation_context) > 10 else conversation_context
+        # Add conversation history within the token budget, older turns folded into a summary
+        current_message = f"Agent says: {agent_message}"
+        summary, recent_context, _ = self.context_manager.fit(
+            conversation_context, "farmer_persona",
+            reserved_tokens=self.context_manager.count_tokens(current_message),
+            conversation_id=conversation_id
+        )
+        if summary:
+            context_messages.append({"role": "system", "content": summary})
         for i, msg in enumerate(recent_context):
             role = "assistant" if i % 2 == 0 else "user"  # farmer responses are assistant
             context_messages.append({"role": role, "content": msg})
         
         # Add current agent message
-        context_messages.append({"role": "user", "content": f"Agent says: {agent_message}"})
+        context_messages.append({"role": "user", "content": current_message})
+        
+        model = self.config.get("openai", {}).get("model", "gpt-4")
+        params = {
+            "max_tokens": self.config.get("openai", {}).get("max_tokens", 100),
+            "temperature": self.config.get("openai", {}).get("temperature", 0.8),
+            "frequency_penalty": 0.3
+        }
         
         try:
-            response = await openai.ChatCompletion.acreate(
-                model=self.config.get("openai", {}).get("model", "gpt-4"),
-                messages=context_messages,
-                max_tokens=self.config.get("openai", {}).get("max_tokens", 100),
-                temperature=self.config.get("openai", {}).get("temperature", 0.8),
-                frequency_penalty=0.3
-            )
+            raw_response = None
+            if self.response_cache:
+                raw_response = self.response_cache.get(model, context_messages, params, component="farmer_persona")
             
-            farmer_response = response.choices[0].message.content.strip()
+            if raw_response is None:
+                with self.credential_pool.lease() as lease:
+                    response = await openai.ChatCompletion.acreate(
+                        model=model,
+                        messages=context_messages,
+                        api_key=lease.key,
+                        **params
+                    )
+                
+                raw_response = response.choices[0].message.content.strip()
+                self.performance_tracker.record_api_call("openai", True)
+                self._record_prompt_usage(response.get("usage"))
+                if self.response_cache:
+                    self.response_cache.put(model, context_messages, params, raw_response,
+                                            usage=response.get("usage"), component="farmer_persona")
             
             # Clean up and ensure it sounds natural
-            farmer_response = self._post_process_response(farmer_response, farmer_profile)
+            farmer_response = self._post_process_response(raw_response, farmer_profile)
             
-            self.performance_tracker.record_api_call("openai", True)
             self.logger.info(f"🤖 Generated farmer response: {farmer_response[:50]}...")
             
             return farmer_response
@@ -157,10 +238,16 @@ class LLMFarmerPersona:
                                     conversation_context: List[str]) -> str:
         """Generate mock farmer response without API calls"""
         
-        await asyncio.sleep(0.2)  # Simulate API delay
-        
         # Determine farmer type for template selection
         persona_type = farmer_profile.persona_type or self._infer_persona_type(farmer_profile)
+        turn = len(conversation_context) // 2
+        
+        if self.response_model is not None:
+            response = self.response_model.generate(persona_type, agent_message, turn)
+            self.logger.debug(f"🤖 [MODEL] Generated response: {response[:50]}...")
+            return response
+        
+        await asyncio.sleep(0.2)  # Simulate API delay
         
         # Get response templates
         templates = self.response_templates.get(persona_type, [])
@@ -168,8 +255,6 @@ class LLMFarmerPersona:
             templates = ["Haan, sun raha hun.", "Theek hai, batayiye.", "Samajh nahi aaya."]
         
         # Select response based on conversation turn
-        turn = len(conversation_context) // 2
-        
         if turn < len(templates):
             base_response = templates[turn]
         else:
@@ -235,6 +320,30 @@ class LLMFarmerPersona:
                 
         return response
     
+    def end_conversation(self, conversation_id: str):
+        """Release per-conversation context state"""
+        self.context_manager.end_conversation(conversation_id)
+    
+    def _record_prompt_usage(self, usage: Optional[Dict]):
+        """Track prompt tokens, including those served from the provider's prompt cache"""
+        if not usage:
+            return
+        
+        self.prompt_metrics['prompt_tokens'] += usage.get('prompt_tokens', 0)
+        details = usage.get('prompt_tokens_details') or {}
+        self.prompt_metrics['cached_prompt_tokens'] += details.get('cached_tokens', 0)
+    
     def get_performance_stats(self) -> Dict:
         """Get farmer persona performance statistics"""
-        return self.performance_tracker.get_summary()
\ No newline at end of file
+        stats = self.performance_tracker.get_summary()
+        stats['persona_prompts'] = {
+            **self.prompt_metrics,
+            'templates_version': self.templates_version,
+            'static_prefix_chars': len(PERSONA_INSTRUCTION_PREFIX)
+        }
+        stats['context_tokens'] = self.context_manager.get_stats().get('farmer_persona', {})
+        if self.response_model is not None:
+            stats['response_model'] = self.response_model.get_stats()
+        if self.response_cache:
+            stats['response_cache'] = self.response_cache.get_stats()
+        return stats
\ No newline at end of file
@@ -0,0 +1,239 @@
+import dataclasses
+import logging
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.data_models import AgentPrompt, CallAnalysis
+
+DEFAULT_BANDIT_CONFIG = {
+    'enabled': False,
+    'reward': 'effectiveness',  # effectiveness (fractional Bernoulli) or success
+    'concurrent_calls': 3,  # Calls run in parallel per iteration, each on a sampled variant
+    'max_arms': 4,  # Live prompt variants
+    'spawn_every': 3,  # Resolved calls between new variants
+    'min_pulls_to_retire': 4,
+    'retire_probability': 0.05,  # Retire arms less likely than this to be the best
+    'prior': [1.0, 1.0],  # Beta prior for new arms
+    'posterior_samples': 2000,
+    'history_size': 10,  # Recent calls kept per arm for (mini-batch) learning
+    'seed': None
+}
+
+def prompt_content(prompt: AgentPrompt) -> Tuple[str, Tuple[str, ...], str]:
+    """What a caller hears from a prompt (intro, benefits, call to action)"""
+    return prompt.intro, tuple(prompt.benefits), prompt.call_to_action
+
+class PromptArm:
+    """One live prompt variant and its Beta posterior"""
+
+    def __init__(self, prompt: AgentPrompt, prior: List[float], parent_version: Optional[int] = None,
+                 history_size: int = DEFAULT_BANDIT_CONFIG['history_size']):
+        self.prompt = prompt
+        self.parent_version = parent_version
+        self.alpha, self.beta = float(prior[0]), float(prior[1])
+        self.pulls = 0
+        self.pending = 0
+        self.successes = 0
+        self.effectiveness_sum = 0.0
+        self.history = deque(maxlen=max(1, history_size))  # (analysis, conversation) of recent calls
+
+    @property
+    def version(self) -> int:
+        return self.prompt.version
+
+    @property
+    def mean(self) -> float:
+        return self.alpha / (self.alpha + self.beta)
+
+    @property
+    def last_analysis(self) -> Optional[CallAnalysis]:
+        return self.history[-1][0] if self.history else None
+
+    @property
+    def last_conversation(self) -> List[str]:
+        return self.history[-1][1] if self.history else []
+
+    def recent(self, calls: int) -> Tuple[List[CallAnalysis], List[List[str]]]:
+        """Analyses and conversations of up to the last ``calls`` calls"""
+        history = list(self.history)[-calls:]
+        return [analysis for analysis, _ in history], [conversation for _, conversation in history]
+
+    def observe(self, reward: float, analysis: CallAnalysis, conversation: Optional[List[str]] = None):
+        """Fold one call result into the posterior"""
+        self.alpha += reward
+        self.beta += 1.0 - reward
+        self.pulls += 1
+        self.successes += int(analysis.call_outcome.value == 'success')
+        self.effectiveness_sum += analysis.agent_effectiveness
+        self.history.append((analysis, list(conversation or [])))
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': self.version,
+            'parent_version': self.parent_version,
+            'pulls': self.pulls,
+            'pending': self.pending,
+            'success_rate': self.successes / self.pulls if self.pulls else None,
+            'average_effectiveness': self.effectiveness_sum / self.pulls if self.pulls else None,
+            'posterior_mean': self.mean
+        }
+
+class PromptBandit:
+    """Thompson sampling over a pool of live AgentPrompt variants
+
+    Each call samples every arm's Beta posterior and takes the best draw,
+    so concurrent calls spread over the variants that could still be best
+    instead of queueing behind one prompt. Rewards are call effectiveness
+    (as a fractional success) or the success outcome. New variants come
+    from the reinforcement engine applied to the current best arm; arms
+    that are very unlikely to be the best are retired.
+    """
+
+    def __init__(self, initial_prompts: List[AgentPrompt], config: Optional[Dict] = None,
+                 version_counter: Optional[Iterator[int]] = None,
+                 priors: Optional[Dict[int, List[float]]] = None):
+        self.config = {**DEFAULT_BANDIT_CONFIG, **(config or {})}
+        self.version_counter = version_counter  # Shared when several bandits must not reuse versions
+        self.rng = np.random.default_rng(self.config['seed'])
+        self.logger = logging.getLogger(__name__)
+        self.arms: Dict[int, PromptArm] = {}
+        self.retired: List[Dict] = []
+        self.next_version = 1
+        self.resolved_since_spawn = 0
+        self.metrics = {
+            'selections': 0,
+            'resolved': 0,
+            'variants_added': 0,
+            'duplicates_skipped': 0,
+            'variants_retired': 0
+        }
+
+        for prompt in initial_prompts:
+            self.add_variant(prompt, prior=(priors or {}).get(prompt.version))
+
+    def select(self, explore: bool = True) -> AgentPrompt:
+        """Pick the prompt for the next call by Thompson sampling (the best arm without exploration)"""
+        if explore:
+            arms = list(self.arms.values())
+            draws = self.rng.beta([arm.alpha for arm in arms], [arm.beta for arm in arms])
+            arm = arms[int(np.argmax(draws))]
+        else:
+            arm = self.best_arm()
+        arm.pending += 1
+        self.metrics['selections'] += 1
+        return arm.prompt
+
+    def record(self, version: int, analysis: CallAnalysis, conversation: Optional[List[str]] = None):
+        """Update the posterior of the arm that handled a call"""
+        arm = self.arms.get(version)
+        if arm is None:  # Retired while the call was running
+            return
+
+        arm.observe(self.reward(analysis), analysis, conversation)
+        arm.pending = max(0, arm.pending - 1)
+
+        self.resolved_since_spawn += 1
+        self.metrics['resolved'] += 1
+
+    def reward(self, analysis: CallAnalysis) -> float:
+        """Call reward in [0, 1] under the configured reward"""
+        if self.config['reward'] == 'success':
+            return float(analysis.call_outcome.value == 'success')
+        return float(analysis.agent_effectiveness)
+
+    def probability_best(self) -> Dict[int, float]:
+        """Monte Carlo probability that each arm has the highest mean reward"""
+        arms = list(self.arms.values())
+        samples = self.rng.beta(
+            np.array([arm.alpha for arm in arms])[:, None],
+            np.array([arm.beta for arm in arms])[:, None],
+            size=(len(arms), self.config['posterior_samples'])
+        )
+        wins = np.bincount(samples.argmax(axis=0), minlength=len(arms)) / samples.shape[1]
+        return {arm.version: float(p) for arm, p in zip(arms, wins)}
+
+    def best_arm(self) -> PromptArm:
+        """Tried arm with the highest posterior mean (any arm before the first call resolves)"""
+        tried = [arm for arm in self.arms.values() if arm.pulls] or list(self.arms.values())
+        return max(tried, key=lambda arm: arm.mean)
+
+    def needs_variant(self) -> bool:
+        """Whether it is time to add a new variant"""
+        return (len(self.arms) < self.config['max_arms'] and
+                self.resolved_since_spawn >= self.config['spawn_every'])
+
+    def duplicate_of(self, prompt: AgentPrompt) -> Optional[int]:
+        """Version of a live arm with the same content as a prompt, if any"""
+        content = prompt_content(prompt)
+        return next((version for version, arm in self.arms.items() if prompt_content(arm.prompt) == content), None)
+
+    def add_variant(self, prompt: AgentPrompt, parent_version: Optional[int] = None,
+                    prior: Optional[List[float]] = None) -> Optional[AgentPrompt]:
+        """Add a variant to the pool, renumbering its version if already taken
+
+        With a shared version counter, learned variants (those with a parent)
+        are numbered from the counter and seed prompts keep their versions,
+        so a version means the same prompt in every bandit sharing it. A
+        learned variant with the same content as a live arm is skipped
+        (None is returned), since it would only split that arm's evidence.
+        """
+        if parent_version is not None:
+            duplicate = self.duplicate_of(prompt)
+            if duplicate is not None:
+                self.metrics['duplicates_skipped'] += 1
+                self.logger.info(f"🎰 Skipped variant from v{parent_version}: same content as v{duplicate}")
+                return None
+
+        if self.version_counter is not None:
+            if parent_version is not None:
+                prompt = dataclasses.replace(prompt, version=next(self.version_counter))
+            elif prompt.version in self.arms:
+                raise ValueError(f"Prompt version v{prompt.version} is already in the pool")
+        elif prompt.version in self.arms or prompt.version < self.next_version:
+            prompt = dataclasses.replace(prompt, version=self.next_version)
+        self.next_version = max(self.next_version, prompt.version + 1)
+
+        self.arms[prompt.version] = PromptArm(prompt, prior or self.config['prior'], parent_version,
+                                              self.config['history_size'])
+        self.resolved_since_spawn = 0
+        self.metrics['variants_added'] += 1
+        if parent_version is not None:
+            self.logger.info(f"🎰 Added prompt variant v{prompt.version} (from v{parent_version})")
+        return prompt
+
+    def retire(self) -> List[int]:
+        """Retire sufficiently tried arms that are very unlikely to be the best
+
+        When the pool is full the weakest tried arm is also retired, so a
+        new variant can join.
+        """
+        if len(self.arms) <= 1:
+            return []
+
+        p_best = self.probability_best()
+        best_version = self.best_arm().version
+        candidates = [arm for version, arm in self.arms.items()
+                      if version != best_version and arm.pulls >= self.config['min_pulls_to_retire']]
+
+        to_retire = [arm for arm in candidates if p_best[arm.version] < self.config['retire_probability']]
+        if len(self.arms) - len(to_retire) >= self.config['max_arms'] and len(to_retire) < len(candidates):
+            to_retire.append(min((arm for arm in candidates if arm not in to_retire), key=lambda arm: arm.mean))
+
+        for arm in to_retire:
+            self.retired.append({**arm.to_dict(), 'probability_best': p_best[arm.version]})
+            del self.arms[arm.version]
+            self.metrics['variants_retired'] += 1
+            self.logger.info(f"🎰 Retired prompt variant v{arm.version} (P(best) {p_best[arm.version]:.3f})")
+        return [arm.version for arm in to_retire]
+
+    def get_stats(self) -> Dict:
+        """Get pool, allocation and retirement statistics"""
+        p_best = self.probability_best() if self.arms else {}
+        return {
+            **self.metrics,
+            'best_version': self.best_arm().version if self.arms else None,
+            'arms': [{**arm.to_dict(), 'probability_best': p_best.get(arm.version)} for arm in self.arms.values()],
+            'retired': list(self.retired)
+        }
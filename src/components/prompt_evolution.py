@@ -0,0 +1,392 @@
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..models.data_models import AgentPrompt
+from ..utils.helpers import load_json_data, save_json_data
+from .conversation_simulator import ConversationSimulator
+from .voice_agent import VoiceAgent
+
+DEFAULT_EVOLUTION_CONFIG = {
+    'population_size': 24,
+    'generations': 15,
+    'crossover_rate': 0.7,
+    'mutation_rate': 0.8,  # Chance a child is mutated (children identical to a parent always are)
+    'tournament_size': 2,
+    'conversations': 20000,  # Simulated calls per fitness evaluation
+    'max_turns': 5,
+    'max_intro_sentences': 4,
+    'max_benefits': 5,
+    'workers': None,  # Worker processes (default: all cores, 1 evaluates in-process)
+    'checkpoint_dir': "data/output/evolution",
+    'seed': 7
+}
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence for sentence in re.split(r'(?<=[.!?])\s+', text.strip()) if sentence]
+
+def genome_key(prompt: AgentPrompt) -> str:
+    """Content hash of the evolved segments (versions and lineage excluded)"""
+    payload = json.dumps([prompt.intro, list(prompt.benefits), prompt.call_to_action], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def prompt_to_dict(prompt: AgentPrompt) -> Dict:
+    return {
+        'version': prompt.version,
+        'intro': prompt.intro,
+        'benefits': list(prompt.benefits),
+        'call_to_action': prompt.call_to_action,
+        'improvements': list(prompt.improvements),
+        'tone_instructions': prompt.tone_instructions,
+        'conversation_style': prompt.conversation_style
+    }
+
+def prompt_from_dict(data: Dict) -> AgentPrompt:
+    return AgentPrompt(**{key: value for key, value in data.items() if key != 'created_at'})
+
+def _simulate_fitness(task: Tuple[AgentPrompt, Dict, int, int, int]) -> Dict:
+    """Worker: simulated outcome summary of one prompt over the persona mix"""
+    prompt, personas, conversations, max_turns, seed = task
+    simulator = ConversationSimulator(max_turns=max_turns, seed=seed)
+    return simulator.evaluate_prompt(prompt, personas, conversations)['overall']
+
+def non_dominated_fronts(points: List[Tuple[float, float]]) -> List[List[int]]:
+    """Fronts of (effectiveness to maximize, length to minimize) points, best first"""
+    def dominates(a: Tuple[float, float], b: Tuple[float, float]) -> bool:
+        return a[0] >= b[0] and a[1] <= b[1] and a != b
+
+    dominated_by = [[j for j in range(len(points)) if dominates(points[i], points[j])] for i in range(len(points))]
+    domination_count = [sum(dominates(points[j], points[i]) for j in range(len(points))) for i in range(len(points))]
+
+    fronts = [[i for i, count in enumerate(domination_count) if count == 0]]
+    while fronts[-1]:
+        next_front = []
+        for i in fronts[-1]:
+            for j in dominated_by[i]:
+                domination_count[j] -= 1
+                if domination_count[j] == 0:
+                    next_front.append(j)
+        fronts.append(next_front)
+    return fronts[:-1]
+
+def crowding_distances(front: List[int], points: List[Tuple[float, float]]) -> Dict[int, float]:
+    """NSGA-II crowding distance of each point within its front"""
+    distance = {i: 0.0 for i in front}
+    for objective in range(2):
+        ordered = sorted(front, key=lambda i: points[i][objective])
+        span = points[ordered[-1]][objective] - points[ordered[0]][objective]
+        distance[ordered[0]] = distance[ordered[-1]] = float('inf')
+        if span > 0:
+            for previous, current, following in zip(ordered, ordered[1:], ordered[2:]):
+                distance[current] += (points[following][objective] - points[previous][objective]) / span
+    return distance
+
+class PromptEvolution:
+    """Multi-objective evolutionary search over AgentPrompt segments
+
+    Individuals are prompts built from intro sentences, a benefit list and a
+    call-to-action. Mutation inserts, drops or replaces segments drawn from
+    the improvement templates (and the seed prompts); crossover splices the
+    intro and benefit lists of two parents. Fitness is the simulated
+    effectiveness over the persona mix, evaluated in parallel worker
+    processes with the same random stream for every prompt, against the
+    spoken length of the opening message. Survivors are chosen NSGA-II
+    style (non-dominated rank, then crowding distance) and every generation
+    is checkpointed so a search can be resumed.
+    """
+
+    def __init__(self, seed_prompts: Sequence[AgentPrompt], improvement_templates: Dict,
+                 personas: Dict[str, Dict], config: Optional[Dict] = None):
+        self.config = {**DEFAULT_EVOLUTION_CONFIG, **(config or {})}
+        self.personas = personas
+        self.rng = random.Random(self.config['seed'])
+        self.logger = logging.getLogger(__name__)
+        self.agent = VoiceAgent(audio_processor=None, farmer_persona=None, initial_prompt=None)
+        self.versions = itertools.count(max(prompt.version for prompt in seed_prompts) + 1)
+        self.seed_prompts = list(seed_prompts)
+        self.population: List[AgentPrompt] = []
+        self.fitness: Dict[str, Dict] = {}  # By genome key, so identical prompts are simulated once
+        self.generation = 0
+        self.history: List[Dict] = []
+
+        trust = improvement_templates.get("trust_building", {})
+        cost = improvement_templates.get("cost_clarity", {})
+        simple = improvement_templates.get("simplification", {})
+        self.intro_pool = self._unique(
+            [trust.get("intro_prefix", "")] + trust.get("trust_statements", []) +
+            simple.get("simple_explanations", []) +
+            [sentence for prompt in seed_prompts for sentence in split_sentences(prompt.intro)]
+        )
+        self.benefit_pool = self._unique(
+            cost.get("cost_explanations", []) + simple.get("simple_explanations", []) +
+            [benefit for prompt in seed_prompts for benefit in prompt.benefits]
+        )
+        self.cta_pool = self._unique(
+            improvement_templates.get("call_to_action", {}).get("options", []) +
+            [prompt.call_to_action for prompt in seed_prompts]
+        )
+
+        self.metrics = {
+            'generations': 0,
+            'evaluations': 0,
+            'fitness_cache_hits': 0,
+            'evaluation_seconds': 0.0
+        }
+
+    @staticmethod
+    def _unique(items: List[str]) -> List[str]:
+        return list(dict.fromkeys(item.strip() for item in items if item and item.strip()))
+
+    # Variation
+
+    def _child(self, parent: AgentPrompt, intro: List[str], benefits: List[str], call_to_action: str,
+               changes: List[str]) -> AgentPrompt:
+        return AgentPrompt(
+            intro=" ".join(intro),
+            benefits=benefits,
+            call_to_action=call_to_action,
+            version=next(self.versions),
+            improvements=changes,
+            tone_instructions=parent.tone_instructions,
+            conversation_style=parent.conversation_style
+        )
+
+    def mutate(self, prompt: AgentPrompt) -> AgentPrompt:
+        """Apply one or two segment edits"""
+        intro, benefits, call_to_action = split_sentences(prompt.intro), list(prompt.benefits), prompt.call_to_action
+        changes = list(prompt.improvements)
+
+        for _ in range(self.rng.choice([1, 1, 2])):
+            operation = self.rng.choice(['add_intro', 'drop_intro', 'add_benefit', 'drop_benefit',
+                                         'replace_benefit', 'replace_cta'])
+            if operation == 'add_intro' and len(intro) < self.config['max_intro_sentences']:
+                options = [sentence for sentence in self.intro_pool if sentence not in intro]
+                if options:
+                    sentence = self.rng.choice(options)
+                    intro.insert(self.rng.randint(0, len(intro)), sentence)
+                    changes.append(f"Intro: added '{sentence}'")
+            elif operation == 'drop_intro' and len(intro) > 1:
+                changes.append(f"Intro: dropped '{intro.pop(self.rng.randrange(len(intro)))}'")
+            elif operation == 'add_benefit' and len(benefits) < self.config['max_benefits']:
+                options = [benefit for benefit in self.benefit_pool if benefit not in benefits]
+                if options:
+                    benefit = self.rng.choice(options)
+                    benefits.insert(self.rng.randint(0, len(benefits)), benefit)
+                    changes.append(f"Benefits: added '{benefit}'")
+            elif operation == 'drop_benefit' and len(benefits) > 1:
+                changes.append(f"Benefits: dropped '{benefits.pop(self.rng.randrange(len(benefits)))}'")
+            elif operation == 'replace_benefit' and benefits:
+                options = [benefit for benefit in self.benefit_pool if benefit not in benefits]
+                if options:
+                    index = self.rng.randrange(len(benefits))
+                    benefits[index] = self.rng.choice(options)
+                    changes.append(f"Benefits: replaced #{index + 1} with '{benefits[index]}'")
+            elif operation == 'replace_cta':
+                options = [option for option in self.cta_pool if option != call_to_action]
+                if options:
+                    call_to_action = self.rng.choice(options)
+                    changes.append(f"Call-to-action: '{call_to_action}'")
+
+        return self._child(prompt, intro, benefits, call_to_action, changes)
+
+    def crossover(self, first: AgentPrompt, second: AgentPrompt) -> AgentPrompt:
+        """One-point crossover of the intro sentences and benefit lists, call-to-action from either parent"""
+        def splice(a: List[str], b: List[str], limit: int) -> List[str]:
+            child = a[:self.rng.randint(0, len(a))] + b[self.rng.randint(0, len(b)):]
+            return list(dict.fromkeys(child))[:limit] or a[:1]
+
+        intro = splice(split_sentences(first.intro), split_sentences(second.intro), self.config['max_intro_sentences'])
+        benefits = splice(list(first.benefits), list(second.benefits), self.config['max_benefits'])
+        call_to_action = self.rng.choice([first.call_to_action, second.call_to_action])
+        changes = list(first.improvements) + [f"Crossover of v{first.version} and v{second.version}"]
+        return self._child(first, intro, benefits, call_to_action, changes)
+
+    # Fitness
+
+    def opening_length(self, prompt: AgentPrompt) -> int:
+        """Spoken words in the opening message (the call-length objective)"""
+        return len(self.agent._build_opening_message(prompt).split())
+
+    def evaluate(self, prompts: Sequence[AgentPrompt], executor: Optional[ProcessPoolExecutor] = None):
+        """Simulate every prompt not yet in the fitness cache"""
+        pending = {}
+        for prompt in prompts:
+            key = genome_key(prompt)
+            if key in self.fitness or key in pending:
+                self.metrics['fitness_cache_hits'] += 1
+            else:
+                pending[key] = prompt
+        if not pending:
+            return
+
+        start = time.perf_counter()
+        tasks = [(prompt, self.personas, self.config['conversations'], self.config['max_turns'], self.config['seed'])
+                 for prompt in pending.values()]
+        if executor:
+            results = list(executor.map(_simulate_fitness, tasks, chunksize=max(1, len(tasks) // (4 * self._workers()))))
+        else:
+            results = [_simulate_fitness(task) for task in tasks]
+
+        for (key, prompt), overall in zip(pending.items(), results):
+            self.fitness[key] = {
+                'effectiveness': overall['effectiveness_mean'],
+                'success_rate': overall['success_rate'],
+                'average_turns': overall['average_turns'],
+                'opening_words': self.opening_length(prompt)
+            }
+        self.metrics['evaluations'] += len(pending)
+        self.metrics['evaluation_seconds'] += time.perf_counter() - start
+
+    def _points(self, prompts: Sequence[AgentPrompt]) -> List[Tuple[float, float]]:
+        return [(self.fitness[genome_key(prompt)]['effectiveness'], self.fitness[genome_key(prompt)]['opening_words'])
+                for prompt in prompts]
+
+    def _ranking(self, prompts: Sequence[AgentPrompt]) -> Dict[int, Tuple[int, float]]:
+        """(front rank, crowding distance) per index"""
+        points = self._points(prompts)
+        ranking = {}
+        for rank, front in enumerate(non_dominated_fronts(points)):
+            for index, distance in crowding_distances(front, points).items():
+                ranking[index] = (rank, distance)
+        return ranking
+
+    def _select(self, prompts: List[AgentPrompt], size: int) -> List[AgentPrompt]:
+        """Best ``size`` distinct prompts by front rank, then crowding distance"""
+        distinct = {}
+        for prompt in prompts:
+            distinct.setdefault(genome_key(prompt), prompt)
+        distinct = list(distinct.values())
+        ranking = self._ranking(distinct)
+        order = sorted(range(len(distinct)), key=lambda index: (ranking[index][0], -ranking[index][1]))
+        return [distinct[index] for index in order[:size]]
+
+    def _tournament(self, ranking: Dict[int, Tuple[int, float]]) -> AgentPrompt:
+        contestants = self.rng.sample(range(len(self.population)),
+                                      min(self.config['tournament_size'], len(self.population)))
+        winner = min(contestants, key=lambda index: (ranking[index][0], -ranking[index][1]))
+        return self.population[winner]
+
+    # Search
+
+    def _initialize(self, executor: Optional[ProcessPoolExecutor]):
+        population = list(self.seed_prompts)
+        while len(population) < self.config['population_size']:
+            population.append(self.mutate(self.rng.choice(self.seed_prompts)))
+        self.evaluate(population, executor)
+        self.population = self._select(population, self.config['population_size'])
+
+    def step(self, executor: Optional[ProcessPoolExecutor] = None):
+        """Breed, evaluate and select one generation"""
+        ranking = self._ranking(self.population)
+        parent_keys = {genome_key(prompt) for prompt in self.population}
+
+        offspring = []
+        while len(offspring) < self.config['population_size']:
+            parent = self._tournament(ranking)
+            if self.rng.random() < self.config['crossover_rate']:
+                child = self.crossover(parent, self._tournament(ranking))
+            else:
+                child = parent
+            if child is parent or genome_key(child) in parent_keys or self.rng.random() < self.config['mutation_rate']:
+                child = self.mutate(child)
+            offspring.append(child)
+
+        self.evaluate(offspring, executor)
+        self.population = self._select(self.population + offspring, self.config['population_size'])
+        self.generation += 1
+        self.metrics['generations'] += 1
+
+        front = self.pareto_front()
+        best = max(front, key=lambda row: row['effectiveness'])
+        self.history.append({
+            'generation': self.generation,
+            'front_size': len(front),
+            'best_effectiveness': best['effectiveness'],
+            'best_opening_words': best['opening_words'],
+            'shortest_opening_words': min(row['opening_words'] for row in front)
+        })
+        self.logger.info(f"🧬 Generation {self.generation}: {len(front)} prompts on the Pareto front, best "
+                         f"effectiveness {best['effectiveness']:.3f} ({best['opening_words']} words)")
+
+    def _workers(self) -> int:
+        return self.config['workers'] or os.cpu_count() or 1
+
+    def run(self, generations: Optional[int] = None) -> List[Dict]:
+        """Evolve for the configured generations (continuing a resumed search) and return the Pareto front"""
+        target = self.generation + (generations or self.config['generations'])
+        workers = self._workers()
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            if not self.population:
+                self._initialize(executor)
+                self.checkpoint()
+            while self.generation < target:
+                self.step(executor)
+                self.checkpoint()
+        finally:
+            if executor:
+                executor.shutdown()
+        return self.pareto_front()
+
+    def pareto_front(self) -> List[Dict]:
+        """Non-dominated prompts of the population, shortest opening first"""
+        points = self._points(self.population)
+        front = non_dominated_fronts(points)[0]
+        rows = [{**self.fitness[genome_key(self.population[index])], 'prompt': prompt_to_dict(self.population[index])}
+                for index in front]
+        return sorted(rows, key=lambda row: (row['opening_words'], -row['effectiveness']))
+
+    # Checkpoints
+
+    def checkpoint(self) -> Optional[Path]:
+        """Save the generation's population, fitness cache and RNG state"""
+        checkpoint_dir = Path(self.config['checkpoint_dir'])
+        state = {
+            'generation': self.generation,
+            'config': self.config,
+            'rng_state': self.rng.getstate(),
+            'next_version': next(self.versions),
+            'population': [prompt_to_dict(prompt) for prompt in self.population],
+            'fitness': self.fitness,
+            'history': self.history,
+            'pareto_front': self.pareto_front()
+        }
+        self.versions = itertools.count(state['next_version'])
+
+        path = checkpoint_dir / f"generation_{self.generation:03d}.json"
+        if save_json_data(state, path) and save_json_data(state, checkpoint_dir / "latest.json"):
+            return path
+        return None
+
+    def restore(self, path: Optional[str] = None) -> bool:
+        """Continue from a checkpoint (the latest one by default)"""
+        state = load_json_data(path or Path(self.config['checkpoint_dir']) / "latest.json")
+        if not state:
+            return False
+
+        version, internal_state, gauss_next = state['rng_state']
+        self.rng.setstate((version, tuple(internal_state), gauss_next))
+        self.generation = state['generation']
+        self.versions = itertools.count(state['next_version'])
+        self.population = [prompt_from_dict(data) for data in state['population']]
+        self.fitness = state['fitness']
+        self.history = state['history']
+        self.logger.info(f"🧬 Resumed prompt search at generation {self.generation}")
+        return True
+
+    def get_stats(self) -> Dict:
+        """Get search progress statistics"""
+        return {
+            **self.metrics,
+            'population_size': len(self.population),
+            'distinct_prompts_evaluated': len(self.fitness),
+            'history': list(self.history)
+        }
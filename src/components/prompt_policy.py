@@ -0,0 +1,131 @@
+import itertools
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from ..models.data_models import AgentPrompt, CallAnalysis, FarmerProfile
+from .prompt_bandit import DEFAULT_BANDIT_CONFIG, PromptArm, PromptBandit
+
+DEFAULT_POLICY_CONFIG = {
+    'enabled': False,
+    'segment_by': 'persona',  # persona (persona_type, else profile buckets), profile (buckets) or none
+    'skepticism_buckets': [0.4, 0.7],  # Upper bounds of the low and medium buckets
+    'prior_weight': 0.5,  # Share of the pooled evidence a new segment starts with
+    'max_prior_pulls': 6,  # Cap on that evidence, so segments can diverge quickly
+    'prior_arms': 2  # Best pooled prompts a new segment starts from
+}
+
+def skepticism_bucket(skepticism: float, bounds: List[float]) -> str:
+    if skepticism < bounds[0]:
+        return 'low'
+    return 'medium' if skepticism < bounds[1] else 'high'
+
+def segment_key(profile: FarmerProfile, config: Dict) -> str:
+    """Segment a farmer belongs to under the configured segmentation"""
+    if config['segment_by'] == 'none':
+        return 'all'
+    if config['segment_by'] == 'persona' and profile.persona_type:
+        return profile.persona_type
+    skepticism = skepticism_bucket(profile.skepticism, config['skepticism_buckets'])
+    return f"{profile.education.value}_education/{profile.income.value}_income/{skepticism}_skepticism"
+
+class ContextualPromptPolicy:
+    """Per-segment prompt bandits with a shared prior for cold starts
+
+    Farmers are segmented by persona type or by education, income and
+    skepticism buckets. Each segment runs its own PromptBandit, so what works
+    for skeptical low-education farmers never overwrites what works for
+    progressive ones, and segments learn concurrently. Every result is also
+    pooled per prompt version across segments; a segment seen for the first
+    time starts from the best pooled prompts with a shrunk copy of their
+    pooled posteriors.
+    """
+
+    def __init__(self, initial_prompt: AgentPrompt, config: Optional[Dict] = None,
+                 bandit_config: Optional[Dict] = None):
+        self.config = {**DEFAULT_POLICY_CONFIG, **(config or {})}
+        self.bandit_config = bandit_config or {}
+        self.logger = logging.getLogger(__name__)
+        self.versions = itertools.count(initial_prompt.version + 1)
+        self.segments: Dict[str, PromptBandit] = {}
+
+        # Pooled evidence per prompt version, the prior for new segments
+        self.pooled: Dict[int, PromptArm] = {}
+        self._pool(initial_prompt)
+
+    def _pool(self, prompt: AgentPrompt, parent_version: Optional[int] = None) -> PromptArm:
+        if prompt.version not in self.pooled:
+            prior = self.bandit_config.get('prior', [1.0, 1.0])
+            history_size = self.bandit_config.get('history_size', DEFAULT_BANDIT_CONFIG['history_size'])
+            self.pooled[prompt.version] = PromptArm(prompt, prior, parent_version, history_size)
+        return self.pooled[prompt.version]
+
+    def _shrunk_prior(self, arm: PromptArm) -> List[float]:
+        """Pooled posterior scaled down to at most max_prior_pulls of evidence"""
+        prior_alpha, prior_beta = self.bandit_config.get('prior', [1.0, 1.0])
+        evidence_alpha, evidence_beta = arm.alpha - prior_alpha, arm.beta - prior_beta
+        evidence = evidence_alpha + evidence_beta
+        if evidence <= 0:
+            return [prior_alpha, prior_beta]
+        scale = min(self.config['prior_weight'], self.config['max_prior_pulls'] / evidence)
+        return [prior_alpha + scale * evidence_alpha, prior_beta + scale * evidence_beta]
+
+    def segment(self, key: str) -> PromptBandit:
+        """Bandit of a segment, created from the pooled prior on first use"""
+        if key not in self.segments:
+            pooled = sorted(self.pooled.values(), key=lambda arm: arm.mean, reverse=True)
+            seeds = pooled[:max(1, self.config['prior_arms'])]
+            self.segments[key] = PromptBandit(
+                [arm.prompt for arm in seeds], self.bandit_config, version_counter=self.versions,
+                priors={arm.version: self._shrunk_prior(arm) for arm in seeds}
+            )
+            self.logger.info(f"🧭 New prompt segment '{key}' seeded with "
+                             f"{', '.join(f'v{arm.version}' for arm in seeds)}")
+        return self.segments[key]
+
+    def select(self, profile: FarmerProfile, explore: bool = True) -> Tuple[str, AgentPrompt]:
+        """Segment and prompt for a call to this farmer"""
+        key = segment_key(profile, self.config)
+        return key, self.segment(key).select(explore)
+
+    def record(self, key: str, version: int, analysis: CallAnalysis, conversation: Optional[List[str]] = None):
+        """Update the segment's bandit and the pooled evidence with a call result"""
+        bandit = self.segment(key)
+        bandit.record(version, analysis, conversation)
+        if version in self.pooled:
+            self.pooled[version].observe(bandit.reward(analysis), analysis, conversation)
+
+    def variant_requests(self) -> List[Tuple[str, PromptArm]]:
+        """(segment, best arm) for every segment due a new variant"""
+        requests = []
+        for key, bandit in self.segments.items():
+            if bandit.needs_variant():
+                best = bandit.best_arm()
+                if best.last_analysis is not None:
+                    requests.append((key, best))
+        return requests
+
+    def add_variant(self, key: str, prompt: AgentPrompt, parent_version: int) -> Optional[AgentPrompt]:
+        """Add a learned variant to a segment (and to the pooled prior), None if it duplicates a live arm"""
+        prompt = self.segment(key).add_variant(prompt, parent_version=parent_version)
+        if prompt:
+            self._pool(prompt, parent_version)
+        return prompt
+
+    def retire(self) -> Dict[str, List[int]]:
+        """Retire weak arms in every segment"""
+        retired = {key: bandit.retire() for key, bandit in self.segments.items()}
+        return {key: versions for key, versions in retired.items() if versions}
+
+    def best_prompt(self) -> AgentPrompt:
+        """Prompt with the best pooled posterior among those tried"""
+        tried = [arm for arm in self.pooled.values() if arm.pulls] or list(self.pooled.values())
+        return max(tried, key=lambda arm: arm.mean).prompt
+
+    def get_stats(self) -> Dict:
+        """Get per-segment bandit statistics and the pooled ranking"""
+        return {
+            'segment_by': self.config['segment_by'],
+            'segments': {key: bandit.get_stats() for key, bandit in self.segments.items()},
+            'pooled': [arm.to_dict() for arm in sorted(self.pooled.values(), key=lambda arm: arm.mean, reverse=True)],
+            'best_version': self.best_prompt().version
+        }
@@ -0,0 +1,374 @@
+import dataclasses
+import difflib
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..models.data_models import AgentPrompt
+
+PROMPT_FIELDS = ['intro', 'benefits', 'call_to_action', 'tone_instructions', 'conversation_style']
+
+def split_intro(text: str) -> Tuple[List[str], List[str]]:
+    """Sentences of an intro and the whitespace around them (one more separator than sentences)"""
+    parts = re.split(r'(?<=[.!?])(\s+)', text)
+    leading = parts[0][:len(parts[0]) - len(parts[0].lstrip())]
+    parts[0] = parts[0][len(leading):]
+    trailing = parts[-1][len(parts[-1].rstrip()):]
+    parts[-1] = parts[-1][:len(parts[-1]) - len(trailing)]
+    sentences, separators = parts[0::2], [leading] + parts[1::2] + [trailing]
+    if sentences == ['']:  # Empty or whitespace-only intro
+        return [], [text]
+    return sentences, separators
+
+def join_intro(sentences: Sequence[str], separators: Optional[Sequence[str]]) -> str:
+    if separators is None:  # Stored before separators were kept
+        return " ".join(sentences)
+    return separators[0] + "".join(sentence + separator for sentence, separator in zip(sentences, separators[1:]))
+
+def copy_prompt(prompt: AgentPrompt) -> AgentPrompt:
+    return dataclasses.replace(prompt, benefits=list(prompt.benefits), improvements=list(prompt.improvements))
+
+def segment_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+class PromptVersionStore:
+    """Persistent, content-addressed history of AgentPrompt versions
+
+    Texts (intro sentences, benefits, call-to-actions, tone, style and
+    improvement notes) are stored once per distinct segment and addressed by
+    hash; a prompt's content is a row of segment hashes addressed by its own
+    hash, so repeated or rolled-back content costs nothing. Each version of a
+    run keeps a parent pointer and only the improvements it added (a learned
+    AgentPrompt carries just its own changes); the full improvement history
+    is rebuilt with one lineage query. Any version is rebuilt with an indexed
+    row lookup (recent ones come from an LRU cache, handed out as copies). Diffs compare segment-hash sequences, and metrics can be
+    attached per version. Backed by SQLite in WAL mode, like the analysis
+    memo.
+    """
+
+    def __init__(self, config: Optional[Dict] = None, run_id: Optional[str] = None):
+        config = config or {}
+        self.path = config.get("path", "data/output/prompt_versions.sqlite")
+        self.run_id = run_id or f"run_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        self.cache_size = config.get("cache_size", 64)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, int], AgentPrompt]" = OrderedDict()
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS segments (
+                hash TEXT PRIMARY KEY,
+                text TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS contents (
+                hash TEXT PRIMARY KEY,
+                segments TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS versions (
+                run_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                parent INTEGER,
+                content TEXT NOT NULL,
+                improvements_base INTEGER,
+                improvements_added TEXT NOT NULL,
+                source TEXT,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (run_id, version)
+            );
+            CREATE TABLE IF NOT EXISTS version_metrics (
+                run_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (run_id, version, name)
+            );
+        """)
+        self._conn.commit()
+
+        self.head: Optional[int] = None
+        self.metrics = {
+            'versions_stored': 0,
+            'segments_written': 0,
+            'segments_reused': 0,
+            'lookups': 0,
+            'cache_hits': 0,
+            'rollbacks': 0
+        }
+
+    # Writing
+
+    def _segments(self, texts: Sequence[str]) -> List[str]:
+        """Store texts as deduplicated segments, returning their hashes"""
+        hashes = [segment_hash(text) for text in texts]
+        for text, key in zip(texts, hashes):
+            inserted = self._conn.execute("INSERT OR IGNORE INTO segments (hash, text) VALUES (?, ?)",
+                                          (key, text)).rowcount
+            self.metrics['segments_written' if inserted else 'segments_reused'] += 1
+        return hashes
+
+    def _content(self, prompt: AgentPrompt) -> str:
+        sentences, separators = split_intro(prompt.intro)
+        structure = {
+            'intro': self._segments(sentences),
+            'intro_separators': separators,
+            'benefits': self._segments(list(prompt.benefits)),
+            'call_to_action': self._segments([prompt.call_to_action]),
+            'tone_instructions': self._segments([prompt.tone_instructions]),
+            'conversation_style': self._segments([prompt.conversation_style])
+        }
+        serialized = json.dumps(structure, sort_keys=True)
+        key = segment_hash(serialized)
+        self._conn.execute("INSERT OR IGNORE INTO contents (hash, segments) VALUES (?, ?)", (key, serialized))
+        return key
+
+    def put(self, prompt: AgentPrompt, parent_version: Optional[int] = None, source: str = "learned") -> str:
+        """Record a version of this run, returning its content hash
+
+        The prompt's improvements are the changes this version made; they
+        extend the parent's history when the parent is stored.
+        """
+        base = parent_version if parent_version is not None and self.exists(parent_version) else None
+
+        with self._lock:
+            content = self._content(prompt)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO versions (run_id, version, parent, content, improvements_base, "
+                "improvements_added, source, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.run_id, prompt.version, parent_version, content, base,
+                 json.dumps(self._segments(list(prompt.improvements))), source, time.time())
+            )
+            self._conn.commit()
+            self._cache.pop((self.run_id, prompt.version), None)
+
+        self.head = prompt.version
+        self.metrics['versions_stored'] += 1
+        return content
+
+    def attach_metrics(self, version: int, metrics: Dict[str, Any]):
+        """Attach (or overwrite) named metrics of a version"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO version_metrics (run_id, version, name, value) VALUES (?, ?, ?, ?)",
+                [(self.run_id, version, name, json.dumps(value, default=str)) for name, value in metrics.items()]
+            )
+            self._conn.commit()
+
+    # Reading
+
+    def exists(self, version: int) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM versions WHERE run_id = ? AND version = ?",
+                                      (self.run_id, version)).fetchone() is not None
+
+    def _texts(self, hashes: Sequence[str]) -> Dict[str, str]:
+        texts = {}
+        unique = list(dict.fromkeys(hashes))
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            rows = self._conn.execute(f"SELECT hash, text FROM segments WHERE hash IN ({','.join('?' * len(chunk))})",
+                                      chunk).fetchall()
+            texts.update(rows)
+        return texts
+
+    def _improvement_hashes(self, version: int, run_id: Optional[str] = None) -> List[str]:
+        """Improvement segment hashes of a version, oldest first (one recursive query)"""
+        run_id = run_id or self.run_id
+        rows = self._conn.execute("""
+            WITH RECURSIVE chain(version, base, added, depth) AS (
+                SELECT version, improvements_base, improvements_added, 0
+                FROM versions WHERE run_id = ? AND version = ?
+                UNION ALL
+                SELECT v.version, v.improvements_base, v.improvements_added, chain.depth + 1
+                FROM versions v JOIN chain ON v.run_id = ? AND v.version = chain.base
+            )
+            SELECT added FROM chain ORDER BY depth DESC
+        """, (run_id, version, run_id)).fetchall()
+        return [key for (added,) in rows for key in json.loads(added)]
+
+    def improvements(self, version: int, run_id: Optional[str] = None) -> List[str]:
+        """Full improvement history of a version, oldest first"""
+        with self._lock:
+            hashes = self._improvement_hashes(version, run_id)
+            texts = self._texts(hashes)
+        return [texts[key] for key in hashes]
+
+    def get(self, version: int, run_id: Optional[str] = None) -> AgentPrompt:
+        """Prompt of a version of this run (or of an earlier run), as it was put"""
+        key = (run_id or self.run_id, version)
+        self.metrics['lookups'] += 1
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.metrics['cache_hits'] += 1
+                return copy_prompt(self._cache[key])
+
+            row = self._conn.execute(
+                "SELECT c.segments, v.improvements_added, v.created_at FROM versions v "
+                "JOIN contents c ON c.hash = v.content WHERE v.run_id = ? AND v.version = ?", key
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Prompt version {version} not found in {key[0]}")
+
+            structure, improvements = json.loads(row[0]), json.loads(row[1])
+            texts = self._texts([key for field_name in PROMPT_FIELDS for key in structure[field_name]] + improvements)
+            prompt = AgentPrompt(
+                intro=join_intro([texts[key] for key in structure['intro']], structure.get('intro_separators')),
+                benefits=[texts[key] for key in structure['benefits']],
+                call_to_action=texts[structure['call_to_action'][0]],
+                version=version,
+                improvements=[texts[key] for key in improvements],
+                tone_instructions=texts[structure['tone_instructions'][0]],
+                conversation_style=texts[structure['conversation_style'][0]],
+                created_at=datetime.fromtimestamp(row[2])
+            )
+
+            self._cache[key] = prompt
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return copy_prompt(prompt)
+
+    def get_metrics(self, version: int) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT name, value FROM version_metrics WHERE run_id = ? AND version = ?",
+                                      (self.run_id, version)).fetchall()
+        return {name: json.loads(value) for name, value in rows}
+
+    def diff(self, old_version: int, new_version: int) -> Dict[str, Any]:
+        """Structural diff between two versions (changed sentences, benefits and fields)"""
+        with self._lock:
+            rows = dict(self._conn.execute(
+                "SELECT v.version, c.segments FROM versions v JOIN contents c ON c.hash = v.content "
+                "WHERE v.run_id = ? AND v.version IN (?, ?)", (self.run_id, old_version, new_version)
+            ).fetchall())
+            old, new = json.loads(rows[old_version]), json.loads(rows[new_version])
+            old_improvements, new_improvements = (self._improvement_hashes(old_version),
+                                                  self._improvement_hashes(new_version))
+            texts = self._texts([key for structure in (old, new) for field_name in PROMPT_FIELDS
+                                 for key in structure[field_name]] + old_improvements + new_improvements)
+
+        changes = {}
+        for field_name in PROMPT_FIELDS:
+            opcodes = difflib.SequenceMatcher(None, old[field_name], new[field_name], autojunk=False).get_opcodes()
+            edits = [{'op': op,
+                      'old': [texts[key] for key in old[field_name][i1:i2]],
+                      'new': [texts[key] for key in new[field_name][j1:j2]]}
+                     for op, i1, i2, j1, j2 in opcodes if op != 'equal']
+            if edits:
+                changes[field_name] = edits
+
+        shared = 0
+        while (shared < min(len(old_improvements), len(new_improvements)) and
+               old_improvements[shared] == new_improvements[shared]):
+            shared += 1
+        added = [texts[key] for key in new_improvements[shared:]]
+        if added:
+            changes['improvements_added'] = added
+        return changes
+
+    def history(self) -> List[Dict[str, Any]]:
+        """Versions of this run with parents, sources, content hashes and metrics"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT version, parent, content, source, created_at FROM versions WHERE run_id = ? ORDER BY version",
+                (self.run_id,)
+            ).fetchall()
+        return [{
+            'version': version,
+            'parent': parent,
+            'content_hash': content,
+            'source': source,
+            'created_at': datetime.fromtimestamp(created_at).isoformat(),
+            'metrics': self.get_metrics(version)
+        } for version, parent, content, source, created_at in rows]
+
+    def lineage(self, version: int, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Versions from the root of a run down to a version, with their sources"""
+        run_id = run_id or self.run_id
+        with self._lock:
+            rows = self._conn.execute("""
+                WITH RECURSIVE chain(version, parent, source, depth) AS (
+                    SELECT version, parent, source, 0 FROM versions WHERE run_id = ? AND version = ?
+                    UNION ALL
+                    SELECT v.version, v.parent, v.source, chain.depth + 1
+                    FROM versions v JOIN chain ON v.run_id = ? AND v.version = chain.parent
+                )
+                SELECT version, source FROM chain ORDER BY depth DESC
+            """, (run_id, version, run_id)).fetchall()
+        return [{'version': row_version, 'source': source} for row_version, source in rows]
+
+    def measured_versions(self, min_calls: int = 1) -> List[Dict[str, Any]]:
+        """Versions of all runs with attached call metrics (at least min_calls calls)"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT calls.run_id, calls.version, calls.value, effectiveness.value, success.value
+                FROM version_metrics calls
+                JOIN version_metrics effectiveness ON effectiveness.run_id = calls.run_id
+                    AND effectiveness.version = calls.version AND effectiveness.name = 'average_effectiveness'
+                LEFT JOIN version_metrics success ON success.run_id = calls.run_id
+                    AND success.version = calls.version AND success.name = 'success_rate'
+                WHERE calls.name = 'calls' AND CAST(calls.value AS INTEGER) >= ?
+            """, (min_calls,)).fetchall()
+        return [{
+            'run_id': run_id,
+            'version': version,
+            'calls': int(json.loads(calls)),
+            'average_effectiveness': float(json.loads(effectiveness)),
+            'success_rate': float(json.loads(success)) if success is not None else None
+        } for run_id, version, calls, effectiveness, success in rows]
+
+    # Rollback
+
+    def rollback(self, version: int, new_version: Optional[int] = None) -> AgentPrompt:
+        """New head version with the content of an earlier one
+
+        Version numbers only move forward, so the rollback is recorded as
+        a child of the target; the content is shared, not copied.
+        """
+        target = self.get(version)
+        if new_version is None:
+            with self._lock:
+                new_version = self._conn.execute("SELECT MAX(version) FROM versions WHERE run_id = ?",
+                                                 (self.run_id,)).fetchone()[0] + 1
+
+        previous = self.head
+        prompt = AgentPrompt(
+            intro=target.intro,
+            benefits=list(target.benefits),
+            call_to_action=target.call_to_action,
+            version=new_version,
+            improvements=[f"Rolled back to v{version} from v{previous}"],
+            tone_instructions=target.tone_instructions,
+            conversation_style=target.conversation_style
+        )
+        self.put(prompt, parent_version=version, source="rollback")
+        self.metrics['rollbacks'] += 1
+        self.logger.info(f"⏪ Prompt rolled back to v{version} content as v{new_version} (was v{previous})")
+        return prompt
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store size and deduplication statistics"""
+        with self._lock:
+            segments, contents, versions = (self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                                            for table in ("segments", "contents", "versions"))
+        return {
+            **self.metrics,
+            'run_id': self.run_id,
+            'head': self.head,
+            'segments': segments,
+            'contents': contents,
+            'versions': versions
+        }
@@ -1,36 +1,156 @@
 import asyncio
-import json
-import re
-from typing import Dict, List, Optional
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
 import openai
 import logging
 
-from ..models.data_models import AgentPrompt, CallAnalysis
+from ..models.data_models import AgentPrompt, CallAnalysis, PromptImprovementAPI
+from ..utils.context_manager import ConversationContextManager
+from ..utils.credentials import CredentialPool
 from ..utils.helpers import PerformanceTracker
+from ..utils.structured_output import (
+    DEFAULT_STRUCTURED_OUTPUT_CONFIG, StructuredOutputError, StructuredOutputParser, function_spec,
+    parse_with_retries, read_completion
+)
+
+DEFAULT_LEARNING_CONFIG = {
+    'max_improvements_per_iteration': 3,  # Cap on changes applied per learning step
+    'learning_rate': 0.1  # Least share of calls an issue must affect to be acted on (see _actionable_issues)
+}
+
+DEFAULT_MINI_BATCH_CONFIG = {
+    'enabled': False,
+    'batch_size': 5,  # Analyzed calls per improvement step
+    'excerpts': 3  # Representative transcripts sent with a batch improvement request
+}
+
+# Issues the rule-based learner fixes, in the order its rules apply
+RULE_ISSUES = ['trust_issues', 'cost_concern', 'confusion', 'negative_sentiment',
+               'process_complexity', 'technical_confusion', 'low_effectiveness']
+LOW_EFFECTIVENESS = 0.4
+
+IMPROVEMENT_JSON_FORMAT = """{
+            "intro": "improved introduction in Hindi",
+            "benefits": ["list", "of", "improved", "benefits", "in", "Hindi"],
+            "call_to_action": "improved CTA in Hindi",
+            "tone_instructions": "how agent should speak",
+            "conversation_style": "conversation approach",
+            "improvements_made": ["list", "of", "specific", "improvements", "applied"]
+        }"""
+
+def call_issues(analysis: CallAnalysis) -> List[str]:
+    """Rule issues shown by one analyzed call"""
+    objections = set(analysis.objections)
+    found = {
+        'trust_issues': 'trust_issues' in objections,
+        'cost_concern': bool(objections & {'cost_concern', 'wants_free'}),
+        'confusion': not analysis.intro_clarity or analysis.interest_level.value == "confused",
+        'negative_sentiment': analysis.sentiment.value == "negative",
+        'process_complexity': 'process_complexity' in objections,
+        'technical_confusion': 'technical_confusion' in objections,
+        'low_effectiveness': analysis.agent_effectiveness < LOW_EFFECTIVENESS
+    }
+    return [issue for issue in RULE_ISSUES if found[issue]]
+
+def aggregate_analyses(analyses: List[CallAnalysis]) -> Dict:
+    """Objection, sentiment, interest, effectiveness and issue statistics over a batch of calls
+    
+    Shares are fractions of the batch's calls. Low effectiveness only counts
+    as an issue when the batch as a whole averages below the threshold.
+    """
+    calls = len(analyses)
+    effectiveness = [analysis.agent_effectiveness for analysis in analyses]
+    
+    def shares(counts: Counter) -> Dict[str, float]:
+        return {label: count / calls for label, count in counts.most_common()}
+    
+    issues = shares(Counter(issue for analysis in analyses for issue in call_issues(analysis)))
+    if sum(effectiveness) / calls >= LOW_EFFECTIVENESS:
+        issues.pop('low_effectiveness', None)
+    
+    return {
+        'calls': calls,
+        'success_rate': sum(analysis.call_outcome.value == "success" for analysis in analyses) / calls,
+        'effectiveness': {
+            'mean': sum(effectiveness) / calls,
+            'min': min(effectiveness),
+            'max': max(effectiveness)
+        },
+        'sentiment': shares(Counter(analysis.sentiment.value for analysis in analyses)),
+        'interest_level': shares(Counter(analysis.interest_level.value for analysis in analyses)),
+        'intro_clarity_rate': sum(analysis.intro_clarity for analysis in analyses) / calls,
+        'objections': shares(Counter(objection for analysis in analyses for objection in set(analysis.objections))),
+        'issues': issues
+    }
 
 class ReinforcementEngine:
     """Enhanced learning engine with LLM-based improvements"""
     
-    def __init__(self, openai_api_key: str, config: Dict, prompts_config: Dict):
+    def __init__(self, openai_api_key: str, config: Dict, prompts_config: Dict,
+                 credential_pool: Optional[CredentialPool] = None,
+                 context_manager: Optional[ConversationContextManager] = None,
+                 learning_config: Optional[Dict] = None):
         self.openai_api_key = openai_api_key
         self.config = config
+        learning_config = learning_config or {}
+        self.learning_config = {key: learning_config.get(key, default)
+                                for key, default in DEFAULT_LEARNING_CONFIG.items()}
+        self.mini_batch_config = {**DEFAULT_MINI_BATCH_CONFIG, **learning_config.get("mini_batch", {})}
+        self.max_improvements = max(1, int(self.learning_config['max_improvements_per_iteration']))
+        self.context_manager = context_manager or ConversationContextManager()
         self.prompts_config = prompts_config
         self.logger = logging.getLogger(__name__)
         self.performance_tracker = PerformanceTracker()
+        self.structured_config = {**DEFAULT_STRUCTURED_OUTPUT_CONFIG,
+                                  **config.get("openai", {}).get("structured_output", {})}
+        self.output_parser = StructuredOutputParser()
+        self.metrics = {
+            'learning_steps': 0,
+            'batch_steps': 0,
+            'calls_learned_from': 0,
+            'historical_calls': 0
+        }
         
-        if openai_api_key:
-            openai.api_key = openai_api_key
-        else:
+        # Issue shares of earlier runs (see warm_start), weighted as prior_calls calls
+        self.history: Optional[Dict] = None
+        self.prior_calls = 0
+        
+        # Keys are passed per request so several keys can share the load
+        self.credential_pool = credential_pool or CredentialPool("openai", [openai_api_key] if openai_api_key else [])
+        if not openai_api_key:
             self.logger.warning("OpenAI API key not provided - using rule-based improvements")
         
         # Load improvement templates
         self.improvement_templates = prompts_config.get("improvement_templates", {})
         self.response_templates = prompts_config.get("response_templates", {})
     
+    def warm_start(self, history: Dict, prior_calls: int = 10):
+        """Seed learning with historical objection and issue statistics"""
+        self.history = history
+        self.prior_calls = prior_calls if history.get('calls') else 0
+        self.metrics['historical_calls'] = history.get('calls', 0)
+        self.logger.info(f"🔥 Reinforcement engine warm-started from {self.metrics['historical_calls']} historical calls")
+    
+    def _history_summary(self) -> str:
+        """Historical statistics for improvement requests (empty without a warm start)"""
+        if not self.history or not self.history.get('calls'):
+            return ""
+        objections = ", ".join(f"{label} ({count})" for label, count in list(self.history['objections'].items())[:5])
+        issues = ", ".join(f"{issue} {share * 100:.0f}%" for issue, share in self.history['issue_shares'].items())
+        return f"""
+        HISTORY OF {self.history['calls']} EARLIER CALLS:
+        - Success Rate: {self.history['success_rate'] * 100:.0f}%, Effectiveness: {self.history['average_effectiveness']:.2f}
+        - Most Common Objections: {objections or 'none'}
+        - Recurring Issues (share of calls): {issues or 'none'}
+        """
+    
     async def learn_and_improve(self, current_prompt: AgentPrompt, analysis: CallAnalysis, 
                               conversation_history: List[str]) -> AgentPrompt:
         """Use LLM to generate improvements based on analysis"""
         
+        self.metrics['learning_steps'] += 1
+        self.metrics['calls_learned_from'] += 1
+        
         if self.openai_api_key:
             try:
                 return await self._llm_based_improvement(current_prompt, analysis, conversation_history)
@@ -40,10 +160,32 @@ class ReinforcementEngine:
         else:
             return self._rule_based_improvement(current_prompt, analysis)
     
+    async def learn_from_batch(self, current_prompt: AgentPrompt, analyses: List[CallAnalysis],
+                               conversations: List[List[str]]) -> AgentPrompt:
+        """One improvement step from the aggregated analyses of a batch of calls"""
+        
+        aggregate = aggregate_analyses(analyses)
+        self.metrics['learning_steps'] += 1
+        self.metrics['batch_steps'] += 1
+        self.metrics['calls_learned_from'] += len(analyses)
+        self.logger.info(f"🧠 Learning from {len(analyses)} calls: effectiveness "
+                         f"{aggregate['effectiveness']['mean']:.2f}, success rate {aggregate['success_rate'] * 100:.0f}%")
+        
+        if self.openai_api_key:
+            try:
+                return await self._llm_based_batch_improvement(current_prompt, analyses, conversations, aggregate)
+            except Exception as e:
+                self.logger.error(f"LLM batch improvement failed: {e}, falling back to rule-based")
+        return self._apply_rules(current_prompt, aggregate['issues'], aggregate['calls'])
+    
     async def _llm_based_improvement(self, current_prompt: AgentPrompt, analysis: CallAnalysis,
                                    conversation_history: List[str]) -> AgentPrompt:
         """Generate improvements using LLM"""
         
+        # Recent turns within the token budget, earlier ones folded into a summary
+        summary, recent_turns, _ = self.context_manager.fit(conversation_history or [], "reinforcement_engine")
+        conversation_sample = f"{summary}\n        {recent_turns}" if summary else f"{recent_turns}"
+        
         improvement_prompt = f"""
         You are an expert in conversation optimization for agricultural outreach in India.
         
@@ -64,17 +206,10 @@ class ReinforcementEngine:
         - Emotional Indicators: {analysis.emotional_indicators}
         
         CONVERSATION SAMPLE:
-        {conversation_history[-6:] if conversation_history else []}
-        
+        {conversation_sample}
+        {self._history_summary()}        
         Generate an improved agent prompt that addresses the issues found. Provide response in JSON:
-        {{
-            "intro": "improved introduction in Hindi",
-            "benefits": ["list", "of", "improved", "benefits", "in", "Hindi"],
-            "call_to_action": "improved CTA in Hindi",
-            "tone_instructions": "how agent should speak",
-            "conversation_style": "conversation approach",
-            "improvements_made": ["list", "of", "specific", "improvements", "applied"]
-        }}
+        {IMPROVEMENT_JSON_FORMAT}
         
         IMPROVEMENT FOCUS:
         - Making Hindi more natural and farmer-friendly
@@ -93,40 +228,142 @@ class ReinforcementEngine:
         - Break down costs clearly if cost concerns
         - Simplify technical terms if confusion detected
         - Add empathy if negative sentiment
+        - Make at most {self.max_improvements} focused improvements, most impactful first
+        """
+        
+        return await self._request_improvement(current_prompt, improvement_prompt)
+    
+    async def _llm_based_batch_improvement(self, current_prompt: AgentPrompt, analyses: List[CallAnalysis],
+                                           conversations: List[List[str]], aggregate: Dict) -> AgentPrompt:
+        """Generate one improvement from a batch's statistics and representative transcripts"""
+        
+        def percentages(shares: Dict[str, float]) -> str:
+            return ", ".join(f"{label} {share * 100:.0f}%" for label, share in shares.items()) or "none"
+        
+        learning_rate = self.learning_config['learning_rate']
+        issues = self._actionable_issues(aggregate['issues'], aggregate['calls'])
+        
+        improvement_prompt = f"""
+        You are an expert in conversation optimization for agricultural outreach in India.
+        
+        CURRENT AGENT PROMPT:
+        Intro: {current_prompt.intro}
+        Benefits: {current_prompt.benefits}
+        Call-to-Action: {current_prompt.call_to_action}
+        Version: {current_prompt.version}
+        Tone Instructions: {current_prompt.tone_instructions}
+        
+        ANALYSIS OF {aggregate['calls']} CALLS:
+        - Success Rate: {aggregate['success_rate'] * 100:.0f}%
+        - Effectiveness: mean {aggregate['effectiveness']['mean']:.2f} (min {aggregate['effectiveness']['min']:.2f}, max {aggregate['effectiveness']['max']:.2f})
+        - Sentiment: {percentages(aggregate['sentiment'])}
+        - Interest Level: {percentages(aggregate['interest_level'])}
+        - Intro Clear In: {aggregate['intro_clarity_rate'] * 100:.0f}% of calls
+        - Objections (share of calls): {percentages(aggregate['objections'])}
+        - Issues in at least {learning_rate * 100:.0f}% of calls{' (with history)' if self.prior_calls else ''}: {percentages(issues)}
+        
+        REPRESENTATIVE CONVERSATIONS:
+        {self._batch_excerpts(analyses, conversations, issues)}
+        {self._history_summary()}        
+        Generate one improved agent prompt that addresses the issues shared across these calls, not the quirks of a single call. Provide response in JSON:
+        {IMPROVEMENT_JSON_FORMAT}
+        
+        GUIDELINES:
+        - Keep Hindi authentic and simple
+        - Use "aap" for respect
+        - Prioritize issues by the share of calls they affect
+        - Keep what already works in the better calls
+        - Make at most {self.max_improvements} focused improvements, most impactful first
+        """
+        
+        return await self._request_improvement(current_prompt, improvement_prompt)
+    
+    def _batch_excerpts(self, analyses: List[CallAnalysis], conversations: List[List[str]],
+                        issues: Dict[str, float]) -> str:
+        """Budgeted transcripts of the weakest call showing each frequent issue, then the weakest calls"""
+        
+        by_effectiveness = sorted(range(len(analyses)), key=lambda index: analyses[index].agent_effectiveness)
+        chosen = []
+        for issue in issues:
+            for index in by_effectiveness:
+                if index not in chosen and issue in call_issues(analyses[index]):
+                    chosen.append(index)
+                    break
+        chosen += [index for index in by_effectiveness if index not in chosen]
+        chosen = chosen[:max(1, self.mini_batch_config['excerpts'])]
+        
+        # Excerpts share the request's history budget
+        budget = self.context_manager.budgets.get("reinforcement_engine", 800)
+        excerpts = []
+        for number, index in enumerate(chosen, 1):
+            analysis = analyses[index]
+            summary, recent_turns, _ = self.context_manager.fit(
+                conversations[index] or [], "reinforcement_engine", reserved_tokens=budget - budget // len(chosen)
+            )
+            objections = ", ".join(analysis.objections) or "none"
+            excerpts.append(f"Call {number} (effectiveness {analysis.agent_effectiveness:.2f}, "
+                            f"outcome {analysis.call_outcome.value}, objections: {objections}):\n        "
+                            + (f"{summary}\n        " if summary else "") + f"{recent_turns}")
+        return "\n\n        ".join(excerpts)
+    
+    async def _request_improvement(self, current_prompt: AgentPrompt, improvement_prompt: str) -> AgentPrompt:
+        """Ask the LLM for an improved prompt with at most max_improvements_per_iteration changes
+        
+        A reply listing more changes is re-asked like an invalid one, since
+        every change in it would be applied.
         """
         
+        params = {
+            "max_tokens": self.config.get("openai", {}).get("max_tokens", 800),
+            "temperature": 0.7
+        }
+        if self.structured_config['function_calling']:
+            params.update(function_spec("update_agent_prompt", "Replace the agent prompt with the improved version",
+                                        PromptImprovementAPI))
+        stream = self.structured_config['stream']
+        
+        async def complete(messages: List[Dict]) -> Tuple[str, Dict]:
+            prompt_tokens = sum(self.context_manager.count_tokens(message['content']) for message in messages)
+            with self.credential_pool.lease() as lease:
+                response = await openai.ChatCompletion.acreate(
+                    model=self.config.get("openai", {}).get("model", "gpt-4"),
+                    messages=messages,
+                    api_key=lease.key,
+                    stream=stream,
+                    **params
+                )
+                return await read_completion(response, stream, self.context_manager.count_tokens, prompt_tokens)
+        
+        def within_cap(improvements: PromptImprovementAPI):
+            if len(improvements.improvements_made) > self.max_improvements:
+                raise StructuredOutputError(
+                    f"{len(improvements.improvements_made)} improvements made, at most {self.max_improvements} "
+                    f"allowed; keep only the most impactful changes in the prompt and in improvements_made"
+                )
+        
         try:
-            response = await openai.ChatCompletion.acreate(
-                model=self.config.get("openai", {}).get("model", "gpt-4"),
-                messages=[{"role": "user", "content": improvement_prompt}],
-                max_tokens=self.config.get("openai", {}).get("max_tokens", 800),
-                temperature=0.7
+            # Validated against the schema; truncated JSON is repaired, unusable replies re-asked
+            improvements, _, _, _ = await parse_with_retries(
+                complete, [{"role": "user", "content": improvement_prompt}], PromptImprovementAPI,
+                self.output_parser, self.structured_config['max_retries'], validate=within_cap
             )
             
-            improvement_text = response.choices[0].message.content.strip()
+            # Create new prompt
+            improvements_made = improvements.improvements_made
+            new_prompt = AgentPrompt(
+                intro=improvements.intro,
+                benefits=improvements.benefits,
+                call_to_action=improvements.call_to_action,
+                version=current_prompt.version + 1,
+                improvements=list(improvements_made),
+                tone_instructions=improvements.tone_instructions or current_prompt.tone_instructions,
+                conversation_style=improvements.conversation_style or current_prompt.conversation_style
+            )
             
-            # Extract JSON
-            json_match = re.search(r'\{.*\}', improvement_text, re.DOTALL)
-            if json_match:
-                improvements = json.loads(json_match.group())
-                
-                # Create new prompt
-                new_prompt = AgentPrompt(
-                    intro=improvements.get('intro', current_prompt.intro),
-                    benefits=improvements.get('benefits', current_prompt.benefits),
-                    call_to_action=improvements.get('call_to_action', current_prompt.call_to_action),
-                    version=current_prompt.version + 1,
-                    improvements=current_prompt.improvements + improvements.get('improvements_made', []),
-                    tone_instructions=improvements.get('tone_instructions', current_prompt.tone_instructions),
-                    conversation_style=improvements.get('conversation_style', current_prompt.conversation_style)
-                )
-                
-                self.performance_tracker.record_api_call("openai", True)
-                self.logger.info(f"🧠 LLM generated {len(improvements.get('improvements_made', []))} improvements")
-                
-                return new_prompt
-            else:
-                raise ValueError("Could not extract JSON from LLM response")
+            self.performance_tracker.record_api_call("openai", True)
+            self.logger.info(f"🧠 LLM generated {len(improvements_made)} improvements")
+            
+            return new_prompt
             
         except Exception as e:
             self.logger.error(f"LLM improvement error: {e}")
@@ -135,73 +372,112 @@ class ReinforcementEngine:
     
     def _rule_based_improvement(self, current_prompt: AgentPrompt, analysis: CallAnalysis) -> AgentPrompt:
         """Fallback rule-based improvements"""
+        return self._apply_rules(current_prompt, {issue: 1.0 for issue in call_issues(analysis)})
+    
+    def _apply_rules(self, current_prompt: AgentPrompt, issues: Dict[str, float], calls: int = 1) -> AgentPrompt:
+        """Apply the rules for the actionable issues, most widespread first
+        
+        Rule order breaks ties; rules stop once max_improvements_per_iteration
+        changes are made.
+        """
         
         new_prompt = AgentPrompt(
             intro=current_prompt.intro,
             benefits=current_prompt.benefits.copy(),
             call_to_action=current_prompt.call_to_action,
             version=current_prompt.version + 1,
-            improvements=current_prompt.improvements.copy(),
+            improvements=[],
             tone_instructions=current_prompt.tone_instructions,
             conversation_style=current_prompt.conversation_style
         )
         
+        actionable = self._actionable_issues(issues, calls)
+        ranked = sorted((issue for issue in RULE_ISSUES if issue in actionable), key=lambda issue: -actionable[issue])
+        
         improvements_made = []
+        for issue in ranked:
+            if len(improvements_made) >= self.max_improvements:
+                break
+            improvement = self._apply_rule(issue, new_prompt)
+            if improvement:
+                improvements_made.append(improvement)
         
-        # Apply rule-based improvements
+        new_prompt.improvements.extend(improvements_made)
+        
+        self.logger.info(f"🧠 Applied {len(improvements_made)} rule-based improvements")
+        
+        return new_prompt
+    
+    def _issue_weight(self, issue: str, share: float, calls: int) -> float:
+        """Issue share blended with its historical share"""
+        if not self.prior_calls:
+            return share
+        prior_share = self.history['issue_shares'].get(issue, 0.0)
+        return (share * calls + prior_share * self.prior_calls) / (calls + self.prior_calls)
+    
+    def _actionable_issues(self, issues: Dict[str, float], calls: int) -> Dict[str, float]:
+        """Issues whose blended weight reaches learning_rate, by weight
+        
+        A step's issue shares are blended with the historical ones (weighted
+        as prior_calls calls after a warm start), so an issue seen in one call
+        but rare across earlier runs is not acted on. Without history the
+        step's own shares decide.
+        """
+        weights = {issue: self._issue_weight(issue, share, calls) for issue, share in issues.items() if share > 0}
+        return {issue: weight for issue, weight in sorted(weights.items(), key=lambda item: -item[1])
+                if weight >= self.learning_config['learning_rate']}
+    
+    def _apply_rule(self, issue: str, new_prompt: AgentPrompt) -> Optional[str]:
+        """Apply the rule for one issue to the prompt, returning the improvement made"""
         
         # 1. Trust building
-        if 'trust_issues' in analysis.objections:
+        if issue == 'trust_issues':
             trust_template = self.improvement_templates.get("trust_building", {})
             intro_prefix = trust_template.get("intro_prefix", "Namaste ji! Main government authorized solar scheme advisor hun.")
             new_prompt.intro = intro_prefix + " " + new_prompt.intro
-            improvements_made.append("Added government authorization and identity for trust building")
+            return "Added government authorization and identity for trust building"
         
         # 2. Cost clarity
-        if 'cost_concern' in analysis.objections or 'wants_free' in analysis.objections:
+        if issue == 'cost_concern':
             cost_template = self.improvement_templates.get("cost_clarity", {})
             cost_explanations = cost_template.get("cost_explanations", [])
             if cost_explanations:
                 new_prompt.benefits = cost_explanations + new_prompt.benefits[1:]
-                improvements_made.append("Emphasized exact cost breakdown and subsidies")
+                return "Emphasized exact cost breakdown and subsidies"
         
         # 3. Simplification
-        if not analysis.intro_clarity or analysis.interest_level.value == "confused":
+        if issue == 'confusion':
             simplification_template = self.improvement_templates.get("simplification", {})
             simple_explanations = simplification_template.get("simple_explanations", [])
             if simple_explanations:
                 new_prompt.intro = "Namaste ji! " + simple_explanations[0]
-                improvements_made.append("Simplified introduction with basic explanation")
+                return "Simplified introduction with basic explanation"
         
         # 4. Tone adjustment
-        if analysis.sentiment.value == "negative":
+        if issue == 'negative_sentiment':
             new_prompt.intro = new_prompt.intro.replace("call kar raha hun", "aapse baat karna chahta hun")
             new_prompt.tone_instructions = "Very polite, patient, build trust first"
-            improvements_made.append("Softened tone and approach for negative sentiment")
+            return "Softened tone and approach for negative sentiment"
         
         # 5. Process clarity
-        if 'process_complexity' in analysis.objections:
+        if issue == 'process_complexity':
             new_prompt.call_to_action = "Kya main aapko simple process WhatsApp pe bhej sakta hun? Sirf 3 steps hain."
-            improvements_made.append("Simplified call-to-action with process clarity")
+            return "Simplified call-to-action with process clarity"
         
         # 6. Technical explanation
-        if 'technical_confusion' in analysis.objections:
+        if issue == 'technical_confusion':
             tech_explanation = "Solar pump matlab sun ki energy se paani nikalne waala pump - bijli ki zarurat nahi."
             new_prompt.intro = new_prompt.intro + " " + tech_explanation
-            improvements_made.append("Added simple technical explanation")
+            return "Added simple technical explanation"
         
         # 7. Effectiveness-based improvements
-        if analysis.agent_effectiveness < 0.4:
+        if issue == 'low_effectiveness':
             # Major overhaul needed
             new_prompt.intro = "Namaste ji! Main government ki PM-KUSUM scheme ke baare mein 2 minute mein batana chahta hun."
             new_prompt.call_to_action = "Kya aap 2 minute sun sakte hain? Ya main WhatsApp pe details bhej dun?"
-            improvements_made.append("Major restructuring due to low effectiveness")
+            return "Major restructuring due to low effectiveness"
         
-        new_prompt.improvements.extend(improvements_made)
-        
-        self.logger.info(f"🧠 Applied {len(improvements_made)} rule-based improvements")
-        
-        return new_prompt
+        return None
     
     def get_improvement_suggestions(self, analysis: CallAnalysis) -> List[str]:
         """Get specific improvement suggestions based on analysis"""
@@ -229,4 +505,12 @@ class ReinforcementEngine:
     
     def get_performance_stats(self) -> Dict:
         """Get reinforcement engine performance statistics"""
-        return self.performance_tracker.get_summary()
\ No newline at end of file
+        stats = self.performance_tracker.get_summary()
+        stats['context_tokens'] = self.context_manager.get_stats().get('reinforcement_engine', {})
+        stats['structured_output'] = self.output_parser.get_stats()
+        stats['learning'] = {
+            **self.metrics,
+            'calls_per_step': (self.metrics['calls_learned_from'] / self.metrics['learning_steps']
+                               if self.metrics['learning_steps'] else 0.0)
+        }
+        return stats
\ No newline at end of file
@@ -0,0 +1,272 @@
+import logging
+import random
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.data_models import AgentPrompt
+from ..utils.helpers import calculate_effectiveness_score, load_json_data
+from ..utils.intent_router import IntentRouter
+from ..utils.keyword_matcher import get_keyword_matcher
+from .response_model import FarmerResponseModel, detect_topics, infer_persona_type
+from .turn_analyzer import IncrementalCallAnalyzer, rule_based_labels
+from .voice_agent import VoiceAgent
+
+DEFAULT_REPLAY_CONFIG = {
+    'log_dirs': ["logs", "data/output/call_logs"],
+    'replays': 4,  # Replays per episode and prompt (same random streams for every prompt)
+    'max_turns': 5,
+    'target_personas': {},  # Persona type -> share of the calls to evaluate for (default: uniform over logged types)
+    'max_weight': 10.0,  # Importance weight clip
+    'confidence': 0.95,
+    'gate_learned_prompts': False,  # Discard learned prompts the replay confidently rates below the current one
+    'seed': 7
+}
+
+@dataclass
+class ReplayEpisode:
+    """A logged call reduced to what replay needs"""
+    episode_id: str
+    persona_type: str
+    agent_version: Optional[int]
+    farmer_responses: List[str]
+    agent_messages: List[Optional[str]]  # None where the logged agent message is unknown
+    logged_effectiveness: Optional[float] = None
+
+class ReplayEvaluator:
+    """Rank candidate prompts offline by replaying logged calls
+
+    Every logged farmer (persona) is called again with each candidate prompt,
+    using VoiceAgent's own opening and follow-up logic. While the agent's
+    message covers the same topics as the logged one, the logged farmer reply
+    is replayed; once the conversation diverges the offline
+    FarmerResponseModel continues it. Calls are scored with the rule-based
+    analysis and the effectiveness formula.
+
+    Candidates are compared with the baseline on the same episodes and random
+    streams, and episodes are importance-weighted from the logged persona mix
+    to the target mix, giving a self-normalized estimate of the expected
+    effectiveness change with a confidence interval. No API calls are made.
+    """
+
+    def __init__(self, episodes: Sequence[ReplayEpisode], response_model: FarmerResponseModel,
+                 intent_router: IntentRouter, config: Optional[Dict] = None,
+                 termination_config: Optional[Dict] = None):
+        self.config = {**DEFAULT_REPLAY_CONFIG, **(config or {})}
+        self.episodes = [episode for episode in episodes if episode.farmer_responses]
+        self.response_model = response_model
+        self.termination_config = termination_config
+        self.keyword_matcher = get_keyword_matcher()
+        self.logger = logging.getLogger(__name__)
+        self.metrics = {
+            'evaluations': 0,
+            'replayed_calls': 0,
+            'replayed_turns': 0,
+            'logged_turns_reused': 0
+        }
+
+        # Message logic only; replays never touch audio or the LLM persona
+        self.agent = VoiceAgent(audio_processor=None, farmer_persona=None, initial_prompt=None,
+                                intent_router=intent_router)
+
+    @classmethod
+    def from_sources(cls, personas_config: Dict, intent_router: IntentRouter, config: Optional[Dict] = None,
+                     response_model: Optional[FarmerResponseModel] = None,
+                     termination_config: Optional[Dict] = None) -> "ReplayEvaluator":
+        """Build an evaluator over session logs and saved call records"""
+        config = {**DEFAULT_REPLAY_CONFIG, **(config or {})}
+        response_model = response_model or FarmerResponseModel.from_sources(
+            personas_config, log_dirs=config['log_dirs'], seed=config['seed']
+        )
+        return cls(cls.load_episodes(config['log_dirs']), response_model, intent_router, config, termination_config)
+
+    @classmethod
+    def load_episodes(cls, log_dirs: Iterable[str]) -> List[ReplayEpisode]:
+        """Episodes from session logs (logs/call_*.json) and saved call records"""
+        episodes = []
+        for log_dir in log_dirs:
+            for log_path in sorted(Path(log_dir).glob("*.json")):
+                record = load_json_data(log_path)
+                if isinstance(record, dict):
+                    episode = cls._episode_from_record(record, log_path.stem)
+                    if episode:
+                        episodes.append(episode)
+        return episodes
+
+    @staticmethod
+    def _episode_from_record(record: Dict, episode_id: str) -> Optional[ReplayEpisode]:
+        profile = record.get("farmer_profile") or {}
+        analysis = record.get("analysis") or {}
+        persona_type = profile.get("persona_type") or infer_persona_type(
+            profile.get("education") or profile.get("education_level"),
+            float(profile.get("skepticism", 0.5))
+        )
+
+        turns = record.get("conversation_turns") or []
+        if turns:
+            farmer_responses = [turn.get("farmer_response", "") for turn in turns]
+            agent_messages = [turn.get("agent_message") for turn in turns]
+        elif isinstance(analysis.get("farmer_responses"), list):
+            # Session logs keep farmer replies only; later agent messages follow from them
+            farmer_responses = list(analysis["farmer_responses"])
+            agent_messages = [None] * len(farmer_responses)
+        else:
+            return None
+
+        return ReplayEpisode(
+            episode_id=record.get("call_id") or record.get("session_id") or episode_id,
+            persona_type=persona_type,
+            agent_version=record.get("agent_version"),
+            farmer_responses=farmer_responses,
+            agent_messages=agent_messages,
+            logged_effectiveness=analysis.get("agent_effectiveness")
+        )
+
+    def _logged_agent_message(self, episode: ReplayEpisode, turn: int) -> Optional[str]:
+        if turn >= len(episode.agent_messages):
+            return None
+        if episode.agent_messages[turn] is None and turn > 0:
+            return self.agent._generate_next_agent_message(episode.farmer_responses[turn - 1], turn - 1, [])
+        return episode.agent_messages[turn]
+
+    def replay(self, episode: ReplayEpisode, prompt: AgentPrompt, seed: int) -> Tuple[float, bool]:
+        """Replay one episode with a prompt, returning (effectiveness, success)"""
+        self.response_model.rng = random.Random(seed)
+        turn_analyzer = IncrementalCallAnalyzer(self.termination_config)
+        state = turn_analyzer.start_call(episode.episode_id)
+        max_turns = self.config['max_turns']
+
+        agent_message = self.agent._build_opening_message(prompt)
+        farmer_responses, context = [], []
+        on_log = True
+
+        for turn in range(max_turns):
+            logged_message = self._logged_agent_message(episode, turn) if on_log else None
+            if logged_message is not None and detect_topics(logged_message) == detect_topics(agent_message):
+                farmer_response = episode.farmer_responses[turn]
+                self.metrics['logged_turns_reused'] += 1
+            else:
+                on_log = False
+                farmer_response = self.response_model.generate(episode.persona_type, agent_message, turn)
+
+            farmer_responses.append(farmer_response)
+            context.extend([agent_message, farmer_response])
+            turn_analyzer.update(state, farmer_response)
+            self.metrics['replayed_turns'] += 1
+
+            if turn < max_turns - 1:
+                agent_message = self.agent._generate_next_agent_message(farmer_response, turn, context)
+            if turn_analyzer.end_reason(state, turn):
+                break
+
+        labels = rule_based_labels(self.keyword_matcher.scan(" ".join(farmer_responses).lower()))
+        effectiveness = calculate_effectiveness_score(
+            labels['sentiment'], labels['interest_level'], labels['objections'],
+            labels['call_outcome'], labels['intro_clarity']
+        )
+        self.metrics['replayed_calls'] += 1
+        return effectiveness, labels['call_outcome'] == 'success'
+
+    def _replay_all(self, prompt: AgentPrompt) -> Tuple[np.ndarray, np.ndarray]:
+        """Mean effectiveness and success rate per episode over the configured replays"""
+        replays = max(1, self.config['replays'])
+        results = np.array([
+            [self.replay(episode, prompt, self.config['seed'] * 1_000_003 + index * replays + replay)
+             for replay in range(replays)]
+            for index, episode in enumerate(self.episodes)
+        ], dtype=float).reshape(len(self.episodes), replays, 2)
+        return results[:, :, 0].mean(axis=1), results[:, :, 1].mean(axis=1)
+
+    def importance_weights(self) -> np.ndarray:
+        """Per-episode weights from the logged persona mix to the target mix (clipped)"""
+        logged = Counter(episode.persona_type for episode in self.episodes)
+        target = self.config['target_personas'] or {persona_type: 1.0 for persona_type in logged}
+        total = sum(target.values())
+
+        weights = np.array([
+            (target.get(episode.persona_type, 0.0) / total) / (logged[episode.persona_type] / len(self.episodes))
+            for episode in self.episodes
+        ])
+        return np.minimum(weights, self.config['max_weight'])
+
+    def _weighted_interval(self, values: np.ndarray, weights: np.ndarray) -> Tuple[float, float, float]:
+        """Self-normalized weighted mean with a normal confidence interval"""
+        estimate = float(np.sum(weights * values) / np.sum(weights))
+        variance = float(np.sum(weights ** 2 * (values - estimate) ** 2) / np.sum(weights) ** 2)
+        half_width = NormalDist().inv_cdf(0.5 + self.config['confidence'] / 2) * variance ** 0.5
+        return estimate, estimate - half_width, estimate + half_width
+
+    def evaluate(self, candidates: Sequence[AgentPrompt], baseline: AgentPrompt) -> Dict:
+        """Rank candidates by their estimated effectiveness change over the baseline"""
+        self.metrics['evaluations'] += 1
+        weights = self.importance_weights()
+        if not self.episodes or not np.sum(weights):
+            self.logger.warning("No logged episodes to replay - candidates left unranked")
+            return {'episodes': 0, 'baseline': None, 'candidates': []}
+
+        base_effectiveness, base_success = self._replay_all(baseline)
+        baseline_effectiveness = self._weighted_interval(base_effectiveness, weights)
+
+        ranked = []
+        for candidate in candidates:
+            effectiveness, success = self._replay_all(candidate)
+            change, change_low, change_high = self._weighted_interval(effectiveness - base_effectiveness, weights)
+            ranked.append({
+                'version': candidate.version,
+                'expected_effectiveness': baseline_effectiveness[0] + change,
+                'effectiveness_change': change,
+                'change_interval': [change_low, change_high],
+                'success_rate': float(np.sum(weights * success) / np.sum(weights))
+            })
+        ranked.sort(key=lambda row: row['effectiveness_change'], reverse=True)
+
+        report = {
+            'episodes': len(self.episodes),
+            'effective_sample_size': float(np.sum(weights) ** 2 / np.sum(weights ** 2)),
+            'baseline': {
+                'version': baseline.version,
+                'expected_effectiveness': baseline_effectiveness[0],
+                'interval': list(baseline_effectiveness[1:]),
+                'success_rate': float(np.sum(weights * base_success) / np.sum(weights))
+            },
+            'candidates': ranked,
+            'calibration': self._calibration(baseline, base_effectiveness, weights)
+        }
+        for row in ranked:
+            self.logger.info(f"🔁 Replay v{row['version']}: effectiveness change {row['effectiveness_change']:+.3f} "
+                             f"[{row['change_interval'][0]:+.3f}, {row['change_interval'][1]:+.3f}] "
+                             f"over v{baseline.version}")
+        return report
+
+    def _calibration(self, baseline: AgentPrompt, replayed: np.ndarray, weights: np.ndarray) -> Optional[Dict]:
+        """Replayed vs. logged effectiveness on episodes logged under the baseline version"""
+        matching = np.array([episode.agent_version == baseline.version and episode.logged_effectiveness is not None
+                             for episode in self.episodes])
+        if not matching.any() or not np.sum(weights[matching]):
+            return None
+        logged = np.array([episode.logged_effectiveness for episode, match in zip(self.episodes, matching) if match],
+                          dtype=float)
+        return {
+            'episodes': int(matching.sum()),
+            'logged_effectiveness': float(np.average(logged, weights=weights[matching])),
+            'replayed_effectiveness': float(np.average(replayed[matching], weights=weights[matching]))
+        }
+
+    def screen(self, candidate: AgentPrompt, baseline: AgentPrompt) -> bool:
+        """Whether a candidate may go live (not confidently worse than the baseline)"""
+        report = self.evaluate([candidate], baseline)
+        if not report['candidates']:
+            return True
+        return report['candidates'][0]['change_interval'][1] >= 0.0
+
+    def get_stats(self) -> Dict:
+        """Get replay statistics"""
+        return {
+            **self.metrics,
+            'episodes': len(self.episodes),
+            'persona_types': dict(Counter(episode.persona_type for episode in self.episodes))
+        }
@@ -0,0 +1,207 @@
+import random
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+from ..utils.helpers import load_json_data
+from ..utils.normalization import normalize_hindi_text
+
+# Conversation topics shared by agent messages and farmer replies
+TOPIC_MARKERS = {
+    'cost': ['cost', 'paisa', 'paise', 'rupaye', 'kitne', 'subsidy', 'free', 'installment', 'roi', 'lakh'],
+    'trust': ['government', 'sach', 'kaun', 'guarantee', 'authorized', 'official', 'jhooth', 'website'],
+    'process': ['process', 'apply', 'kaise', 'steps', 'form', 'documents', 'approval', 'din'],
+    'technical': ['solar', 'pump', 'technical', 'maintenance', 'warranty', 'specification', 'bijli'],
+    'interest': ['interested', 'details', 'benefits', 'next steps', 'register', 'achha']
+}
+
+# Education labels used in older session logs
+EDUCATION_ALIASES = {
+    'primary': 'low', 'none': 'low', 'low': 'low',
+    'secondary': 'medium', 'medium': 'medium',
+    'graduate': 'high', 'postgraduate': 'high', 'high': 'high'
+}
+
+_NORMALIZED_TOPIC_MARKERS = {
+    topic: [normalize_hindi_text(marker) for marker in markers] for topic, markers in TOPIC_MARKERS.items()
+}
+
+_END = None
+
+def detect_topics(text: str) -> Set[str]:
+    """Detect conversation topics mentioned in a message (Devanagari or romanized)"""
+    text = normalize_hindi_text(text)
+    return {topic for topic, markers in _NORMALIZED_TOPIC_MARKERS.items() if any(marker in text for marker in markers)}
+
+def infer_persona_type(education: Optional[str], skepticism: float) -> str:
+    """Infer persona type from raw profile fields (mirrors LLMFarmerPersona._infer_persona_type)"""
+    education = EDUCATION_ALIASES.get(str(education or '').lower(), 'medium')
+    if education == "low" and skepticism > 0.7:
+        return "skeptical_low_education"
+    elif education == "high":
+        return "progressive_high_education"
+    else:
+        return "interested_medium_education"
+
+class _PersonaModel:
+    """Retrieval index plus word-level Markov chain for one persona type"""
+
+    def __init__(self, order: int):
+        self.order = order
+        self.replies: List[str] = []
+        self.by_topic: Dict[str, List[int]] = defaultdict(list)
+        self.by_turn: Dict[int, List[int]] = defaultdict(list)
+        self.starts: List[Tuple[str, ...]] = []
+        self.transitions: Dict[Tuple[str, ...], List[Optional[str]]] = defaultdict(list)
+
+    def add(self, reply: str, turn: Optional[int]):
+        index = len(self.replies)
+        self.replies.append(reply)
+        for topic in detect_topics(reply):
+            self.by_topic[topic].append(index)
+        if turn is not None:
+            self.by_turn[turn].append(index)
+
+        words = reply.split()
+        if len(words) < self.order:
+            return
+        self.starts.append(tuple(words[:self.order]))
+        for i in range(len(words) - self.order + 1):
+            state = tuple(words[i:i + self.order])
+            next_word = words[i + self.order] if i + self.order < len(words) else _END
+            self.transitions[state].append(next_word)
+
+    def candidates(self, topics: Set[str], turn: int) -> List[int]:
+        """Reply indices matching the agent's topics, else the turn position, else all
+
+        Topics are visited in sorted order, so the pool (and the seeded
+        choice from it) does not depend on set iteration order.
+        """
+        matched = [index for topic in sorted(topics) for index in self.by_topic.get(topic, [])]
+        if matched:
+            return matched
+        return self.by_turn.get(turn) or list(range(len(self.replies)))
+
+    def walk(self, seed: Tuple[str, ...], rng: random.Random, max_words: int) -> str:
+        words = list(seed)
+        state = seed
+        while len(words) < max_words:
+            followers = self.transitions.get(state)
+            if not followers:
+                break
+            next_word = rng.choice(followers)
+            if next_word is _END:
+                break
+            words.append(next_word)
+            state = tuple(words[-self.order:])
+        return " ".join(words)
+
+class FarmerResponseModel:
+    """Offline statistical stand-in for the LLM farmer persona
+
+    Trained per persona type from persona response patterns, session logs and
+    saved call records. Replies are conditioned on the agent message topics
+    and the turn number, either retrieved verbatim or generated by a Markov
+    chain seeded from a matching reply. No network access is needed.
+    """
+
+    def __init__(self, order: int = 2, retrieval_weight: float = 0.6, seed: Optional[int] = None,
+                 max_words: int = 30):
+        self.order = order
+        self.retrieval_weight = retrieval_weight
+        self.max_words = max_words
+        self.rng = random.Random(seed)
+        self.models: Dict[str, _PersonaModel] = {}
+        self.fallback = _PersonaModel(order)
+        self.logger = logging.getLogger(__name__)
+        self.metrics = {'training_samples': 0, 'generated': 0, 'retrieved': 0}
+
+    def train(self, samples: Iterable[Tuple[str, str, Optional[int]]]):
+        """Train from (persona_type, farmer_reply, turn_index) samples"""
+        for persona_type, reply, turn in samples:
+            reply = re.sub(r'\s+', ' ', reply or '').strip()
+            if not reply or reply.lower() == "default response":
+                continue
+            if persona_type not in self.models:
+                self.models[persona_type] = _PersonaModel(self.order)
+            self.models[persona_type].add(reply, turn)
+            self.fallback.add(reply, turn)
+            self.metrics['training_samples'] += 1
+
+        self.logger.info(f"📚 Farmer response model trained on {self.metrics['training_samples']} replies "
+                         f"across {len(self.models)} persona types")
+
+    @classmethod
+    def from_sources(cls, personas_config: Dict, log_dirs: Iterable[str] = ("logs", "data/output/call_logs"),
+                     **kwargs) -> "FarmerResponseModel":
+        """Build a model from persona templates, session logs and saved call records"""
+        model = cls(**kwargs)
+        model.train(cls.load_training_samples(personas_config, log_dirs))
+        return model
+
+    @staticmethod
+    def load_training_samples(personas_config: Dict,
+                              log_dirs: Iterable[str]) -> List[Tuple[str, str, Optional[int]]]:
+        """Collect (persona_type, reply, turn) samples from config and JSON logs"""
+        samples = []
+
+        for persona_type, template in personas_config.get("persona_templates", {}).items():
+            patterns = template.get("characteristics", {}).get("response_patterns", [])
+            samples.extend((persona_type, reply, turn) for turn, reply in enumerate(patterns))
+
+        for log_dir in log_dirs:
+            for log_path in sorted(Path(log_dir).glob("*.json")):
+                record = load_json_data(log_path)
+                if isinstance(record, dict):
+                    samples.extend(FarmerResponseModel._samples_from_record(record))
+
+        return samples
+
+    @staticmethod
+    def _samples_from_record(record: Dict) -> List[Tuple[str, str, Optional[int]]]:
+        """Extract samples from a session log or a saved call record"""
+        profile = record.get("farmer_profile", {})
+        persona_type = profile.get("persona_type") or infer_persona_type(
+            profile.get("education") or profile.get("education_level"),
+            float(profile.get("skepticism", 0.5))
+        )
+
+        # Saved call records carry full turns
+        turns = record.get("conversation_turns") or []
+        if turns:
+            return [(persona_type, turn.get("farmer_response", ""), turn.get("turn_number", 1) - 1)
+                    for turn in turns]
+
+        # Session logs only keep farmer responses (often repeated) in the analysis
+        responses = (record.get("analysis") or {}).get("farmer_responses", [])
+        samples = []
+        for turn, reply in enumerate(responses):
+            if turn == 0 or reply != responses[turn - 1]:
+                samples.append((persona_type, reply, turn))
+        return samples
+
+    def generate(self, persona_type: str, agent_message: str, turn: int) -> str:
+        """Generate a farmer reply conditioned on persona, agent message and turn"""
+        model = self.models.get(persona_type) or self.fallback
+        if not model.replies:
+            return "Haan, sun raha hun."
+
+        pool = model.candidates(detect_topics(agent_message), turn)
+        anchor = model.replies[self.rng.choice(pool)]
+
+        if self.rng.random() < self.retrieval_weight or len(anchor.split()) < self.order:
+            self.metrics['retrieved'] += 1
+            return anchor
+
+        self.metrics['generated'] += 1
+        seed = tuple(anchor.split()[:self.order])
+        return model.walk(seed, self.rng, self.max_words)
+
+    def get_stats(self) -> Dict:
+        """Get model statistics"""
+        return {
+            **self.metrics,
+            'persona_types': {name: len(model.replies) for name, model in self.models.items()}
+        }
@@ -0,0 +1,241 @@
+import logging
+from typing import Dict, List, Optional, Set, Union
+
+from ..utils.keyword_matcher import BASE_CATEGORIES, KeywordMatches, get_keyword_matcher
+
+# Rule-based objection labels and the lexicon categories that raise them
+OBJECTION_CATEGORIES = {
+    'cost_concern': 'objection.cost_concern',
+    'wants_free': 'objection.wants_free',
+    'trust_issues': 'objection.trust_issues',
+    'eligibility_doubt': 'objection.eligibility_doubt',
+    'time_constraints': 'objection.time_constraints'
+}
+
+# Reasons a call ends; the last two are early terminations from the running estimate
+END_REASONS = ['rejected', 'agreed', 'call_later', 'max_turns', 'hopeless', 'won']
+
+DEFAULT_TERMINATION_CONFIG = {
+    'enabled': False,
+    'min_turns': 2,  # Never end early before this many turns
+    'hopeless_streak': 2,  # Consecutive negative, low-interest turns before giving up
+    'won_streak': 1,  # Consecutive positive, high-interest turns without objections
+    'max_turn_index': 4  # Static cap (0-based) kept from the keyword rules
+}
+
+class KeywordEvidence:
+    """Lexicon hits accumulated over a conversation, one reply at a time
+
+    Exposes the same keywords()/has() interface as KeywordMatches, so the
+    rules see identical evidence whether built incrementally or in one scan.
+    """
+
+    def __init__(self):
+        self._keywords: Dict[str, Set[str]] = {category: set() for category in BASE_CATEGORIES}
+        self._flags: Set[str] = set()
+        self._order: Dict[str, List[str]] = {}
+
+    def add(self, matches: KeywordMatches):
+        """Fold in the hits of one new reply (O(hits in the reply))"""
+        for category in matches.categories():
+            if category in self._keywords:
+                for keyword in matches.keywords(category):
+                    if keyword not in self._keywords[category]:
+                        self._keywords[category].add(keyword)
+                        self._order.setdefault(category, []).append(keyword)
+            else:
+                self._flags.add(category)
+
+    def keywords(self, category: str) -> List[str]:
+        return list(self._order.get(category, []))
+
+    def has(self, category: str) -> bool:
+        return category in self._flags or bool(self._keywords.get(category))
+
+def rule_based_labels(evidence: Union[KeywordMatches, KeywordEvidence]) -> Dict:
+    """Rule-based call analysis from lexicon evidence"""
+    # Sentiment analysis
+    pos_count = len(evidence.keywords('positive'))
+    neg_count = len(evidence.keywords('negative'))
+
+    if pos_count > neg_count:
+        sentiment = 'positive'
+    elif neg_count > pos_count:
+        sentiment = 'negative'
+    else:
+        sentiment = 'neutral'
+
+    # Interest level analysis
+    confused_count = len(evidence.keywords('confused'))
+    interested_count = len(evidence.keywords('interested'))
+
+    if confused_count > 1:
+        interest_level = 'confused'
+    elif interested_count >= 2:
+        interest_level = 'high'
+    elif interested_count == 1 or pos_count > 0:
+        interest_level = 'medium'
+    else:
+        interest_level = 'low'
+
+    # Intro clarity
+    intro_clarity = not evidence.has('clarity.unclear')
+
+    # Objections detection
+    objections = [label for label, category in OBJECTION_CATEGORIES.items() if evidence.has(category)]
+    if confused_count > 0:
+        objections.append('technical_confusion')
+
+    # Call outcome
+    if evidence.has('outcome.follow_up'):
+        call_outcome = 'follow_up'
+    elif sentiment == 'positive' and interest_level in ['high', 'medium'] and len(objections) <= 1:
+        call_outcome = 'success'
+    elif evidence.has('outcome.failure'):
+        call_outcome = 'failure'
+    else:
+        call_outcome = 'follow_up'
+
+    # Conversation flow
+    conversation_flow = {
+        'farmer_engagement': 'high' if interested_count > 1 else 'medium' if interested_count > 0 else 'low',
+        'question_quality': 'good' if len(objections) > 0 else 'average',
+        'understanding_level': 'confused' if confused_count > 1 else 'clear' if intro_clarity else 'partial'
+    }
+
+    # Emotional indicators
+    emotional_indicators = []
+    if 'trust_issues' in objections:
+        emotional_indicators.append('skeptical')
+    if confused_count > 0:
+        emotional_indicators.append('confused')
+    if sentiment == 'positive':
+        emotional_indicators.append('interested')
+    if 'cost_concern' in objections:
+        emotional_indicators.append('worried')
+
+    return {
+        'sentiment': sentiment,
+        'interest_level': interest_level,
+        'intro_clarity': intro_clarity,
+        'objections': objections,
+        'call_outcome': call_outcome,
+        'conversation_flow': conversation_flow,
+        'emotional_indicators': emotional_indicators
+    }
+
+class TurnAnalysisState:
+    """Running analysis of one call"""
+
+    def __init__(self, call_id: str):
+        self.call_id = call_id
+        self.evidence = KeywordEvidence()
+        self.last_matches: Optional[KeywordMatches] = None
+        self.estimates: List[Dict] = []
+        self.negative_streak = 0
+        self.won_streak = 0
+
+class IncrementalCallAnalyzer:
+    """Per-turn call analysis with early-termination decisions
+
+    Each farmer reply is scanned once and folded into the call's evidence,
+    so updating the sentiment/interest/objection/outcome estimate costs
+    O(new turn). The estimate drives early ending of calls that are already
+    lost or already won, in addition to the explicit reject/agree/call-later
+    phrases.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = {**DEFAULT_TERMINATION_CONFIG, **(config or {})}
+        self.keyword_matcher = get_keyword_matcher()
+        self.logger = logging.getLogger(__name__)
+        self.metrics = {
+            'calls': 0,
+            'turns_analyzed': 0,
+            'early_terminations': 0,
+            'turns_saved': 0,  # Agent turns (and farmer persona replies) not run
+            'tts_characters_saved': 0,
+            'end_reasons': {reason: 0 for reason in END_REASONS}
+        }
+
+    def start_call(self, call_id: str) -> TurnAnalysisState:
+        """Begin tracking a call"""
+        self.metrics['calls'] += 1
+        return TurnAnalysisState(call_id)
+
+    def update(self, state: TurnAnalysisState, farmer_response: str) -> Dict:
+        """Fold one farmer reply into the call estimate and return the new estimate"""
+        matches = self.keyword_matcher.scan(farmer_response)
+        state.evidence.add(matches)
+        state.last_matches = matches
+
+        labels = rule_based_labels(state.evidence)
+        turn_objections = [label for label, category in OBJECTION_CATEGORIES.items() if matches.has(category)]
+
+        if labels['sentiment'] == 'negative' and labels['interest_level'] == 'low':
+            state.negative_streak += 1
+        else:
+            state.negative_streak = 0
+
+        if labels['sentiment'] == 'positive' and labels['interest_level'] == 'high' and not turn_objections:
+            state.won_streak += 1
+        else:
+            state.won_streak = 0
+
+        estimate = {
+            'turn': len(state.estimates) + 1,
+            'sentiment': labels['sentiment'],
+            'interest_level': labels['interest_level'],
+            'objections': labels['objections'],
+            'turn_objections': turn_objections,
+            'predicted_outcome': labels['call_outcome']
+        }
+        state.estimates.append(estimate)
+        self.metrics['turns_analyzed'] += 1
+        return estimate
+
+    def end_reason(self, state: TurnAnalysisState, turn: int) -> Optional[str]:
+        """Reason to end the call after this (0-based) turn, or None to continue"""
+        matches = state.last_matches
+        if matches is not None:
+            # End if farmer clearly rejects, agrees to proceed or asks to call later
+            if matches.has('end.reject'):
+                return 'rejected'
+            if matches.has('end.agree'):
+                return 'agreed'
+            if matches.has('end.call_later'):
+                return 'call_later'
+
+        # End after max turns
+        if turn >= self.config['max_turn_index']:
+            return 'max_turns'
+
+        if not self.config['enabled'] or turn + 1 < self.config['min_turns'] or not state.estimates:
+            return None
+
+        estimate = state.estimates[-1]
+        if estimate['predicted_outcome'] == 'failure' or state.negative_streak >= self.config['hopeless_streak']:
+            return 'hopeless'
+        if estimate['predicted_outcome'] == 'success' and state.won_streak >= self.config['won_streak']:
+            return 'won'
+        return None
+
+    def finish_call(self, state: TurnAnalysisState, reason: Optional[str], turns_used: int,
+                    max_turns: int, characters_per_turn: float = 0.0):
+        """Record how a call ended and what ending early saved"""
+        if reason:
+            self.metrics['end_reasons'][reason] += 1
+        if reason in ('hopeless', 'won'):
+            turns_saved = max(0, min(max_turns, self.config['max_turn_index'] + 1) - turns_used)
+            self.metrics['early_terminations'] += 1
+            self.metrics['turns_saved'] += turns_saved
+            self.metrics['tts_characters_saved'] += int(turns_saved * characters_per_turn)
+            self.logger.info(f"⏹️ Call {state.call_id} ended early ({reason}), {turns_saved} turns saved")
+
+    def get_stats(self) -> Dict:
+        """Get early-termination statistics"""
+        return {
+            **self.metrics,
+            'early_termination_rate': (self.metrics['early_terminations'] / self.metrics['calls']
+                                       if self.metrics['calls'] else 0.0)
+        }
@@ -1,39 +1,96 @@
 import asyncio
+import shutil
+import threading
+from dataclasses import dataclass
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import logging
 
 from ..models.data_models import AgentPrompt, FarmerProfile, ConversationTurn, CallRecord
 from ..utils.helpers import generate_call_id, generate_audio_filename
+from ..utils.intent_router import IntentRouter, reply_id
 from .audio_processor import AudioProcessor
 from .farmer_persona import LLMFarmerPersona
+from .turn_analyzer import IncrementalCallAnalyzer
+
+@dataclass(frozen=True)
+class RenderedMessage:
+    """An opening message with the span of each prompt segment in it"""
+    text: str
+    segments: Tuple[Tuple[str, int, int], ...]  # (intro|benefit|call_to_action, start, end) offsets into text
+    content_hash: str  # Same hash as IntentRouter reply ids, so audio is keyed alike
+
+def render_opening_message(prompt: AgentPrompt) -> RenderedMessage:
+    """Render a prompt's opening message in one join, recording segment boundaries"""
+    pieces = [("intro", prompt.intro), (None, " ")]
+    if prompt.benefits:
+        pieces.append((None, "Main benefits ye hain: "))
+        for benefit in prompt.benefits:
+            pieces.extend([("benefit", benefit), (None, ". ")])
+    pieces.append(("call_to_action", prompt.call_to_action))
+    
+    segments, offset = [], 0
+    for segment, piece in pieces:
+        if segment:
+            segments.append((segment, offset, offset + len(piece)))
+        offset += len(piece)
+    text = "".join(piece for _, piece in pieces)
+    return RenderedMessage(text, tuple(segments), reply_id(text))
 
 class VoiceAgent:
     """Enhanced voice agent with real audio capabilities"""
     
     def __init__(self, audio_processor: AudioProcessor, farmer_persona: LLMFarmerPersona, 
-                 initial_prompt: AgentPrompt):
+                 initial_prompt: AgentPrompt, turn_analyzer: Optional[IncrementalCallAnalyzer] = None,
+                 intent_router: Optional[IntentRouter] = None):
         self.current_prompt = initial_prompt
         self.audio_processor = audio_processor
         self.farmer_persona = farmer_persona
+        self.turn_analyzer = turn_analyzer or IncrementalCallAnalyzer()
+        self.intent_router = intent_router  # Routes from prompts.json; only needed for follow-up messages
+        self.message_audio: Dict[str, str] = {}  # Agent message content hash -> audio file already synthesized
         self.call_history = []
         self.logger = logging.getLogger(__name__)
         
+        # Rendered opening messages per prompt version (dropped on update_prompt)
+        self.render_cache_size = 64
+        self._rendered: Dict[int, Tuple[AgentPrompt, RenderedMessage]] = {}
+        self._render_lock = threading.Lock()
+        self.render_metrics = {'renders': 0, 'render_cache_hits': 0, 'audio_reused': 0}
+        
     async def conduct_voice_call(self, farmer_profile: FarmerProfile, 
                                max_turns: int = 5) -> Tuple[List[str], List[str], List[str]]:
         """Conduct a complete voice call simulation with real audio"""
+        call_record = await self.conduct_call(farmer_profile, max_turns)
+        return (
+            [turn.agent_message for turn in call_record.conversation_turns],
+            [turn.farmer_response for turn in call_record.conversation_turns],
+            call_record.audio_files
+        )
+    
+    async def conduct_call(self, farmer_profile: FarmerProfile, max_turns: int = 5,
+                           prompt: Optional[AgentPrompt] = None) -> CallRecord:
+        """Conduct a voice call and return its record
         
+        ``prompt`` overrides the current prompt for this call only, so calls
+        with different prompt variants can run concurrently.
+        """
+        prompt = prompt or self.current_prompt
         call_id = generate_call_id()
         conversation_turns = []
         agent_messages = []
         farmer_responses = []
         audio_files = []
         conversation_context = []
+        analysis_state = self.turn_analyzer.start_call(call_id)
+        end_reason = None
         
         self.logger.info(f"📞 Starting call {call_id} with {farmer_profile.name}")
         
         # Start conversation
-        current_agent_message = self._build_opening_message()
+        opening = self.render_opening(prompt)
+        current_agent_message = opening.text
         
         for turn in range(max_turns):
             self.logger.info(f"🎤 Turn {turn + 1}/{max_turns}")
@@ -44,15 +101,17 @@ class VoiceAgent:
             
             # Generate audio for agent
             agent_audio_path = generate_audio_filename(call_id, "agent", turn)
-            await self.audio_processor.text_to_speech(current_agent_message, 
-                                                    f"data/temp/{agent_audio_path}")
+            audio_key = opening.content_hash if turn == 0 else reply_id(current_agent_message)
+            await self._synthesize_agent_message(current_agent_message, audio_key,
+                                                 f"data/temp/{agent_audio_path}")
             audio_files.append(agent_audio_path)
             
             # Get farmer response using LLM
             farmer_response = await self.farmer_persona.generate_response(
                 farmer_profile, 
                 current_agent_message,
-                conversation_context
+                conversation_context,
+                conversation_id=call_id
             )
             
             self.logger.info(f"👨‍🌾 Farmer: {farmer_response}")
@@ -64,6 +123,9 @@ class VoiceAgent:
                                                     f"data/temp/{farmer_audio_path}")
             audio_files.append(farmer_audio_path)
             
+            # Update the running analysis with this reply only
+            estimates = self.turn_analyzer.update(analysis_state, farmer_response)
+            
             # Create conversation turn
             turn_record = ConversationTurn(
                 turn_number=turn + 1,
@@ -72,7 +134,8 @@ class VoiceAgent:
                 audio_files={
                     'agent': agent_audio_path,
                     'farmer': farmer_audio_path
-                }
+                },
+                estimates=estimates
             )
             conversation_turns.append(turn_record)
             
@@ -86,98 +149,102 @@ class VoiceAgent:
                 )
             
             # Check if conversation should end
-            if self._should_end_conversation(farmer_response, turn):
-                self.logger.info(f"📞 Call ended naturally at turn {turn + 1}")
+            end_reason = self.turn_analyzer.end_reason(analysis_state, turn)
+            if end_reason:
+                self.logger.info(f"📞 Call ended at turn {turn + 1} ({end_reason})")
                 break
         
+        self.farmer_persona.end_conversation(call_id)
+        characters_per_turn = sum(map(len, agent_messages + farmer_responses)) / max(1, len(conversation_turns))
+        self.turn_analyzer.finish_call(analysis_state, end_reason, len(conversation_turns), max_turns,
+                                       characters_per_turn)
+        
         # Create call record
         call_record = CallRecord(
             call_id=call_id,
             iteration=len(self.call_history) + 1,
             farmer_profile=farmer_profile,
-            agent_version=self.current_prompt.version,
+            agent_version=prompt.version,
+            prompt_hash=opening.content_hash,
             conversation_turns=conversation_turns,
             analysis=None,  # Will be filled by analyzer
             call_start=datetime.now(),
-            audio_files=audio_files
+            audio_files=audio_files,
+            end_reason=end_reason
         )
         
         self.call_history.append(call_record)
         
-        return agent_messages, farmer_responses, audio_files
+        return call_record
     
-    def _build_opening_message(self) -> str:
-        """Build the opening message from current prompt"""
-        message = self.current_prompt.intro + " "
+    def render_opening(self, prompt: Optional[AgentPrompt] = None) -> RenderedMessage:
+        """Rendered opening message of a prompt (the current one by default), memoized per version
+        
+        A cached rendering is only reused for the same prompt object, so
+        unrelated prompts sharing a version number never get each other's
+        message. Prompts must not be edited once they are in use.
+        """
+        prompt = prompt or self.current_prompt
+        with self._render_lock:
+            cached = self._rendered.get(prompt.version)
+            if cached and cached[0] is prompt:
+                self.render_metrics['render_cache_hits'] += 1
+                return cached[1]
         
-        if self.current_prompt.benefits:
-            message += "Main benefits ye hain: "
-            for benefit in self.current_prompt.benefits:
-                message += f"{benefit}. "
+        rendered = render_opening_message(prompt)
+        with self._render_lock:
+            self.render_metrics['renders'] += 1
+            self._rendered.pop(prompt.version, None)
+            self._rendered[prompt.version] = (prompt, rendered)
+            if len(self._rendered) > self.render_cache_size:
+                self._rendered.pop(next(iter(self._rendered)))
+        return rendered
+    
+    def _build_opening_message(self, prompt: Optional[AgentPrompt] = None) -> str:
+        """Build the opening message from a prompt (the current one by default)"""
+        return self.render_opening(prompt).text
+    
+    async def _synthesize_agent_message(self, message: str, audio_key: str, audio_path: str):
+        """Synthesize an agent message, copying audio already made for the same content"""
+        cached = self.message_audio.get(audio_key)
+        if cached and Path(cached).exists():
+            Path(audio_path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(cached, audio_path)
+            self.render_metrics['audio_reused'] += 1
+            return
         
-        message += self.current_prompt.call_to_action
-        return message
+        if await self.audio_processor.text_to_speech(message, audio_path):
+            self.message_audio.setdefault(audio_key, audio_path)
     
     def _generate_next_agent_message(self, farmer_response: str, turn: int, 
                                    conversation_context: List[str]) -> str:
-        """Generate next agent message based on farmer response"""
-        
-        farmer_lower = farmer_response.lower()
-        
-        # Handle different types of responses
-        if any(word in farmer_lower for word in ['kaun ho', 'government', 'identity']):
-            return "Ji haan, main government ki taraf se authorized hun. Mera naam Raj hai aur main PM-KUSUM scheme coordinator hun. Aap PM Modi ji ke website pe bhi check kar sakte hain."
-            
-        elif any(word in farmer_lower for word in ['kya', 'samajh nahi', 'explain', 'simple']):
-            return "Main aapko simple mein samjhata hun. Solar pump ka matlab ye hai ki aapko bijli ki jarurat nahi hogi. Sun ki energy se pump chalega. Bilkul free energy."
-            
-        elif any(word in farmer_lower for word in ['kitne', 'paisa', 'cost', 'paise']):
-            return "Bilkul sahi sawaal! Dekho ji, agar pump ki total cost 1 lakh hai, to aapko sirf 10,000 rupaye dene honge. Baaki 90,000 government degi. Monthly installment bhi available hai."
-            
-        elif any(word in farmer_lower for word in ['eligible', 'qualify', 'documents']):
-            return "Eligibility bilkul simple hai. Bas aapke paas khet hona chahiye aur aap farmer hona chahiye. Documents sirf Aadhaar aur khet ke kagaz chahiye. Koi extra formality nahi."
-            
-        elif any(word in farmer_lower for word in ['process', 'kaise', 'steps']):
-            return "Process bahut aasan hai. Pehle online application submit karni hai, phir 15 din mein approval. Uske baad 1 mahine mein installation. Total 45 din ka kaam."
-            
-        elif any(word in farmer_lower for word in ['time nahi', 'busy', 'baad']):
-            return "Koi baat nahi ji. Main aapko WhatsApp pe details bhej deta hun. Sirf 2 minute ka video hai. Aap free time mein dekh sakte hain. Aur koi question ho to direct call kar sakte hain."
-            
-        elif turn >= 3:  # Wrap up conversation
-            if any(word in farmer_lower for word in ['interested', 'chahiye', 'lagwana']):
-                return "Bahut achha ji! Main aapka naam register kar deta hun aur officer aapse 2 din mein contact karenge. Aapko sirf form fill karna hai."
-            else:
-                return "Toh sir, kya aap sochenge? Main aapka number note kar leta hun. Officer aapse detail mein baat karenge."
-            
-        else:
-            return "Aur koi questions hain aapke? Main sab kuch detail mein bata sakta hun. Cost, process, documents - jo bhi jaanna ho."
+        """Generate next agent message based on farmer response (see IntentRouter)"""
+        if self.intent_router is None:
+            raise ValueError("VoiceAgent needs an intent router (IntentRouter.from_prompts) for follow-up messages")
+        return self.intent_router.route(farmer_response, turn).reply
     
-    def _should_end_conversation(self, farmer_response: str, turn: int) -> bool:
-        """Determine if conversation should end"""
-        farmer_lower = farmer_response.lower()
+    async def presynthesize_replies(self, audio_dir: str = "data/temp/replies") -> int:
+        """Synthesize every router reply once, so calls copy the audio instead of calling TTS
         
-        # End if farmer clearly rejects
-        if any(word in farmer_lower for word in ['nahi chahiye', 'interested nahi', 'band karo', 'problem hai']):
-            return True
-            
-        # End if farmer agrees to proceed
-        if any(word in farmer_lower for word in ['haan kar do', 'register karo', 'proceed', 'lagwana hai']):
-            return True
-            
-        # End if farmer asks to call later
-        if any(word in farmer_lower for word in ['baad mein call', 'time nahi', 'busy hun']):
-            return True
-            
-        # End after max turns
-        if turn >= 4:
-            return True
-            
-        return False
+        Files are kept per TTS voice (provider, voice, model and settings),
+        so audio made with another voice or in mock mode is never reused.
+        """
+        synthesized = 0
+        voice_dir = Path(audio_dir) / self.audio_processor.tts_fingerprint()
+        for key, reply in self.intent_router.replies().items():
+            audio_path = str(voice_dir / f"reply_{key}.mp3")
+            if Path(audio_path).exists() or await self.audio_processor.text_to_speech(reply, audio_path):
+                self.message_audio[key] = audio_path
+                synthesized += 1
+        self.logger.info(f"🎵 Pre-synthesized {synthesized} agent replies")
+        return synthesized
     
     def update_prompt(self, new_prompt: AgentPrompt):
         """Update the agent's prompt"""
         old_version = self.current_prompt.version
         self.current_prompt = new_prompt
+        with self._render_lock:
+            self._rendered.clear()
         self.logger.info(f"🔄 Agent prompt updated: v{old_version} → v{new_prompt.version}")
     
     def get_call_history(self) -> List[CallRecord]:
@@ -200,5 +267,7 @@ class VoiceAgent:
             "total_calls": total_calls,
             "current_version": self.current_prompt.version,
             "average_conversation_turns": avg_turns,
-            "total_improvements": len(self.current_prompt.improvements)
+            "version_improvements": len(self.current_prompt.improvements),
+            "early_termination": self.turn_analyzer.get_stats(),
+            "message_rendering": {**self.render_metrics, "audio_files_cached": len(self.message_audio)}
         }
\ No newline at end of file
@@ -0,0 +1,202 @@
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..models.data_models import AgentPrompt
+from ..utils.analytics import CallAnalytics
+from ..utils.helpers import load_json_data
+from .prompt_store import PromptVersionStore
+from .reinforcement_engine import LOW_EFFECTIVENESS, RULE_ISSUES
+
+DEFAULT_WARM_START_CONFIG = {
+    'enabled': False,
+    'log_dirs': ["logs", "data/output/call_logs"],  # Call statistics (session logs and call records)
+    'report_dirs': ["data/output/reports"],  # Final prompts of earlier runs with their per-version calls
+    'max_calls': 1000,  # Most recent historical calls used for the objection/issue statistics
+    'min_calls': 2,  # Calls a historical prompt version needs to be a candidate
+    'shrinkage_calls': 3,  # Pseudo-calls at the historical mean added to every candidate's average
+    'prior_calls': 10  # Weight (in calls) of the historical issue shares in each learning step
+}
+
+OBJECTION_ISSUES = {
+    'trust_issues': {'trust_issues'},
+    'cost_concern': {'cost_concern', 'wants_free'},
+    'process_complexity': {'process_complexity'},
+    'technical_confusion': {'technical_confusion'}
+}
+
+def historical_issue_shares(analytics: CallAnalytics) -> Dict[str, float]:
+    """Share of historical calls showing each rule issue (same definitions as call_issues)"""
+    calls = analytics.calls
+    if calls.empty:
+        return {}
+
+    objections = analytics.objections
+    found = {
+        issue: np.isin(np.arange(len(calls)), objections.loc[objections['objection'].isin(labels), 'row'].to_numpy())
+        for issue, labels in OBJECTION_ISSUES.items()
+    }
+    found['confusion'] = (~calls['intro_clarity'] | (calls['interest_level'] == 'confused')).to_numpy(dtype=bool)
+    found['negative_sentiment'] = (calls['sentiment'] == 'negative').to_numpy(dtype=bool)
+
+    effectiveness = calls['effectiveness'].to_numpy(dtype=float)
+    if effectiveness.mean() < LOW_EFFECTIVENESS:
+        found['low_effectiveness'] = effectiveness < LOW_EFFECTIVENESS
+
+    shares = {issue: float(found[issue].mean()) for issue in RULE_ISSUES if issue in found}
+    return {issue: share for issue, share in sorted(shares.items(), key=lambda item: -item[1]) if share > 0}
+
+class HistoricalWarmStart:
+    """Start learning from what earlier runs learned instead of the static initial prompt
+
+    Session logs and saved call records are bulk-loaded into CallAnalytics
+    for objection and issue statistics. Candidate prompts come from the
+    version store (every version of earlier runs, with its measured calls)
+    and from the final prompts of saved reports. Each candidate's average
+    effectiveness is shrunk towards the historical mean, so a version with
+    one lucky call does not win, and the best one (if it beats the initial
+    prompt) becomes the starting prompt along with its lineage.
+    """
+
+    def __init__(self, config: Optional[Dict] = None, version_store: Optional[PromptVersionStore] = None):
+        self.config = {**DEFAULT_WARM_START_CONFIG, **(config or {})}
+        self.version_store = version_store
+        self.logger = logging.getLogger(__name__)
+        self.metrics = {
+            'calls_loaded': 0,
+            'reports_loaded': 0,
+            'candidates': 0,
+            'load_seconds': 0.0
+        }
+
+    def load(self, initial_prompt: AgentPrompt) -> Dict[str, Any]:
+        """Historical statistics and the best starting prompt (the initial one if nothing beats it)"""
+        start = time.perf_counter()
+        analytics = CallAnalytics.from_paths(self.config['log_dirs'])
+        calls = analytics.calls
+        if self.config['max_calls'] and len(calls) > self.config['max_calls']:
+            recent = calls.sort_values('timestamp', kind='stable', na_position='first').index[-self.config['max_calls']:]
+            analytics = CallAnalytics(calls.loc[recent].reset_index(drop=True),
+                                      self._objections_for(analytics, recent))
+        self.metrics['calls_loaded'] = len(analytics)
+
+        candidates = self._candidates(initial_prompt, analytics)
+        self.metrics['candidates'] = len(candidates)
+        mean = float(analytics.calls['effectiveness'].mean()) if len(analytics) else 0.0
+        for candidate in candidates:
+            weight = self.config['shrinkage_calls']
+            candidate['score'] = ((candidate['average_effectiveness'] * candidate['calls'] + mean * weight) /
+                                  (candidate['calls'] + weight))
+
+        baseline = next((candidate for candidate in candidates if candidate['source'] == 'initial'), None)
+        best = max(candidates, key=lambda candidate: candidate['score'], default=None)
+        if best is None or (baseline and best['score'] <= baseline['score']):
+            best = baseline
+
+        self.metrics['load_seconds'] = time.perf_counter() - start
+        history = {
+            'calls': len(analytics),
+            'average_effectiveness': mean,
+            'success_rate': float(analytics.calls['success'].mean()) if len(analytics) else 0.0,
+            'objections': {str(key): int(value) for key, value in analytics.objection_frequencies().items()},
+            'issue_shares': historical_issue_shares(analytics),
+            'prompt': best['prompt'] if best else initial_prompt,
+            'lineage': best['lineage'] if best else [],
+            'candidates': [{key: value for key, value in candidate.items() if key != 'prompt'}
+                           for candidate in sorted(candidates, key=lambda candidate: -candidate['score'])]
+        }
+        if best and best['source'] != 'initial':
+            self.logger.info(f"🔥 Warm start from v{best['prompt'].version} ({best['source']}): "
+                             f"effectiveness {best['average_effectiveness']:.2f} over {best['calls']} calls, "
+                             f"{len(analytics)} historical calls loaded in {self.metrics['load_seconds']:.2f}s")
+        else:
+            self.logger.info(f"🔥 Warm start: {len(analytics)} historical calls loaded, "
+                             f"no prompt beats the initial one")
+        return history
+
+    @staticmethod
+    def _objections_for(analytics: CallAnalytics, rows) -> Any:
+        """Objection rows of the kept calls, renumbered to their new positions"""
+        positions = {row: position for position, row in enumerate(rows)}
+        objections = analytics.objections[analytics.objections['row'].isin(positions)].copy()
+        objections['row'] = objections['row'].map(positions).astype(np.int64)
+        return objections.reset_index(drop=True)
+
+    def _candidates(self, initial_prompt: AgentPrompt, analytics: CallAnalytics) -> List[Dict[str, Any]]:
+        min_calls = self.config['min_calls']
+        candidates = []
+
+        # Every earlier run starts from the configured initial prompt
+        by_version = analytics.success_rates('agent_version') if len(analytics) else None
+        if by_version is not None and initial_prompt.version in by_version.index:
+            row = by_version.loc[initial_prompt.version]
+            candidates.append(self._candidate(initial_prompt, 'initial', int(row['calls']),
+                                              float(row['average_effectiveness']), float(row['success_rate'])))
+        else:
+            candidates.append(self._candidate(initial_prompt, 'initial', 0, 0.0, 0.0))
+
+        if self.version_store:
+            for measured in self.version_store.measured_versions(min_calls):
+                if measured['run_id'] == self.version_store.run_id:
+                    continue
+                prompt = self.version_store.get(measured['version'], measured['run_id'])
+                prompt.improvements = self.version_store.improvements(measured['version'], measured['run_id'])
+                candidates.append(self._candidate(
+                    prompt, f"version_store:{measured['run_id']}", measured['calls'],
+                    measured['average_effectiveness'], measured['success_rate'] or 0.0,
+                    lineage=self.version_store.lineage(measured['version'], measured['run_id'])
+                ))
+
+        for report_dir in self.config['report_dirs']:
+            for report_path in sorted(Path(report_dir).glob("system_report_*.json")):
+                report = load_json_data(report_path)
+                if isinstance(report, dict):
+                    self.metrics['reports_loaded'] += 1
+                    candidate = self._report_candidate(report, report_path)
+                    if candidate and candidate['calls'] >= min_calls:
+                        candidates.append(candidate)
+        return candidates
+
+    def _report_candidate(self, report: Dict, report_path: Path) -> Optional[Dict[str, Any]]:
+        """A report's final prompt, measured on the report's calls with that version"""
+        final = report.get("final_agent_prompt") or {}
+        version = (report.get("summary") or {}).get("final_agent_version")
+        if not final.get("intro") or version is None:
+            return None
+
+        rows = CallAnalytics.from_rows(CallAnalytics.report_rows(report, report_path)).success_rates('agent_version')
+        if version not in rows.index:
+            return None
+        row = rows.loc[version]
+        prompt = AgentPrompt(
+            intro=final["intro"],
+            benefits=list(final.get("benefits") or []),
+            call_to_action=final["call_to_action"],
+            version=version,
+            improvements=list(final.get("improvements_made") or []),
+            tone_instructions=final.get("tone_instructions", "Speak politely and clearly, use simple Hindi"),
+            conversation_style=final.get("conversation_style", "Friendly but professional")
+        )
+        return self._candidate(prompt, f"report:{report_path.stem}", int(row['calls']),
+                               float(row['average_effectiveness']), float(row['success_rate']),
+                               lineage=[{'version': version, 'source': f"report:{report_path.stem}"}])
+
+    @staticmethod
+    def _candidate(prompt: AgentPrompt, source: str, calls: int, average_effectiveness: float,
+                   success_rate: float, lineage: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        return {
+            'prompt': prompt,
+            'version': prompt.version,
+            'source': source,
+            'calls': calls,
+            'average_effectiveness': average_effectiveness,
+            'success_rate': success_rate,
+            'lineage': lineage or []
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get loading statistics"""
+        return dict(self.metrics)
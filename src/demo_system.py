@@ -19,7 +19,8 @@ from models.data_models import (
     AgentPrompt, CallAnalysis, SentimentType, InterestLevel, 
     CallOutcome, FarmerProfile, EducationLevel, IncomeLevel
 )
-from utils.helpers import save_json_data, calculate_effectiveness_score
+from utils.helpers import save_json_data, calculate_effectiveness_score, load_json_data
+from utils.intent_router import IntentRouter
 
 class MockVoiceAgentSystem:
     """Demo system that works without API keys"""
@@ -100,6 +101,11 @@ class MockVoiceAgentSystem:
             )
         ]
         
+        # Agent follow-ups come from the demo's own route config (response_templates.demo_intent_router)
+        self.intent_router = IntentRouter.from_prompts(
+            load_json_data(Path(__file__).parent.parent / "config" / "prompts.json") or {}, "demo_intent_router"
+        )
+        
         # Response templates for different farmer types
         self.response_templates = {
             "skeptical_low": [
@@ -146,9 +152,9 @@ class MockVoiceAgentSystem:
             self.logger.info(f"\n🎤 Turn {turn + 1}/{max_turns}")
             
             # Agent speaks
-            current_agent_message = opening_message if turn == 0 else self._generate_followup_message(
-                farmer_responses[-1], turn, farmer
-            )
+            current_agent_message = opening_message if turn == 0 else self.intent_router.route(
+                farmer_responses[-1], turn - 1
+            ).reply
             
             self.logger.info(f"🤖 Agent: {current_agent_message}")
             agent_messages.append(current_agent_message)
@@ -193,26 +199,6 @@ class MockVoiceAgentSystem:
         message += self.current_prompt.call_to_action
         return message
     
-    def _generate_followup_message(self, farmer_response: str, turn: int, farmer: FarmerProfile) -> str:
-        """Generate contextual followup message"""
-        
-        farmer_lower = farmer_response.lower()
-        
-        if any(word in farmer_lower for word in ['kaun ho', 'government']):
-            return "Ji haan, main government ki taraf se authorized hun. Mera naam Raj hai aur main PM-KUSUM scheme coordinator hun."
-            
-        elif any(word in farmer_lower for word in ['kitne paise', 'cost', 'paisa']):
-            return "Bilkul sahi sawaal! Dekho ji, agar pump ki total cost 1 lakh hai, to aapko sirf 10,000 rupaye dene honge. Baaki 90,000 government degi."
-            
-        elif any(word in farmer_lower for word in ['roi', 'specifications', 'technical']):
-            return "ROI bahut achha hai sir. 5 saal mein investment recover ho jayega. Technical specs: 5HP solar pump with 20-year warranty."
-            
-        elif any(word in farmer_lower for word in ['process', 'apply']):
-            return "Process bilkul simple hai. Online application, 15 din mein approval, 1 mahine mein installation. Total 45 din ka kaam."
-            
-        else:
-            return "Aur koi questions hain? Main sab detail mein bata sakta hun."
-    
     def _add_context_to_response(self, base_response: str, agent_message: str, farmer: FarmerProfile) -> str:
         """Add contextual modifications to farmer response"""
         
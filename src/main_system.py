@@ -8,7 +8,7 @@ import asyncio
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 import logging
 
 # Add src to path for imports
@@ -18,12 +18,25 @@ from models.data_models import AgentPrompt, CallRecord
 from models.farmer_profiles import FarmerProfileManager
 from components.audio_processor import AudioProcessor
 from components.farmer_persona import LLMFarmerPersona
+from components.response_model import FarmerResponseModel
 from components.call_analyzer import CallAnalyzer
+from components.call_classifier import LocalCallClassifier
 from components.reinforcement_engine import ReinforcementEngine
 from components.voice_agent import VoiceAgent
+from components.turn_analyzer import IncrementalCallAnalyzer
+from components.prompt_policy import ContextualPromptPolicy
+from components.replay_evaluator import ReplayEvaluator
+from components.prompt_store import PromptVersionStore
+from components.warm_start import HistoricalWarmStart
 from utils.config import ConfigManager
 from utils.logger import setup_logger
-from utils.helpers import save_json_data, create_output_directories, PerformanceTracker
+from utils.context_manager import ConversationContextManager
+from utils.llm_cache import LLMResponseCache
+from utils.analysis_store import AnalysisMemoStore
+from utils.analytics import CallAnalytics
+from utils.convergence import ConvergenceMonitor
+from utils.intent_router import IntentRouter
+from utils.helpers import save_json_data, to_serializable, create_output_directories, PerformanceTracker
 
 class VoiceAgentSystem:
     """Complete Voice Agent Reinforcement Learning System"""
@@ -41,6 +54,8 @@ class VoiceAgentSystem:
         
         # System state
         self.call_log = []
+        self.rolled_back = False
+        self.learning_batch = []  # (analysis, conversation) awaiting a mini-batch learning step
         self.system_metrics = PerformanceTracker()
         
         self.logger.info("🚀 Voice Agent System initialized successfully")
@@ -67,32 +82,80 @@ class VoiceAgentSystem:
     def initialize_components(self):
         """Initialize all system components"""
         api_config = self.config_manager.get_api_config()
+        self.credential_pools = self.config_manager.get_credential_pools()
+        
+        # Shared LLM response cache, enabled per component
+        cache_config = self.config_manager.get_cache_config().get("llm_responses", {})
+        cached_components = cache_config.get("components", {})
+        self.response_cache = LLMResponseCache(cache_config) if any(cached_components.values()) else None
+        memo_config = self.config_manager.get_cache_config().get("analysis_memo", {})
+        memo_store = AnalysisMemoStore(memo_config) if memo_config.get("enabled") else None
+        
+        # Token-budgeted conversation context shared by the LLM components
+        self.context_manager = ConversationContextManager(self.config_manager.get_context_config())
         
         # Initialize audio processor
         self.audio_processor = AudioProcessor(
             deepgram_key=api_config.get("deepgram", {}).get("api_key"),
             elevenlabs_key=api_config.get("elevenlabs", {}).get("api_key"),
-            config=api_config
+            config=api_config,
+            credential_pools=self.credential_pools
         )
         
+        # Optional offline farmer-response model (no network needed for simulations)
+        self.response_model = None
+        model_config = self.config_manager.get_simulation_config().get("offline_farmer_model", {})
+        if model_config.get("enabled"):
+            self.response_model = FarmerResponseModel.from_sources(
+                self.config_manager.farmer_personas,
+                log_dirs=model_config.get("log_dirs", ["logs", "data/output/call_logs"]),
+                order=model_config.get("order", 2),
+                retrieval_weight=model_config.get("retrieval_weight", 0.6),
+                seed=model_config.get("seed")
+            )
+        
         # Initialize farmer persona
         self.farmer_persona = LLMFarmerPersona(
             openai_api_key=api_config.get("openai", {}).get("api_key"),
             config=api_config,
-            personas_config=self.config_manager.farmer_personas
+            personas_config=self.config_manager.farmer_personas,
+            credential_pool=self.credential_pools.get("openai"),
+            response_cache=self.response_cache if cached_components.get("farmer_persona") else None,
+            context_manager=self.context_manager,
+            response_model=self.response_model
         )
         
+        # Local classifier ahead of GPT-4 analysis, trained from past call analyses
+        self.local_classifier = None
+        classifier_config = self.config_manager.get_analysis_config().get("local_classifier", {})
+        if classifier_config.get("enabled"):
+            self.local_classifier = LocalCallClassifier.from_call_logs(
+                classifier_config,
+                log_dirs=classifier_config.get("log_dirs", ["logs", "data/output/call_logs"])
+            )
+        
         # Initialize call analyzer
         self.call_analyzer = CallAnalyzer(
             openai_api_key=api_config.get("openai", {}).get("api_key"),
-            config=api_config
+            config=api_config,
+            credential_pool=self.credential_pools.get("openai"),
+            response_cache=self.response_cache if cached_components.get("call_analyzer") else None,
+            context_manager=self.context_manager,
+            local_classifier=self.local_classifier,
+            batch_config=self.config_manager.get_analysis_config().get("batch"),
+            memo_store=memo_store
         )
+        if memo_store and memo_config.get("purge_stale"):
+            memo_store.purge_stale(self.call_analyzer.analysis_version)
         
         # Initialize reinforcement engine
         self.reinforcement_engine = ReinforcementEngine(
             openai_api_key=api_config.get("openai", {}).get("api_key"),
             config=api_config,
-            prompts_config=self.config_manager.prompts
+            prompts_config=self.config_manager.prompts,
+            credential_pool=self.credential_pools.get("openai"),
+            context_manager=self.context_manager,
+            learning_config=self.config_manager.get_learning_config()
         )
         
         # Initialize farmer profile manager
@@ -111,11 +174,59 @@ class VoiceAgentSystem:
             conversation_style=initial_prompt_config["conversation_style"]
         )
         
+        learning_config = self.config_manager.get_learning_config()
+        
+        # Persistent history of every prompt version (for diffs, metrics, rollback and warm starts)
+        self.version_store = None
+        store_config = learning_config.get("version_store", {})
+        if store_config.get("enabled"):
+            self.version_store = PromptVersionStore(store_config)
+        
+        # Optionally start from the best prompt and the objection statistics of earlier runs
+        self.warm_start = None
+        warm_start_config = learning_config.get("warm_start", {})
+        if warm_start_config.get("enabled"):
+            self.warm_start = HistoricalWarmStart(warm_start_config, self.version_store)
+            history = self.warm_start.load(initial_prompt)
+            initial_prompt = history["prompt"]
+            self.reinforcement_engine.warm_start(history, self.warm_start.config["prior_calls"])
+        if self.version_store:
+            self.version_store.put(initial_prompt, source="warm_start" if self.warm_start else "initial")
+        
+        # Optional Thompson-sampling pools of prompt variants (concurrent calls explore in parallel),
+        # one per farmer segment when the contextual policy is enabled
+        bandit_config = learning_config.get("bandit", {})
+        policy_config = learning_config.get("contextual_policy", {})
+        self.prompt_policy = None
+        if bandit_config.get("enabled") or policy_config.get("enabled"):
+            if not policy_config.get("enabled"):
+                policy_config = {**policy_config, "segment_by": "none"}
+            self.prompt_policy = ContextualPromptPolicy(initial_prompt, policy_config, bandit_config)
+        
+        # Stop learning (or the campaign) once effectiveness stops improving over memory_window calls
+        self.convergence = ConvergenceMonitor({
+            "window": learning_config.get("memory_window", 10),
+            "min_improvement": learning_config.get("min_effectiveness_improvement", 0.05),
+            **learning_config.get("convergence", {})
+        })
+        
+        # Optional offline replay screen for learned prompts before they reach live calls
+        self.replay_evaluator = None
+        replay_config = self.config_manager.get_simulation_config().get("replay_evaluation", {})
+        intent_router = IntentRouter.from_prompts(self.config_manager.prompts)
+        if replay_config.get("gate_learned_prompts"):
+            self.replay_evaluator = ReplayEvaluator.from_sources(
+                self.config_manager.farmer_personas, intent_router, replay_config,
+                termination_config=self.config_manager.get_analysis_config().get("early_termination")
+            )
+        
         # Initialize voice agent
         self.voice_agent = VoiceAgent(
             audio_processor=self.audio_processor,
             farmer_persona=self.farmer_persona,
-            initial_prompt=initial_prompt
+            initial_prompt=initial_prompt,
+            turn_analyzer=IncrementalCallAnalyzer(self.config_manager.get_analysis_config().get("early_termination")),
+            intent_router=intent_router
         )
         
         self.logger.info("✅ All components initialized")
@@ -126,69 +237,154 @@ class VoiceAgentSystem:
         self.logger.info(f"🎯 Starting {num_iterations}-iteration simulation")
         self.logger.info("=" * 60)
         
+        # Follow-up replies are fixed per router, so their audio can be synthesized once up front
+        router_config = self.config_manager.get_simulation_config().get("intent_router", {})
+        if router_config.get("presynthesize_replies"):
+            await self.voice_agent.presynthesize_replies(router_config.get("audio_dir", "data/temp/replies"))
+        
         # Get sample farmers
         sample_farmers = self.farmer_profile_manager.sample_farmers
         
         for iteration in range(num_iterations):
+            if self.convergence.stop_campaign:
+                self.logger.info(f"\n📉 Stopping campaign after {iteration} iterations: learning has converged")
+                break
+            
             self.logger.info(f"\n📞 ITERATION {iteration + 1}")
             self.logger.info("-" * 40)
             
+            # Pick up persona template edits between calls
+            if self.config_manager.farmer_personas_changed():
+                self.farmer_persona.update_personas_config(self.config_manager.farmer_personas)
+            
+            if self.prompt_policy:
+                await self._run_bandit_iteration(iteration, num_iterations, max_turns_per_call, sample_farmers)
+                continue
+            
             # Select farmer for this iteration
             farmer = sample_farmers[iteration % len(sample_farmers)]
-            self.logger.info(f"📱 Calling: {farmer.name} ({farmer.location})")
-            self.logger.info(f"📊 Profile: {farmer.education.value} education, "
-                           f"{farmer.income.value} income, skepticism {farmer.skepticism:.1f}")
-            
-            # Record call start
-            call_start_time = datetime.now()
+            call_record = await self._run_call(iteration, farmer, max_turns_per_call, f"CALL_{iteration+1:03d}")
             
-            try:
-                # Conduct voice call
-                agent_messages, farmer_responses, audio_files = await self.voice_agent.conduct_voice_call(
-                    farmer, max_turns_per_call
-                )
-                
-                # Analyze conversation
-                self.logger.info("🧠 Analyzing conversation...")
-                analysis = await self.call_analyzer.analyze_conversation(
-                    agent_messages, farmer_responses
-                )
-                
-                # Display results
-                self._display_call_results(agent_messages, farmer_responses, analysis, iteration + 1)
-                
-                # Record call duration
-                call_duration = (datetime.now() - call_start_time).total_seconds()
-                self.system_metrics.record_call_duration(call_duration)
-                self.system_metrics.record_effectiveness(analysis.agent_effectiveness)
-                
-                # Store call record
-                call_record = CallRecord(
-                    call_id=f"CALL_{iteration+1:03d}",
-                    iteration=iteration + 1,
-                    farmer_profile=farmer,
-                    agent_version=self.voice_agent.current_prompt.version,
-                    conversation_turns=[],  # Populated by voice_agent
-                    analysis=analysis,
-                    call_start=call_start_time,
-                    call_end=datetime.now(),
-                    total_duration=call_duration,
-                    audio_files=audio_files
-                )
-                
-                self.call_log.append(call_record)
-                
-                # Apply learning (except for last iteration)
-                if iteration < num_iterations - 1:
-                    await self._apply_learning(analysis, agent_messages + farmer_responses)
-                
-            except Exception as e:
-                self.logger.error(f"❌ Error in iteration {iteration + 1}: {e}")
-                continue
+            # Apply learning (except for last iteration, or once converged)
+            if call_record and iteration < num_iterations - 1 and self.convergence.should_learn():
+                conversation_history = [message for turn in call_record.conversation_turns
+                                        for message in (turn.agent_message, turn.farmer_response)]
+                await self._apply_learning(call_record.analysis, conversation_history)
+            elif self.convergence.converged and not self.rolled_back:
+                self._rollback_to_best()
         
         # Generate final report
         await self._generate_final_report()
     
+    async def _run_call(self, iteration: int, farmer, max_turns_per_call: int, call_id: str,
+                        prompt: Optional[AgentPrompt] = None) -> Optional[CallRecord]:
+        """Conduct, analyze, log and persist one call (None if it failed)"""
+        
+        self.logger.info(f"📱 Calling: {farmer.name} ({farmer.location})")
+        self.logger.info(f"📊 Profile: {farmer.education.value} education, "
+                       f"{farmer.income.value} income, skepticism {farmer.skepticism:.1f}")
+        
+        # Record call start
+        call_start_time = datetime.now()
+        
+        try:
+            # Conduct voice call
+            voice_call = await self.voice_agent.conduct_call(farmer, max_turns_per_call, prompt)
+            agent_messages = [turn.agent_message for turn in voice_call.conversation_turns]
+            farmer_responses = [turn.farmer_response for turn in voice_call.conversation_turns]
+            
+            # Analyze conversation
+            self.logger.info("🧠 Analyzing conversation...")
+            analysis = await self.call_analyzer.analyze_conversation(
+                agent_messages, farmer_responses
+            )
+            
+            # Display results
+            self._display_call_results(agent_messages, farmer_responses, analysis, iteration + 1)
+            
+            # Record call duration
+            call_duration = (datetime.now() - call_start_time).total_seconds()
+            self.system_metrics.record_call_duration(call_duration)
+            self.system_metrics.record_effectiveness(analysis.agent_effectiveness)
+            
+            # Store call record
+            call_record = CallRecord(
+                call_id=call_id,
+                iteration=iteration + 1,
+                farmer_profile=farmer,
+                agent_version=voice_call.agent_version,
+                conversation_turns=voice_call.conversation_turns,
+                analysis=analysis,
+                call_start=call_start_time,
+                call_end=datetime.now(),
+                total_duration=call_duration,
+                audio_files=voice_call.audio_files,
+                end_reason=voice_call.end_reason,
+                prompt_hash=voice_call.prompt_hash
+            )
+            
+            self.call_log.append(call_record)
+            self.convergence.observe(analysis.agent_effectiveness)
+            
+            # Persist the full record (transcript included) for offline training and replay
+            call_log_dir = Path(self.config_manager.get_paths().get("call_logs", "data/output/call_logs"))
+            call_log_file = f"{call_record.call_id}_{call_start_time.strftime('%Y%m%d_%H%M%S')}.json"
+            save_json_data(to_serializable(call_record), call_log_dir / call_log_file)
+            return call_record
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error in iteration {iteration + 1}: {e}")
+            return None
+    
+    async def _run_bandit_iteration(self, iteration: int, num_iterations: int, max_turns_per_call: int,
+                                    sample_farmers: List):
+        """Run concurrent calls on policy-sampled prompt variants, then update the pools"""
+        
+        concurrent_calls = self.config_manager.get_learning_config().get("bandit", {}).get("concurrent_calls", 3)
+        calls, segments = [], []
+        for slot in range(concurrent_calls):
+            farmer = sample_farmers[(iteration * concurrent_calls + slot) % len(sample_farmers)]
+            segment, prompt = self.prompt_policy.select(farmer, explore=not self.convergence.converged)
+            self.logger.info(f"🎰 Call {slot + 1}/{concurrent_calls}: prompt variant v{prompt.version} ({segment})")
+            calls.append(self._run_call(iteration, farmer, max_turns_per_call,
+                                        f"CALL_{iteration+1:03d}_{slot+1}", prompt))
+            segments.append(segment)
+        
+        for segment, call_record in zip(segments, await asyncio.gather(*calls)):
+            if call_record:
+                conversation_history = [message for turn in call_record.conversation_turns
+                                        for message in (turn.agent_message, turn.farmer_response)]
+                self.prompt_policy.record(segment, call_record.agent_version, call_record.analysis,
+                                          conversation_history)
+        
+        self.prompt_policy.retire()
+        
+        # New variants from each due segment's best arm, learned concurrently
+        # (except for last iteration, or once converged)
+        if iteration < num_iterations - 1 and self.convergence.should_learn():
+            requests = self.prompt_policy.variant_requests()
+            improved_prompts = await asyncio.gather(*(self._learn_variant(best) for _, best in requests))
+            for (segment, best), improved_prompt in zip(requests, improved_prompts):
+                if self._passes_replay(improved_prompt, best.prompt):
+                    variant = self.prompt_policy.add_variant(segment, improved_prompt, best.version)
+                    if variant and self.version_store:
+                        self.version_store.put(variant, parent_version=best.version, source=f"variant:{segment}")
+        
+        # The agent's default prompt follows the best pooled variant
+        best_prompt = self.prompt_policy.best_prompt()
+        if best_prompt is not self.voice_agent.current_prompt:
+            self.voice_agent.update_prompt(best_prompt)
+    
+    async def _learn_variant(self, best) -> AgentPrompt:
+        """Improve an arm's prompt from its recent calls (one batch step) or its last call"""
+        
+        mini_batch = self.reinforcement_engine.mini_batch_config
+        if mini_batch['enabled']:
+            analyses, conversations = best.recent(mini_batch['batch_size'])
+            return await self.reinforcement_engine.learn_from_batch(best.prompt, analyses, conversations)
+        return await self.reinforcement_engine.learn_and_improve(best.prompt, best.last_analysis,
+                                                                 best.last_conversation)
+    
     def _display_call_results(self, agent_messages: List[str], farmer_responses: List[str], 
                             analysis, iteration: int):
         """Display formatted call results"""
@@ -216,27 +412,81 @@ class VoiceAgentSystem:
     async def _apply_learning(self, analysis, conversation_history: List[str]):
         """Apply reinforcement learning"""
         
+        # In mini-batch mode, collect analyses until a full batch is ready
+        mini_batch = self.reinforcement_engine.mini_batch_config
+        if mini_batch['enabled']:
+            self.learning_batch.append((analysis, conversation_history))
+            if len(self.learning_batch) < mini_batch['batch_size']:
+                self.logger.info(f"\n🧠 Learning batch: {len(self.learning_batch)}/{mini_batch['batch_size']} calls collected")
+                return
+        
         self.logger.info(f"\n🧠 APPLYING AI LEARNING:")
         old_version = self.voice_agent.current_prompt.version
         
         # Generate improvements
-        improved_prompt = await self.reinforcement_engine.learn_and_improve(
-            self.voice_agent.current_prompt,
-            analysis,
-            conversation_history
-        )
+        if mini_batch['enabled']:
+            analyses = [batch_analysis for batch_analysis, _ in self.learning_batch]
+            conversations = [conversation for _, conversation in self.learning_batch]
+            self.learning_batch = []
+            improved_prompt = await self.reinforcement_engine.learn_from_batch(
+                self.voice_agent.current_prompt,
+                analyses,
+                conversations
+            )
+        else:
+            improved_prompt = await self.reinforcement_engine.learn_and_improve(
+                self.voice_agent.current_prompt,
+                analysis,
+                conversation_history
+            )
+        
+        if not self._passes_replay(improved_prompt, self.voice_agent.current_prompt):
+            return
         
         # Update agent
         self.voice_agent.update_prompt(improved_prompt)
+        if self.version_store:
+            self.version_store.put(improved_prompt, parent_version=old_version,
+                                   source="batch" if mini_batch['enabled'] else "learned")
         
         self.logger.info(f"   ⬆️  Agent upgraded: v{old_version} → v{improved_prompt.version}")
         
-        # Show improvements
+        # Show the changes made in this version
         if improved_prompt.improvements:
-            recent_improvements = improved_prompt.improvements[-3:]  # Show last 3
-            for improvement in recent_improvements:
+            for improvement in improved_prompt.improvements:
                 self.logger.info(f"   ✨ {improvement}")
     
+    def _passes_replay(self, candidate: AgentPrompt, baseline: AgentPrompt) -> bool:
+        """Offline replay screen: reject learned prompts confidently worse than their parent"""
+        if not self.replay_evaluator or self.replay_evaluator.screen(candidate, baseline):
+            return True
+        self.logger.info(f"   🔁 Learned prompt rejected by offline replay (worse than v{baseline.version})")
+        return False
+    
+    def _rollback_to_best(self):
+        """Once learning has converged, return to the best measured prompt version (if not the current one)"""
+        self.rolled_back = True
+        store_config = self.config_manager.get_learning_config().get("version_store", {})
+        if not self.version_store or not store_config.get("rollback_on_convergence") or not self.call_log:
+            return
+        
+        by_version = CallAnalytics.from_call_records(self.call_log).success_rates('agent_version')
+        best_version = int(by_version['average_effectiveness'].idxmax())
+        current_version = self.voice_agent.current_prompt.version
+        if best_version == current_version or not self.version_store.exists(best_version):
+            return
+        
+        self.voice_agent.update_prompt(self.version_store.rollback(best_version))
+        self.logger.info(f"   ⏪ Agent rolled back: v{current_version} → v{self.voice_agent.current_prompt.version} "
+                         f"(content of v{best_version})")
+    
+    def _improvement_history(self) -> List[str]:
+        """Improvements of every version leading to the current prompt (its own changes without a store)"""
+        current_prompt = self.voice_agent.current_prompt
+        if self.version_store and self.version_store.exists(current_prompt.version):
+            return self.version_store.improvements(current_prompt.version)
+        return list(current_prompt.improvements)
+    
     async def _generate_final_report(self):
         """Generate comprehensive final report"""
         
@@ -247,13 +497,15 @@ class VoiceAgentSystem:
             self.logger.warning("No successful calls to analyze")
             return
         
-        # Performance metrics
-        effectiveness_scores = [call.analysis.agent_effectiveness for call in self.call_log]
+        # Columnar view of the call log for the summary and breakdowns
+        analytics = CallAnalytics.from_call_records(self.call_log)
+        summary = analytics.summary()
+        effectiveness_scores = analytics.calls['recorded_effectiveness'].astype(float).tolist()
         
         self.logger.info(f"🎯 PERFORMANCE SUMMARY:")
-        self.logger.info(f"   Total Calls: {len(self.call_log)}")
-        self.logger.info(f"   Success Rate: {sum(1 for call in self.call_log if call.analysis.call_outcome.value == 'success') / len(self.call_log) * 100:.1f}%")
-        self.logger.info(f"   Average Effectiveness: {sum(effectiveness_scores) / len(effectiveness_scores):.2f}")
+        self.logger.info(f"   Total Calls: {summary['total_calls']}")
+        self.logger.info(f"   Success Rate: {summary['success_rate'] * 100:.1f}%")
+        self.logger.info(f"   Average Effectiveness: {summary['average_effectiveness']:.2f}")
         
         if len(effectiveness_scores) > 1:
             improvement = effectiveness_scores[-1] - effectiveness_scores[0]
@@ -263,30 +515,32 @@ class VoiceAgentSystem:
         # Learning insights
         self.logger.info(f"\n🧠 LEARNING INSIGHTS:")
         self.logger.info(f"   Final Agent Version: v{self.voice_agent.current_prompt.version}")
-        self.logger.info(f"   Total Improvements: {len(self.voice_agent.current_prompt.improvements)}")
+        self.logger.info(f"   Total Improvements: {len(self._improvement_history())}")
         
         # Objection analysis
-        all_objections = []
-        for call in self.call_log:
-            all_objections.extend(call.analysis.objections)
-        
-        if all_objections:
-            from collections import Counter
-            common_objections = Counter(all_objections).most_common(3)
+        common_objections = analytics.objection_frequencies(top=3)
+        if len(common_objections):
             self.logger.info(f"   Common Objections:")
-            for objection, count in common_objections:
+            for objection, count in common_objections.items():
                 self.logger.info(f"      • {objection}: {count} times")
         
+        # Per-version call metrics go with the stored versions
+        if self.version_store:
+            for version, row in analytics.success_rates('agent_version').iterrows():
+                self.version_store.attach_metrics(int(version), {
+                    "calls": int(row['calls']),
+                    "success_rate": float(row['success_rate']),
+                    "average_effectiveness": float(row['average_effectiveness'])
+                })
+        
         # Save detailed report
         report_data = {
             "summary": {
-                "total_calls": len(self.call_log),
-                "success_rate": sum(1 for call in self.call_log if call.analysis.call_outcome.value == 'success') / len(self.call_log),
-                "average_effectiveness": sum(effectiveness_scores) / len(effectiveness_scores),
-                "improvement_achieved": effectiveness_scores[-1] - effectiveness_scores[0] if len(effectiveness_scores) > 1 else 0,
+                **summary,
                 "final_agent_version": self.voice_agent.current_prompt.version
             },
             "effectiveness_progression": effectiveness_scores,
+            "analytics": analytics.to_report(),
             "call_details": [
                 {
                     "iteration": call.iteration,
@@ -307,15 +561,30 @@ class VoiceAgentSystem:
                 "intro": self.voice_agent.current_prompt.intro,
                 "benefits": self.voice_agent.current_prompt.benefits,
                 "call_to_action": self.voice_agent.current_prompt.call_to_action,
-                "improvements_made": self.voice_agent.current_prompt.improvements
+                "improvements_made": self._improvement_history()
             },
             "system_performance": self.system_metrics.get_summary(),
             "component_performance": {
                 "audio_processor": self.audio_processor.get_performance_stats(),
                 "farmer_persona": self.farmer_persona.get_performance_stats(),
                 "call_analyzer": self.call_analyzer.get_performance_stats(),
-                "reinforcement_engine": self.reinforcement_engine.get_performance_stats()
-            }
+                "reinforcement_engine": self.reinforcement_engine.get_performance_stats(),
+                "voice_agent": self.voice_agent.get_performance_summary()
+            },
+            "credential_pools": {
+                service: pool.get_stats() for service, pool in self.credential_pools.items()
+            },
+            "llm_response_cache": self.response_cache.get_stats() if self.response_cache else None,
+            "context_token_savings": self.context_manager.get_stats(),
+            "analysis_cascade": self.local_classifier.get_stats() if self.local_classifier else None,
+            "prompt_policy": self.prompt_policy.get_stats() if self.prompt_policy else None,
+            "convergence": self.convergence.get_stats(),
+            "replay_evaluation": self.replay_evaluator.get_stats() if self.replay_evaluator else None,
+            "warm_start": self.warm_start.get_stats() if self.warm_start else None,
+            "prompt_versions": {
+                **self.version_store.get_stats(),
+                "history": self.version_store.history()
+            } if self.version_store else None
         }
         
         # Save report
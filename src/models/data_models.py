@@ -80,7 +80,7 @@ class AgentPrompt:
     benefits: List[str]
     call_to_action: str
     version: int
-    improvements: List[str] = field(default_factory=list)
+    improvements: List[str] = field(default_factory=list)  # Changes made in this version
     tone_instructions: str = "Speak politely and clearly, use simple Hindi"
     conversation_style: str = "Friendly but professional"
     created_at: datetime = field(default_factory=datetime.now)
@@ -93,6 +93,7 @@ class ConversationTurn:
     farmer_response: str
     timestamp: datetime = field(default_factory=datetime.now)
     audio_files: Dict[str, str] = field(default_factory=dict)  # agent/farmer audio paths
+    estimates: Dict[str, Any] = field(default_factory=dict)  # running analysis after this turn
 
 @dataclass
 class CallAnalysis:
@@ -107,6 +108,7 @@ class CallAnalysis:
     conversation_flow: Dict[str, Any] = field(default_factory=dict)
     emotional_indicators: List[str] = field(default_factory=list)
     analysis_timestamp: datetime = field(default_factory=datetime.now)
+    source: Optional[str] = None  # What produced the labels: llm, local (classifier) or rules
 
 @dataclass
 class CallRecord:
@@ -121,6 +123,8 @@ class CallRecord:
     call_end: Optional[datetime] = None
     total_duration: Optional[float] = None  # seconds
     audio_files: List[str] = field(default_factory=list)
+    end_reason: Optional[str] = None  # rejected, agreed, call_later, max_turns, hopeless, won
+    prompt_hash: Optional[str] = None  # Content hash of the rendered opening message
 
 @dataclass
 class LearningInsight:
@@ -156,12 +160,33 @@ class FarmerProfileAPI(BaseModel):
     govt_experience: str = Field(..., min_length=5)
     family_size: int = Field(..., ge=1, le=20)
 
-class CallAnalysisAPI(BaseModel):
-    """API model for call analysis"""
+class CallAnalysisLabels(BaseModel):
+    """Call analysis labels as returned by the LLM analyzer"""
     sentiment: str = Field(..., regex="^(positive|neutral|negative)$")
     interest_level: str = Field(..., regex="^(high|medium|low|confused)$")
     intro_clarity: bool
     objections: List[str] = Field(default_factory=list)
     call_outcome: str = Field(..., regex="^(success|failure|follow_up)$")
+    conversation_flow: Dict[str, str] = Field(default_factory=dict)
+    emotional_indicators: List[str] = Field(default_factory=list)
+
+class CallAnalysisBatchEntry(CallAnalysisLabels):
+    """One call's labels in a packed (multi-call) analysis reply"""
+    call_id: str
+
+class CallAnalysisBatchAPI(BaseModel):
+    """Packed analysis reply with one entry per call id"""
+    results: List[CallAnalysisBatchEntry] = Field(default_factory=list)
+
+class CallAnalysisAPI(CallAnalysisLabels):
+    """API model for call analysis"""
     agent_effectiveness: float = Field(..., ge=0.0, le=1.0)
-    emotional_indicators: List[str] = Field(default_factory=list)
\ No newline at end of file
+
+class PromptImprovementAPI(BaseModel):
+    """Improved agent prompt as returned by the LLM learner"""
+    intro: str = Field(..., min_length=5)
+    benefits: List[str] = Field(..., min_items=1)
+    call_to_action: str = Field(..., min_length=2)
+    tone_instructions: Optional[str] = None
+    conversation_style: Optional[str] = None
+    improvements_made: List[str] = Field(default_factory=list)
\ No newline at end of file
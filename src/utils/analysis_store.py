@@ -0,0 +1,138 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .normalization import NORMALIZATION_VERSION, normalize_hindi_text
+
+class AnalysisMemoStore:
+    """Persistent memo of call analyses keyed by normalized transcript hash
+
+    Keys combine the normalized (agent_messages, farmer_responses) transcript
+    with the analyzer version, so replays and duplicate conversations reuse
+    one analysis while any lexicon, scoring or prompt change starts a fresh
+    key space. Backed by SQLite in WAL mode so several worker processes can
+    share one file.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.path = config.get("path", "data/cache/analysis_memo.sqlite")
+        self.ttl_seconds = config.get("ttl_seconds", 30 * 24 * 3600)
+        self.max_entries = config.get("max_entries", 50000)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS analyses (
+                key TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                analysis TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_last_accessed ON analyses(last_accessed)")
+        self._conn.commit()
+
+        self.metrics = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+            'stores': 0
+        }
+
+    @staticmethod
+    def make_key(agent_messages: List[str], farmer_responses: List[str], version: str) -> str:
+        """Hash the normalized transcript and analyzer version into a memo key"""
+        payload = json.dumps({
+            'agent': [normalize_hindi_text(message) for message in agent_messages],
+            'farmer': [normalize_hindi_text(response) for response in farmer_responses],
+            'version': version,
+            'normalization': NORMALIZATION_VERSION
+        }, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a memoized analysis, returning None on a miss"""
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute("SELECT analysis, created_at FROM analyses WHERE key = ?", (key,)).fetchone()
+
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM analyses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.metrics['expired'] += 1
+                row = None
+
+            if row is None:
+                self.metrics['misses'] += 1
+                return None
+
+            self._conn.execute("UPDATE analyses SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+        self.metrics['hits'] += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, version: str, analysis: Dict[str, Any]):
+        """Store an analysis, evicting least recently used entries past max_entries"""
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, version, analysis, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, version, json.dumps(analysis, ensure_ascii=False), now, now)
+            )
+
+            count = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            if self.max_entries and count > self.max_entries:
+                overflow = count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM analyses WHERE key IN "
+                    "(SELECT key FROM analyses ORDER BY last_accessed ASC LIMIT ?)", (overflow,)
+                )
+                self.metrics['evictions'] += overflow
+
+            self._conn.commit()
+        self.metrics['stores'] += 1
+
+    def purge_stale(self, version: str) -> int:
+        """Delete analyses memoized under any other analyzer version"""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM analyses WHERE version != ?", (version,)).rowcount
+            self._conn.commit()
+        if deleted:
+            self.logger.info(f"🧹 Purged {deleted} memoized analyses from older analyzer versions")
+        return deleted
+
+    def clear(self):
+        """Remove all memoized analyses"""
+        with self._lock:
+            self._conn.execute("DELETE FROM analyses")
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memo hit rate and size"""
+        lookups = self.metrics['hits'] + self.metrics['misses']
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+        return {
+            **self.metrics,
+            'entries': entries,
+            'hit_rate': self.metrics['hits'] / lookups if lookups else 0.0
+        }
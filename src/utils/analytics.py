@@ -0,0 +1,249 @@
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .helpers import (
+    INTEREST_SCORES, OUTCOME_SCORES, SENTIMENT_SCORES, calculate_effectiveness_scores, load_json_data,
+    to_serializable
+)
+
+# Fixed label categories, so columns stay categorical however few calls are loaded
+LABEL_CATEGORIES = {
+    'sentiment': list(SENTIMENT_SCORES),
+    'interest_level': list(INTEREST_SCORES),
+    'call_outcome': list(OUTCOME_SCORES)
+}
+
+REPORT_TIMESTAMP = re.compile(r'(\d{8}_\d{6})')
+
+class CallAnalytics:
+    """Columnar analytics over call records, session logs and saved reports
+
+    Calls are loaded once into a typed DataFrame (categorical labels,
+    integer versions, datetime timestamps) with objections in a separate
+    long table, so summaries, group-bys and rolling windows are vectorized
+    pandas/NumPy operations instead of Python loops over the call log.
+    Effectiveness is recomputed from the labels with the vectorized scoring
+    formula; the value stored with each call is kept as
+    ``recorded_effectiveness``.
+    """
+
+    COLUMNS = ['call_id', 'source', 'timestamp', 'iteration', 'persona', 'farmer_name', 'agent_version',
+               'prompt_hash', 'sentiment', 'interest_level', 'intro_clarity', 'call_outcome',
+               'objection_count', 'recorded_effectiveness', 'duration', 'turns', 'end_reason']
+
+    def __init__(self, calls: pd.DataFrame, objections: pd.DataFrame):
+        self.calls = calls
+        self.objections = objections
+
+    # Loading
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "CallAnalytics":
+        """Build the columnar tables from normalized per-call rows"""
+        raw = pd.DataFrame.from_records(list(rows), columns=cls.COLUMNS + ['objections'])
+
+        calls = pd.DataFrame({
+            'call_id': raw['call_id'].astype("string"),
+            'source': raw['source'].astype("category"),
+            'timestamp': pd.to_datetime(raw['timestamp'], errors="coerce", format="ISO8601"),
+            'iteration': pd.to_numeric(raw['iteration']).astype("Int32"),
+            'persona': raw['persona'].astype("category"),
+            'farmer_name': raw['farmer_name'].astype("string"),
+            'agent_version': pd.to_numeric(raw['agent_version']).astype("Int32"),
+            'prompt_hash': raw['prompt_hash'].astype("string"),
+            **{name: pd.Categorical(raw[name], categories=categories)
+               for name, categories in LABEL_CATEGORIES.items()},
+            'intro_clarity': raw['intro_clarity'].fillna(True).astype(bool),
+            'objection_count': raw['objection_count'].fillna(0).astype(np.int16),
+            'recorded_effectiveness': pd.to_numeric(raw['recorded_effectiveness']).astype("Float64"),
+            'duration': pd.to_numeric(raw['duration']).astype("Float64"),
+            'turns': pd.to_numeric(raw['turns']).astype("Int16"),
+            'end_reason': raw['end_reason'].astype("category")
+        })
+        calls['effectiveness'] = calculate_effectiveness_scores(
+            calls['sentiment'].to_numpy(dtype=object), calls['interest_level'].to_numpy(dtype=object),
+            calls['objection_count'].to_numpy(), calls['call_outcome'].to_numpy(dtype=object),
+            calls['intro_clarity'].to_numpy()
+        )
+        calls['success'] = (calls['call_outcome'] == 'success').to_numpy(dtype=bool)
+
+        exploded = raw['objections'].explode().dropna()
+        objections = pd.DataFrame({
+            'row': exploded.index.to_numpy(dtype=np.int64),
+            'objection': pd.Categorical(exploded.to_numpy(dtype=object))
+        })
+        return cls(calls, objections)
+
+    @classmethod
+    def from_call_records(cls, call_log: Sequence[Any]) -> "CallAnalytics":
+        """Analytics over in-memory CallRecords"""
+        return cls.from_rows(cls.record_row(to_serializable(call), 'record') for call in call_log)
+
+    @classmethod
+    def from_paths(cls, log_dirs: Iterable[Union[str, Path]] = ("logs", "data/output/call_logs"),
+                   report_dirs: Iterable[Union[str, Path]] = ()) -> "CallAnalytics":
+        """Analytics over saved call records, session logs and system reports
+
+        Reports repeat the calls of runs that also saved records, so pass
+        report_dirs only for runs without saved records.
+        """
+        rows = []
+        for log_dir in log_dirs:
+            for log_path in sorted(Path(log_dir).glob("*.json")):
+                data = load_json_data(log_path)
+                if not isinstance(data, dict):
+                    continue
+                if 'conversation_turns' in data:
+                    rows.append(cls.record_row(data, 'record'))
+                elif isinstance(data.get('analysis'), dict):
+                    rows.append(cls.session_row(data))
+
+        for report_dir in report_dirs:
+            for report_path in sorted(Path(report_dir).glob("system_report_*.json")):
+                data = load_json_data(report_path)
+                if isinstance(data, dict):
+                    rows.extend(cls.report_rows(data, report_path))
+
+        return cls.from_rows(rows)
+
+    @staticmethod
+    def _labels(analysis: Dict) -> Dict[str, Any]:
+        objections = list(analysis.get('objections') or [])
+        return {
+            'sentiment': analysis.get('sentiment') or analysis.get('farmer_sentiment'),
+            'interest_level': analysis.get('interest_level'),
+            'intro_clarity': analysis.get('intro_clarity', True),
+            'call_outcome': analysis.get('call_outcome') or analysis.get('outcome'),
+            'objections': objections,
+            'objection_count': len(objections),
+            'recorded_effectiveness': analysis.get('agent_effectiveness', analysis.get('effectiveness'))
+        }
+
+    @classmethod
+    def record_row(cls, record: Dict, source: str) -> Dict[str, Any]:
+        """Row for a serialized CallRecord"""
+        profile = record.get('farmer_profile') or {}
+        return {
+            'call_id': record.get('call_id'),
+            'source': source,
+            'timestamp': record.get('call_start'),
+            'iteration': record.get('iteration'),
+            'persona': profile.get('persona_type') or profile.get('education'),
+            'farmer_name': profile.get('name'),
+            'agent_version': record.get('agent_version'),
+            'prompt_hash': record.get('prompt_hash'),
+            'duration': record.get('total_duration'),
+            'turns': len(record.get('conversation_turns') or []),
+            'end_reason': record.get('end_reason'),
+            **cls._labels(record.get('analysis') or {})
+        }
+
+    @classmethod
+    def session_row(cls, session: Dict) -> Dict[str, Any]:
+        """Row for a legacy session log (logs/call_*.json)"""
+        profile = session.get('farmer_profile') or {}
+        analysis = session['analysis']
+        return {
+            'call_id': session.get('session_id'),
+            'source': 'session_log',
+            'timestamp': session.get('timestamp'),
+            'persona': profile.get('persona_type') or profile.get('education_level'),
+            'farmer_name': profile.get('name'),
+            'agent_version': session.get('agent_version'),
+            'turns': len(analysis.get('farmer_responses') or []),
+            **cls._labels(analysis)
+        }
+
+    @classmethod
+    def report_rows(cls, report: Dict, report_path: Path) -> List[Dict[str, Any]]:
+        """Rows for the call_details of a saved system report"""
+        match = REPORT_TIMESTAMP.search(report_path.stem)
+        timestamp = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S") if match else None
+        return [{
+            'call_id': f"{report_path.stem}:{index}",
+            'source': 'report',
+            'timestamp': timestamp,
+            'iteration': details.get('iteration'),
+            'persona': details.get('persona') or details.get('farmer_education'),
+            'farmer_name': details.get('farmer_name'),
+            'agent_version': details.get('agent_version'),
+            'duration': details.get('duration'),
+            'turns': details.get('turns'),
+            'end_reason': details.get('end_reason'),
+            **cls._labels(details)
+        } for index, details in enumerate(report.get('call_details', []))]
+
+    # Queries
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    def summary(self) -> Dict[str, Any]:
+        """Overall call count, success rate, effectiveness and first-to-last improvement"""
+        if self.calls.empty:
+            return {'total_calls': 0, 'success_rate': 0.0, 'average_effectiveness': 0.0, 'improvement_achieved': 0}
+
+        effectiveness = self.calls['effectiveness'].to_numpy()
+        return {
+            'total_calls': len(self.calls),
+            'success_rate': float(self.calls['success'].mean()),
+            'average_effectiveness': float(effectiveness.mean()),
+            'improvement_achieved': float(effectiveness[-1] - effectiveness[0]) if len(effectiveness) > 1 else 0
+        }
+
+    def objection_frequencies(self, top: Optional[int] = None) -> pd.Series:
+        """Calls raising each objection, most frequent first"""
+        counts = self.objections['objection'].value_counts()
+        counts = counts[counts > 0]
+        return counts.head(top) if top else counts
+
+    def success_rates(self, by: Union[str, List[str]] = 'persona') -> pd.DataFrame:
+        """Calls, success rate and mean effectiveness per group (e.g. persona, agent_version)"""
+        return self.calls.groupby(by, observed=True, sort=True).agg(
+            calls=('success', 'size'),
+            success_rate=('success', 'mean'),
+            average_effectiveness=('effectiveness', 'mean')
+        )
+
+    def persona_version_matrix(self) -> pd.DataFrame:
+        """Success rate per persona (rows) and agent version (columns)"""
+        return self.calls.pivot_table(index='persona', columns='agent_version', values='success',
+                                      aggfunc='mean', observed=True)
+
+    def rolling(self, window: Union[int, str] = 50, column: str = 'effectiveness',
+                by: Optional[str] = None) -> Union[pd.Series, pd.DataFrame]:
+        """Rolling mean of a column in call order
+
+        ``window`` is a call count or a time offset such as ``"1D"`` (time
+        windows need timestamps). With ``by`` the window runs within each group.
+        """
+        calls = self.calls
+        if isinstance(window, str):
+            calls = calls.dropna(subset=['timestamp']).sort_values('timestamp', kind='stable')
+            values = calls.set_index('timestamp')
+        else:
+            values = calls
+        values = values[[column] + ([by] if by else [])].astype({column: float})
+
+        if by:
+            return values.groupby(by, observed=True)[column].rolling(window, min_periods=1).mean()
+        return values[column].rolling(window, min_periods=1).mean()
+
+    def to_report(self, top_objections: int = 3) -> Dict[str, Any]:
+        """JSON-friendly summary, objection counts and per-persona / per-version success rates"""
+        def records(frame: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+            return {str(key): {name: int(value) if name == 'calls' else float(value) for name, value in row.items()}
+                    for key, row in frame.iterrows()}
+
+        return {
+            **self.summary(),
+            'common_objections': {str(key): int(value)
+                                  for key, value in self.objection_frequencies(top_objections).items()},
+            'by_persona': records(self.success_rates('persona')),
+            'by_agent_version': records(self.success_rates('agent_version'))
+        }
@@ -1,10 +1,13 @@
 import os
 import yaml
 import json
+import logging
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 
+from .credentials import CredentialPool
+
 class ConfigManager:
     """Configuration manager for the voice agent system"""
     
@@ -12,6 +15,7 @@ class ConfigManager:
         self.config_dir = Path(config_dir)
         self._settings = None
         self._farmer_personas = None
+        self._farmer_personas_mtime = None
         self._prompts = None
         
         # Load environment variables
@@ -30,6 +34,7 @@ class ConfigManager:
             # Load farmer_personas.json
             with open(self.config_dir / "farmer_personas.json", 'r', encoding='utf-8') as f:
                 self._farmer_personas = json.load(f)
+            self._farmer_personas_mtime = (self.config_dir / "farmer_personas.json").stat().st_mtime
             
             # Load prompts.json
             with open(self.config_dir / "prompts.json", 'r', encoding='utf-8') as f:
@@ -42,6 +47,36 @@ class ConfigManager:
         except json.JSONDecodeError as e:
             raise ValueError(f"Error parsing JSON configuration: {e}")
     
+    def farmer_personas_changed(self) -> bool:
+        """Reload farmer_personas.json if it was modified on disk, returning True when it changed
+        
+        A file that cannot be read or parsed (e.g. mid-edit) is logged and
+        skipped until it changes again; the previous personas stay in use.
+        """
+        personas_path = self.config_dir / "farmer_personas.json"
+        logger = logging.getLogger(__name__)
+        try:
+            mtime = personas_path.stat().st_mtime
+        except OSError as e:
+            logger.error(f"❌ Could not check {personas_path}, keeping previous personas: {e}")
+            return False
+        
+        if self._farmer_personas_mtime is not None and mtime == self._farmer_personas_mtime:
+            return False
+        
+        first_load = self._farmer_personas_mtime is None
+        try:
+            with open(personas_path, 'r', encoding='utf-8') as f:
+                farmer_personas = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"❌ Could not reload {personas_path}, keeping previous personas: {e}")
+            self._farmer_personas_mtime = mtime  # Retried once the file changes again
+            return False
+        
+        self._farmer_personas = farmer_personas
+        self._farmer_personas_mtime = mtime
+        return not first_load
+    
     @property
     def settings(self) -> Dict[str, Any]:
         """Get system settings"""
@@ -78,8 +113,65 @@ class ConfigManager:
                     api_config[service] = {}
                 api_config[service][key] = env_value
         
+        # Collect every key per provider for the credential pools
+        for service in ("openai", "deepgram", "elevenlabs"):
+            api_keys = self._get_service_api_keys(service, api_config.get(service, {}))
+            if api_keys:
+                service_config = dict(api_config.get(service, {}))
+                service_config["api_keys"] = api_keys
+                service_config.setdefault("api_key", api_keys[0])
+                api_config[service] = service_config
+        
         return api_config
     
+    def _get_service_api_keys(self, service: str, service_config: Dict[str, Any]) -> List[str]:
+        """Get all API keys for a provider from env (comma-separated *_API_KEYS) and config"""
+        api_keys = []
+        
+        single_key = os.getenv(f"{service.upper()}_API_KEY") or service_config.get("api_key")
+        if single_key:
+            api_keys.append(single_key)
+        
+        multi_keys = os.getenv(f"{service.upper()}_API_KEYS", "")
+        api_keys.extend(key.strip() for key in multi_keys.split(",") if key.strip())
+        api_keys.extend(service_config.get("api_keys") or [])
+        
+        return list(dict.fromkeys(api_keys))
+    
+    def get_simulation_config(self) -> Dict[str, Any]:
+        """Get simulation configuration"""
+        return self._settings.get("simulation", {})
+    
+    def get_analysis_config(self) -> Dict[str, Any]:
+        """Get call analysis configuration"""
+        return self._settings.get("analysis", {})
+    
+    def get_context_config(self) -> Dict[str, Any]:
+        """Get conversation context budget configuration"""
+        return self._settings.get("context", {})
+    
+    def get_cache_config(self) -> Dict[str, Any]:
+        """Get caching configuration"""
+        return self._settings.get("caching", {})
+    
+    def get_credentials_config(self) -> Dict[str, Any]:
+        """Get credential pool configuration"""
+        return self._settings.get("credentials", {})
+    
+    def get_credential_pools(self) -> Dict[str, CredentialPool]:
+        """Build a load-balanced credential pool for every provider with keys"""
+        api_config = self.get_api_config()
+        credentials_config = self.get_credentials_config()
+        
+        pools = {}
+        for service in ("openai", "deepgram", "elevenlabs"):
+            api_keys = api_config.get(service, {}).get("api_keys", [])
+            if api_keys:
+                pool_config = {**credentials_config, **credentials_config.get(service, {})}
+                pools[service] = CredentialPool(service, api_keys, pool_config)
+        
+        return pools
+    
     def get_paths(self) -> Dict[str, str]:
         """Get configured paths"""
         paths = self._settings.get("paths", {})
@@ -108,7 +200,7 @@ class ConfigManager:
         validation_results = {}
         
         for key in required_keys:
-            validation_results[key] = bool(os.getenv(key))
+            validation_results[key] = bool(os.getenv(key) or os.getenv(f"{key}S"))
         
         return validation_results
     
@@ -0,0 +1,179 @@
+import logging
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .helpers import extract_keywords
+
+try:
+    import tiktoken
+except ImportError:  # Optional - fall back to a character heuristic
+    tiktoken = None
+
+DEFAULT_TOKEN_BUDGETS = {
+    'farmer_persona': 600,
+    'call_analyzer': 1500,
+    'reinforcement_engine': 800
+}
+
+# Topics the agent may have covered, used in the rolling summary
+AGENT_TOPICS = {
+    'subsidy': ['subsidy', '90%', '10%'],
+    'cost': ['cost', 'rupaye', 'paisa', 'installment'],
+    'process': ['process', 'application', 'approval', 'installation'],
+    'eligibility': ['eligib', 'documents', 'aadhaar'],
+    'trust': ['authorized', 'government', 'website', 'official']
+}
+
+class RollingSummary:
+    """Incrementally maintained summary of the turns folded out of the context window"""
+
+    def __init__(self):
+        self.folded_messages = 0
+        self.farmer_signals = Counter()
+        self.farmer_phrases = Counter()
+        self.agent_topics = Counter()
+
+    def fold(self, message: str, is_farmer: bool):
+        """Fold one message into the summary"""
+        text = message.lower()
+        if is_farmer:
+            for category, keywords in extract_keywords(text).items():
+                if keywords:
+                    self.farmer_signals[category] += 1
+                    self.farmer_phrases.update(keywords if category == 'objections' else [])
+        else:
+            for topic, markers in AGENT_TOPICS.items():
+                if any(marker in text for marker in markers):
+                    self.agent_topics[topic] += 1
+        self.folded_messages += 1
+
+    def render(self) -> str:
+        """Render the summary as a compact line"""
+        if not self.folded_messages:
+            return ""
+
+        parts = [f"Earlier in the call ({self.folded_messages // 2 or 1} exchanges folded)"]
+        if self.farmer_signals:
+            parts.append("farmer was " + ", ".join(
+                f"{signal} x{count}" for signal, count in self.farmer_signals.most_common(4)))
+        if self.farmer_phrases:
+            parts.append("farmer raised " + ", ".join(phrase for phrase, _ in self.farmer_phrases.most_common(4)))
+        if self.agent_topics:
+            parts.append("agent covered " + ", ".join(topic for topic, _ in self.agent_topics.most_common(4)))
+        return "; ".join(parts) + "."
+
+class ConversationContextManager:
+    """Keep LLM conversation context under a per-request-type token budget
+
+    Messages are alternating agent/farmer utterances (agent first). The newest
+    messages that fit the budget are kept verbatim and older ones are folded,
+    in agent/farmer pairs, into a rolling summary that is updated incrementally
+    per conversation.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.budgets = {**DEFAULT_TOKEN_BUDGETS, **config.get("token_budgets", {})}
+        self.max_conversations = config.get("max_tracked_conversations", 256)
+        self.logger = logging.getLogger(__name__)
+        self._encoding = tiktoken.get_encoding("cl100k_base") if tiktoken else None
+        self._token_counts = {}
+        self._summaries = OrderedDict()
+
+        self.metrics = {}
+
+    def count_tokens(self, text: str) -> int:
+        """Count (or estimate) tokens in a message, memoized per message text"""
+        count = self._token_counts.get(text)
+        if count is None:
+            if self._encoding is not None:
+                count = len(self._encoding.encode(text))
+            else:
+                # Romanized Hindi averages roughly 3.5 characters per token
+                count = max(1, int(len(text) / 3.5)) if text else 0
+            if len(self._token_counts) > 50000:
+                self._token_counts.clear()
+            self._token_counts[text] = count
+        return count
+
+    def _get_summary(self, conversation_id: Optional[str]) -> RollingSummary:
+        """Get the rolling summary for a conversation (a fresh one if untracked)"""
+        if conversation_id is None:
+            return RollingSummary()
+
+        summary = self._summaries.get(conversation_id)
+        if summary is None:
+            summary = RollingSummary()
+            self._summaries[conversation_id] = summary
+            while len(self._summaries) > self.max_conversations:
+                self._summaries.popitem(last=False)
+        else:
+            self._summaries.move_to_end(conversation_id)
+        return summary
+
+    def fit(self, messages: List[str], request_type: str, reserved_tokens: int = 0,
+            conversation_id: Optional[str] = None) -> Tuple[str, List[str], int]:
+        """Fit messages to the budget for a request type
+
+        Returns (summary, kept_messages, first_kept_index). ``reserved_tokens``
+        accounts for other parts of the request, such as the new agent message.
+        """
+        budget = max(0, self.budgets.get(request_type, DEFAULT_TOKEN_BUDGETS['farmer_persona']) - reserved_tokens)
+        summary = self._get_summary(conversation_id)
+        if summary.folded_messages > len(messages):
+            # Conversation id reused for a different transcript - start over
+            summary = RollingSummary()
+            self._summaries[conversation_id] = summary
+
+        # Walk back from the newest message until the budget is used up
+        used = 0
+        start = len(messages)
+        while start > summary.folded_messages:
+            tokens = self.count_tokens(messages[start - 1])
+            if used + tokens > budget:
+                break
+            used += tokens
+            start -= 1
+
+        # Fold whole agent/farmer pairs so speaker roles stay aligned
+        start = min(start + start % 2, len(messages))
+
+        # Only newly folded messages are processed (O(new turns) per call)
+        for index in range(summary.folded_messages, start):
+            summary.fold(messages[index], is_farmer=index % 2 == 1)
+
+        summary_text = summary.render()
+        kept = messages[start:]
+        self._record_savings(request_type, messages, kept, summary_text)
+        return summary_text, kept, start
+
+    def _record_savings(self, request_type: str, messages: List[str], kept: List[str], summary_text: str):
+        """Track full-transcript vs. budgeted token counts per request type"""
+        stats = self.metrics.setdefault(request_type, {
+            'requests': 0, 'full_tokens': 0, 'sent_tokens': 0, 'folded_requests': 0
+        })
+        full_tokens = sum(self.count_tokens(message) for message in messages)
+        sent_tokens = sum(self.count_tokens(message) for message in kept) + self.count_tokens(summary_text)
+
+        stats['requests'] += 1
+        stats['full_tokens'] += full_tokens
+        stats['sent_tokens'] += min(sent_tokens, full_tokens)
+        if len(kept) < len(messages):
+            stats['folded_requests'] += 1
+
+    def end_conversation(self, conversation_id: str):
+        """Drop the rolling summary of a finished conversation"""
+        self._summaries.pop(conversation_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get token savings per request type"""
+        stats = {}
+        for request_type, values in self.metrics.items():
+            saved = values['full_tokens'] - values['sent_tokens']
+            stats[request_type] = {
+                **values,
+                'budget': self.budgets.get(request_type),
+                'tokens_saved': saved,
+                'savings_rate': saved / values['full_tokens'] if values['full_tokens'] else 0.0
+            }
+        return stats
@@ -0,0 +1,131 @@
+import logging
+import math
+from collections import deque
+from statistics import NormalDist, mean, variance
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_CONVERGENCE_CONFIG = {
+    'enabled': False,
+    'window': 10,  # Calls per window; the last two windows are compared
+    'min_improvement': 0.05,  # Window-over-window effectiveness gain still worth learning for
+    'confidence': 0.9,
+    'patience': 2,  # Consecutive converged checks before acting
+    'action': 'stop_learning'  # stop_learning (keep calling with the current prompts) or stop_campaign
+}
+
+def t_quantile(probability: float, df: float) -> float:
+    """Student t quantile (Cornish-Fisher expansion around the normal quantile)"""
+    z = NormalDist().inv_cdf(probability)
+    if math.isinf(df):
+        return z
+    return (z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+
+def mean_interval(values: List[float], confidence: float) -> Tuple[float, float, float]:
+    """Mean of the values with its two-sided t confidence interval"""
+    center = mean(values)
+    if len(values) < 2:
+        return center, center, center
+    half_width = t_quantile(0.5 + confidence / 2, len(values) - 1) * math.sqrt(variance(values) / len(values))
+    return center, center - half_width, center + half_width
+
+def difference_interval(before: List[float], after: List[float], confidence: float) -> Tuple[float, float, float]:
+    """Difference of means (after - before) with its Welch t confidence interval"""
+    difference = mean(after) - mean(before)
+    var_before, var_after = variance(before) / len(before), variance(after) / len(after)
+    standard_error = math.sqrt(var_before + var_after)
+    if standard_error == 0:
+        return difference, difference, difference
+
+    # Welch-Satterthwaite degrees of freedom
+    df = (var_before + var_after) ** 2 / (var_before ** 2 / (len(before) - 1) + var_after ** 2 / (len(after) - 1))
+    half_width = t_quantile(0.5 + confidence / 2, df) * standard_error
+    return difference, difference - half_width, difference + half_width
+
+class ConvergenceMonitor:
+    """Detect when learning stops paying off from a sliding window of call effectiveness
+
+    After every call the latest window is compared with the one before it.
+    Learning has converged once the upper confidence bound of the
+    window-over-window improvement stays below ``min_improvement`` for
+    ``patience`` consecutive calls: even the optimistic estimate of further
+    gain is too small to pay for more learner calls and exploration.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = {**DEFAULT_CONVERGENCE_CONFIG, **(config or {})}
+        self.window = max(2, int(self.config['window']))
+        self.scores = deque(maxlen=2 * self.window)
+        self.logger = logging.getLogger(__name__)
+        self.converged = False
+        self.converged_at: Optional[int] = None
+        self.streak = 0
+        self.last_check: Optional[Dict] = None
+
+        self.metrics = {
+            'observations': 0,
+            'checks': 0,
+            'learning_steps_skipped': 0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config['enabled'])
+
+    @property
+    def stop_campaign(self) -> bool:
+        """Whether the campaign should end now"""
+        return self.converged and self.config['action'] == 'stop_campaign'
+
+    def observe(self, effectiveness: float) -> bool:
+        """Add a call's effectiveness and re-check convergence, returning whether converged"""
+        self.scores.append(float(effectiveness))
+        self.metrics['observations'] += 1
+        if self.enabled and not self.converged and len(self.scores) == self.scores.maxlen:
+            self.check()
+        return self.converged
+
+    def check(self) -> Dict:
+        """Compare the last two windows and update the convergence state"""
+        scores = list(self.scores)
+        before, after = scores[:-self.window], scores[-self.window:]
+        confidence = self.config['confidence']
+        improvement, low, high = difference_interval(before, after, confidence)
+        current, current_low, current_high = mean_interval(after, confidence)
+
+        self.streak = self.streak + 1 if high < self.config['min_improvement'] else 0
+        self.metrics['checks'] += 1
+        self.last_check = {
+            'observation': self.metrics['observations'],
+            'window_mean': current,
+            'window_interval': [current_low, current_high],
+            'improvement': improvement,
+            'improvement_interval': [low, high]
+        }
+
+        if self.streak >= self.config['patience']:
+            self.converged = True
+            self.converged_at = self.metrics['observations']
+            self.logger.info(f"📉 Learning converged after {self.converged_at} calls: window effectiveness "
+                             f"{current:.2f} [{current_low:.2f}, {current_high:.2f}], improvement {improvement:+.3f} "
+                             f"[{low:+.3f}, {high:+.3f}] < {self.config['min_improvement']}")
+        return self.last_check
+
+    def should_learn(self) -> bool:
+        """Whether to take a learning step (skips are counted once converged)"""
+        if self.converged:
+            self.metrics['learning_steps_skipped'] += 1
+            return False
+        return True
+
+    def get_stats(self) -> Dict:
+        """Get convergence state and the latest window comparison"""
+        return {
+            **self.metrics,
+            'enabled': self.enabled,
+            'converged': self.converged,
+            'converged_at': self.converged_at,
+            'action': self.config['action'],
+            'window': self.window,
+            'last_check': self.last_check
+        }
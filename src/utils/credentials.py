@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# HTTP statuses that take a key out of rotation
+REVOKED_STATUSES = {401, 403}
+RATE_LIMITED_STATUSES = {429}
+
+def mask_api_key(api_key: str) -> str:
+    """Mask an API key for logs and reports"""
+    if len(api_key) <= 8:
+        return "****"
+    return f"{api_key[:3]}...{api_key[-4:]}"
+
+class KeyLease:
+    """A single use of a pooled API key, reporting its outcome back to the pool"""
+
+    def __init__(self, pool: "CredentialPool", key: str):
+        self.pool = pool
+        self.key = key
+        self.status: Optional[int] = None
+
+    def mark_status(self, status: int):
+        """Record the HTTP status returned for this lease"""
+        self.status = status
+
+    def __enter__(self) -> "KeyLease":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if isinstance(exc, asyncio.CancelledError):
+            # Cancelled (e.g. a losing hedged request) - not the key's fault
+            self.pool.release(self.key)
+            return False
+
+        status = self.status
+        if exc is not None and status is None:
+            # openai.error.* exceptions carry the HTTP status
+            status = getattr(exc, "http_status", None)
+        success = exc is None and (status is None or status < 400)
+        self.pool.release(self.key, success=success, status=status)
+        return False
+
+class CredentialPool:
+    """Pool of API keys for one provider with load balancing and quarantine"""
+
+    def __init__(self, service: str, api_keys: List[str], config: Optional[Dict] = None):
+        config = config or {}
+        self.service = service
+        self.strategy = config.get("strategy", "least_loaded")  # least_loaded, round_robin
+        self.max_requests_per_minute = config.get("max_requests_per_minute")
+        self.rate_limit_cooldown = config.get("rate_limit_cooldown", 60)
+        self.logger = logging.getLogger(__name__)
+        self._next_index = 0
+
+        # Preserve order but drop duplicates and blanks
+        self.keys = list(dict.fromkeys(key for key in api_keys if key))
+        self.key_stats = {
+            key: {
+                'in_flight': 0,
+                'requests': 0,
+                'errors': 0,
+                'rate_limited': 0,
+                'recent_requests': deque(),
+                'quarantined_until': 0.0,
+                'revoked': False
+            }
+            for key in self.keys
+        }
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    def _recent_request_count(self, key: str, now: float) -> int:
+        """Count requests made with a key in the last minute"""
+        recent = self.key_stats[key]['recent_requests']
+        while recent and now - recent[0] > 60:
+            recent.popleft()
+        return len(recent)
+
+    def _is_available(self, key: str, now: float) -> bool:
+        """Check whether a key can take another request right now"""
+        stats = self.key_stats[key]
+        if stats['revoked'] or stats['quarantined_until'] > now:
+            return False
+        if self.max_requests_per_minute and self._recent_request_count(key, now) >= self.max_requests_per_minute:
+            return False
+        return True
+
+    def acquire(self) -> str:
+        """Select a key for the next request"""
+        if not self.keys:
+            raise RuntimeError(f"No API keys configured for {self.service}")
+
+        now = time.monotonic()
+        available = [key for key in self.keys if self._is_available(key, now)]
+
+        if not available:
+            # Every key is busy or cooling down - use the one that recovers first
+            usable = [key for key in self.keys if not self.key_stats[key]['revoked']]
+            if not usable:
+                raise RuntimeError(f"All API keys for {self.service} have been revoked")
+            key = min(usable, key=lambda k: self.key_stats[k]['quarantined_until'])
+            self.logger.warning(f"⚠️  All {self.service} keys are rate limited, using {mask_api_key(key)}")
+        elif self.strategy == "round_robin":
+            key = None
+            for offset in range(len(self.keys)):
+                candidate = self.keys[(self._next_index + offset) % len(self.keys)]
+                if candidate in available:
+                    key = candidate
+                    self._next_index = (self.keys.index(candidate) + 1) % len(self.keys)
+                    break
+        else:
+            key = min(available, key=lambda k: (self.key_stats[k]['in_flight'],
+                                                self._recent_request_count(k, now)))
+
+        stats = self.key_stats[key]
+        stats['in_flight'] += 1
+        stats['requests'] += 1
+        stats['recent_requests'].append(now)
+        return key
+
+    def release(self, key: str, success: bool = True, status: Optional[int] = None):
+        """Report the outcome of a request made with a key"""
+        stats = self.key_stats.get(key)
+        if stats is None:
+            return
+
+        stats['in_flight'] = max(0, stats['in_flight'] - 1)
+        if success:
+            return
+
+        stats['errors'] += 1
+        if status in REVOKED_STATUSES:
+            stats['revoked'] = True
+            self.logger.error(f"🔑 {self.service} key {mask_api_key(key)} rejected ({status}), removed from pool")
+        elif status in RATE_LIMITED_STATUSES:
+            stats['rate_limited'] += 1
+            stats['quarantined_until'] = time.monotonic() + self.rate_limit_cooldown
+            self.logger.warning(f"🔑 {self.service} key {mask_api_key(key)} rate limited, "
+                                f"quarantined for {self.rate_limit_cooldown}s")
+
+    def lease(self) -> KeyLease:
+        """Acquire a key as a context manager that reports the outcome on exit"""
+        return KeyLease(self, self.acquire())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-key usage statistics (keys are masked)"""
+        now = time.monotonic()
+        return {
+            'service': self.service,
+            'strategy': self.strategy,
+            'total_keys': len(self.keys),
+            'available_keys': sum(1 for key in self.keys if self._is_available(key, now)),
+            'keys': {
+                mask_api_key(key): {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'rate_limited': stats['rate_limited'],
+                    'in_flight': stats['in_flight'],
+                    'requests_last_minute': self._recent_request_count(key, now),
+                    'quarantined': stats['quarantined_until'] > now,
+                    'revoked': stats['revoked']
+                }
+                for key, stats in self.key_stats.items()
+            }
+        }
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class RequestHedger:
+    """Hedge slow requests by racing a duplicate once an adaptive latency threshold passes"""
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.enabled = config.get("enabled", False)
+        self.percentile = config.get("percentile", 0.9)
+        self.initial_delay = config.get("initial_delay", 2.0)
+        self.min_delay = config.get("min_delay", 0.2)
+        self.min_samples = config.get("min_samples", 20)
+        self.max_hedge_rate = config.get("max_hedge_rate", 0.1)
+        self.latencies = deque(maxlen=config.get("window_size", 200))
+        self.logger = logging.getLogger(__name__)
+
+        self.metrics = {
+            'requests': 0,
+            'hedges_fired': 0,
+            'hedge_wins': 0,
+            'primary_wins': 0,
+            'skipped_by_rate_cap': 0
+        }
+
+    def get_hedge_delay(self) -> float:
+        """Get the current hedging threshold in seconds (observed latency percentile)"""
+        if len(self.latencies) < self.min_samples:
+            return self.initial_delay
+
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return max(self.min_delay, ordered[index])
+
+    def _hedge_budget_available(self) -> bool:
+        """Check that one more hedge keeps the extra request rate under the cap"""
+        return (self.metrics['hedges_fired'] + 1) <= self.max_hedge_rate * self.metrics['requests']
+
+    async def _timed(self, request_factory: Callable[[], Awaitable[Any]], record_cancelled: bool = False) -> Any:
+        """Run a single attempt and record its latency if it succeeds
+
+        With ``record_cancelled`` the elapsed time of a cancelled attempt is
+        recorded too, as a lower bound on its latency. Without it the slow
+        primaries that lose to a hedge would never be observed, and the
+        threshold would drift down.
+        """
+        start = time.perf_counter()
+        try:
+            result = await request_factory()
+        except asyncio.CancelledError:
+            if record_cancelled:
+                self.latencies.append(time.perf_counter() - start)
+            raise
+        if result is not None:
+            self.latencies.append(time.perf_counter() - start)
+        return result
+
+    async def run(self, request_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a request, hedging it with an identical second attempt if it is slow
+
+        ``request_factory`` must create a fresh awaitable on every call. An attempt
+        counts as failed when it raises or returns None; the first successful attempt
+        wins and the other one is cancelled.
+        """
+        self.metrics['requests'] += 1
+
+        if not self.enabled:
+            return await self._timed(request_factory)
+
+        primary = asyncio.ensure_future(self._timed(request_factory, record_cancelled=True))
+        done, _ = await asyncio.wait({primary}, timeout=self.get_hedge_delay())
+        if done:
+            return primary.result()
+
+        if not self._hedge_budget_available():
+            self.metrics['skipped_by_rate_cap'] += 1
+            return await primary
+
+        self.metrics['hedges_fired'] += 1
+        hedge = asyncio.ensure_future(self._timed(request_factory))
+        pending = {primary, hedge}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the primary when both finish in the same tick
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if task.cancelled() or task.exception() is not None or task.result() is None:
+                        continue
+
+                    if task is hedge:
+                        self.metrics['hedge_wins'] += 1
+                        self.logger.info("⚡ Hedged request won the race")
+                    else:
+                        self.metrics['primary_wins'] += 1
+                    return task.result()
+        finally:
+            for task in (primary, hedge):
+                if not task.done():
+                    task.cancel()
+
+        # Both attempts failed - surface the primary's outcome
+        return primary.result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging statistics"""
+        hedges = self.metrics['hedges_fired']
+        requests = self.metrics['requests']
+
+        return {
+            **self.metrics,
+            'enabled': self.enabled,
+            'current_hedge_delay': self.get_hedge_delay(),
+            'hedge_rate': hedges / requests if requests else 0.0,
+            'hedge_win_rate': self.metrics['hedge_wins'] / hedges if hedges else 0.0
+        }
@@ -1,10 +1,19 @@
 import asyncio
+import dataclasses
+import hashlib
 import json
 import uuid
 from datetime import datetime, timedelta
+from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 import re
+import unicodedata
+
+import numpy as np
+
+from .keyword_matcher import BASE_CATEGORIES, get_keyword_matcher
+from .normalization import normalize_hindi_text
 
 def generate_call_id() -> str:
     """Generate unique call ID"""
@@ -17,7 +26,10 @@ def generate_audio_filename(call_id: str, speaker: str, turn: int, extension: st
     return f"{call_id}_{speaker}_turn{turn:02d}.{extension}"
 
 def clean_hindi_text(text: str) -> str:
-    """Clean and normalize Hindi text"""
+    """Clean and normalize Hindi text for display (see normalize_hindi_text for matching)"""
+    # Compose Devanagari sequences (nukta, matras) consistently
+    text = unicodedata.normalize('NFC', text)
+    
     # Remove extra whitespace
     text = re.sub(r'\s+', ' ', text).strip()
     
@@ -26,24 +38,20 @@ def clean_hindi_text(text: str) -> str:
     
     return text
 
-def extract_keywords(text: str, language: str = "hindi") -> List[str]:
-    """Extract keywords from text"""
-    # Define keyword patterns for Hindi
-    hindi_keywords = {
-        'positive': ['haan', 'achha', 'theek', 'zaroor', 'batayiye', 'details', 'chahiye', 'interested'],
-        'negative': ['nahi', 'mat', 'band', 'pareshan', 'time nahi', 'dhokha', 'problem'],
-        'neutral': ['dekhunga', 'sochenge', 'pata nahi', 'maybe', 'shayad'],
-        'confused': ['samajh nahi', 'kya bol rahe', 'ye kya', 'kaise', 'simple mein'],
-        'objections': ['kitne ka', 'free mein', 'paisa', 'eligible', 'documents', 'process']
-    }
-    
-    found_keywords = {}
-    text_lower = text.lower()
-    
-    for category, keywords in hindi_keywords.items():
-        found_keywords[category] = [kw for kw in keywords if kw in text_lower]
-    
-    return found_keywords
+def extract_keywords(text: str, language: str = "hindi") -> Dict[str, List[str]]:
+    """Extract keywords from text using the shared compiled lexicon matcher"""
+    matches = get_keyword_matcher().scan(text)
+    return {category: matches.keywords(category) for category in BASE_CATEGORIES}
+
+# Effectiveness scoring weights (see calculate_effectiveness_score). Bump SCORING_VERSION
+# whenever the formula changes; table changes are picked up by scoring_version()
+SCORING_VERSION = "1"
+SENTIMENT_SCORES = {'positive': 0.3, 'neutral': 0.15, 'negative': 0.0}  # 30%
+INTEREST_SCORES = {'high': 0.3, 'medium': 0.2, 'low': 0.1, 'confused': 0.05}  # 30%
+OUTCOME_SCORES = {'success': 0.2, 'follow_up': 0.1, 'failure': 0.0}  # 20%
+CLARITY_BONUS = 0.1  # 10%
+OBJECTION_PENALTY_PER_ITEM = 0.02
+MAX_OBJECTION_PENALTY = 0.1  # 10%
 
 def calculate_effectiveness_score(sentiment: str, interest: str, objections: List[str], 
                                 outcome: str, intro_clarity: bool) -> float:
@@ -51,27 +59,55 @@ def calculate_effectiveness_score(sentiment: str, interest: str, objections: Lis
     score = 0.0
     
     # Sentiment scoring (30%)
-    sentiment_scores = {'positive': 0.3, 'neutral': 0.15, 'negative': 0.0}
-    score += sentiment_scores.get(sentiment, 0.0)
+    score += SENTIMENT_SCORES.get(sentiment, 0.0)
     
     # Interest scoring (30%)
-    interest_scores = {'high': 0.3, 'medium': 0.2, 'low': 0.1, 'confused': 0.05}
-    score += interest_scores.get(interest, 0.0)
+    score += INTEREST_SCORES.get(interest, 0.0)
     
     # Clarity bonus (10%)
     if intro_clarity:
-        score += 0.1
+        score += CLARITY_BONUS
     
     # Objection penalty (10%)
-    objection_penalty = min(0.1, len(objections) * 0.02)
+    objection_penalty = min(MAX_OBJECTION_PENALTY, len(objections) * OBJECTION_PENALTY_PER_ITEM)
     score -= objection_penalty
     
     # Outcome scoring (20%)
-    outcome_scores = {'success': 0.2, 'follow_up': 0.1, 'failure': 0.0}
-    score += outcome_scores.get(outcome, 0.0)
+    score += OUTCOME_SCORES.get(outcome, 0.0)
     
     return max(0.0, min(1.0, score))
 
+def scoring_version() -> str:
+    """Short hash of SCORING_VERSION and the score tables (changes invalidate memoized analyses)"""
+    payload = json.dumps({
+        'version': SCORING_VERSION,
+        'sentiment': SENTIMENT_SCORES,
+        'interest': INTEREST_SCORES,
+        'outcome': OUTCOME_SCORES,
+        'clarity_bonus': CLARITY_BONUS,
+        'objection_penalty': [OBJECTION_PENALTY_PER_ITEM, MAX_OBJECTION_PENALTY]
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+def calculate_effectiveness_scores(sentiments, interests, objection_counts, outcomes, intro_clarity):
+    """Vectorized calculate_effectiveness_score over NumPy arrays of labels
+
+    Label arrays hold the same strings as the scalar version; objection_counts
+    is the number of objections per call.
+    """
+    def lookup(labels, scores):
+        labels = np.asarray(labels)
+        values = np.zeros(labels.shape, dtype=float)
+        for label, value in scores.items():
+            values[labels == label] = value
+        return values
+    
+    score = (lookup(sentiments, SENTIMENT_SCORES) + lookup(interests, INTEREST_SCORES) +
+             lookup(outcomes, OUTCOME_SCORES) + np.where(np.asarray(intro_clarity, dtype=bool), CLARITY_BONUS, 0.0))
+    score -= np.minimum(MAX_OBJECTION_PENALTY, np.asarray(objection_counts) * OBJECTION_PENALTY_PER_ITEM)
+    
+    return np.clip(score, 0.0, 1.0)
+
 def format_duration(seconds: float) -> str:
     """Format duration in seconds to human readable format"""
     if seconds < 60:
@@ -99,6 +135,20 @@ def save_json_data(data: Any, filepath: Union[str, Path], ensure_ascii: bool = F
         print(f"Error saving JSON to {filepath}: {e}")
         return False
 
+def to_serializable(obj: Any) -> Any:
+    """Convert dataclasses, enums and datetimes into JSON-friendly structures"""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: to_serializable(getattr(obj, f.name)) for f in dataclasses.fields(obj)}
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, dict):
+        return {key: to_serializable(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_serializable(value) for value in obj]
+    return obj
+
 def load_json_data(filepath: Union[str, Path]) -> Optional[Any]:
     """Load data from JSON file"""
     try:
@@ -0,0 +1,81 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .keyword_matcher import KeywordMatcher
+
+@dataclass(frozen=True)
+class RoutedReply:
+    """The agent's next message for a farmer reply"""
+    intent: str
+    reply: str
+    reply_id: str  # Stable id of the rendered reply (e.g. for pre-synthesized audio)
+
+def reply_id(reply: str) -> str:
+    """Short content hash of a text"""
+    return hashlib.sha256(reply.encode('utf-8')).hexdigest()[:12]
+
+class IntentRouter:
+    """Data-driven choice of the agent's next message
+
+    Routes (intent, keywords, priority, minimum turn, reply) are compiled
+    once: replies are rendered with the configured variables, and all
+    route keywords go into a single KeywordMatcher, so one scan of the
+    farmer's reply finds every candidate intent. The highest-priority route
+    that matched (and whose min_turn has been reached) wins.
+    """
+
+    def __init__(self, config: Dict):
+        variables = config.get('variables', {})
+        self.version = reply_id(json.dumps(config, sort_keys=True, ensure_ascii=False))
+
+        routes = sorted(enumerate(config.get('routes', [])),
+                        key=lambda item: (-item[1].get('priority', 0), item[0]))
+        self.routes: List[Tuple[str, Optional[str], int, RoutedReply]] = []
+        lexicon = {}
+        for _, route in routes:
+            category = f"route.{route['intent']}" if route.get('keywords') else None
+            if category:
+                lexicon[category] = list(route['keywords'])
+            self.routes.append((route['intent'], category, route.get('min_turn', 0),
+                                self._render(route['intent'], route['reply'], variables)))
+
+        fallback = config['fallback']
+        self.fallback = self._render(fallback['intent'], fallback['reply'], variables)
+        self.matcher = KeywordMatcher(lexicon)
+
+    @staticmethod
+    def _render(intent: str, reply: str, variables: Dict[str, str]) -> RoutedReply:
+        rendered = reply.format_map(variables)
+        return RoutedReply(intent, rendered, reply_id(rendered))
+
+    @classmethod
+    def from_prompts(cls, prompts_config: Dict, name: str = "intent_router") -> "IntentRouter":
+        """Router from a route config in prompts.json (response_templates.<name>)"""
+        config = prompts_config.get("response_templates", {}).get(name)
+        if not config:
+            raise ValueError(f"No response_templates.{name} route config in prompts.json")
+        return get_intent_router(config)
+
+    def route(self, farmer_response: str, turn: int) -> RoutedReply:
+        """Intent and reply for a farmer reply given after ``turn`` (0-based)"""
+        matches = self.matcher.scan(farmer_response)
+        for _, category, min_turn, routed in self.routes:
+            if turn >= min_turn and (category is None or matches.has(category)):
+                return routed
+        return self.fallback
+
+    def replies(self) -> Dict[str, str]:
+        """Every reply the router can give, by reply id (e.g. to synthesize audio ahead of calls)"""
+        replies = [routed for *_, routed in self.routes] + [self.fallback]
+        return {routed.reply_id: routed.reply for routed in replies}
+
+_routers: Dict[str, IntentRouter] = {}
+
+def get_intent_router(config: Dict) -> IntentRouter:
+    """Get the shared router compiled from a route config, built once per process"""
+    key = json.dumps(config, sort_keys=True, ensure_ascii=False)
+    if key not in _routers:
+        _routers[key] = IntentRouter(config)
+    return _routers[key]
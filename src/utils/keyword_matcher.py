@@ -0,0 +1,142 @@
+import hashlib
+import json
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .normalization import NORMALIZATION_VERSION, normalize_hindi_text
+
+# Shared Hindi/Hinglish lexicon for every keyword rule in the system.
+# Plain categories feed extract_keywords; dotted categories belong to the
+# analyzer (objection./clarity./outcome.) and the turn analyzer (end.).
+# The agent's follow-up routes live in prompts.json (see intent_router).
+HINDI_LEXICON = {
+    'positive': ['haan', 'achha', 'theek', 'zaroor', 'batayiye', 'details', 'chahiye', 'interested'],
+    'negative': ['nahi', 'mat', 'band', 'pareshan', 'time nahi', 'dhokha', 'problem'],
+    'neutral': ['dekhunga', 'sochenge', 'pata nahi', 'maybe', 'shayad'],
+    'confused': ['samajh nahi', 'kya bol rahe', 'ye kya', 'kaise', 'simple mein'],
+    'interested': ['details', 'batao', 'kaise milega', 'process kya', 'zaroor', 'interested'],
+    'objections': ['kitne ka', 'free mein', 'paisa', 'eligible', 'documents', 'process'],
+
+    'objection.cost_concern': ['kitne paise', 'paisa', 'cost'],
+    'objection.wants_free': ['free mein', 'bilkul free'],
+    'objection.trust_issues': ['kaun ho', 'sach hai', 'government'],
+    'objection.eligibility_doubt': ['eligible', 'qualification'],
+    'objection.time_constraints': ['time nahi', 'busy'],
+    'clarity.unclear': ['samajh nahi', 'kya bol rahe', 'simple mein'],
+    'outcome.follow_up': ['dobara call', 'baad mein call'],
+    'outcome.failure': ['nahi chahiye', 'band karo', 'interested nahi'],
+
+    'end.reject': ['nahi chahiye', 'interested nahi', 'band karo', 'problem hai'],
+    'end.agree': ['haan kar do', 'register karo', 'proceed', 'lagwana hai'],
+    'end.call_later': ['baad mein call', 'time nahi', 'busy hun']
+}
+
+# Categories returned by helpers.extract_keywords
+BASE_CATEGORIES = ['positive', 'negative', 'neutral', 'confused', 'interested', 'objections']
+
+_END = '\0'
+
+# Bump when matching semantics change (part of KeywordMatcher.version)
+MATCHING_VERSION = "w1"
+
+class KeywordMatches:
+    """All lexicon hits in one text, grouped by category with match positions"""
+
+    def __init__(self, hits: Dict[str, List[Tuple[str, int]]], lexicon: Dict[str, List[str]]):
+        self.hits = hits
+        self._lexicon = lexicon
+
+    def has(self, category: str) -> bool:
+        """Whether any keyword of the category occurs"""
+        return category in self.hits
+
+    def keywords(self, category: str) -> List[str]:
+        """Distinct keywords found for a category, in lexicon order"""
+        found = {keyword for keyword, _ in self.hits.get(category, [])}
+        return [keyword for keyword in self._lexicon.get(category, []) if keyword in found]
+
+    def positions(self, category: str) -> List[Tuple[str, int]]:
+        """(keyword, start offset) for every occurrence of a category's keywords"""
+        return list(self.hits.get(category, []))
+
+    def categories(self) -> List[str]:
+        """Categories with at least one hit"""
+        return list(self.hits)
+
+class KeywordMatcher:
+    """Compiled multi-pattern matcher over a category lexicon
+
+    Keywords and texts both go through normalize_hindi_text, so Devanagari
+    and romanized spellings match the same rules. One combined lookahead
+    regex finds every word start where some keyword may begin (a single
+    C-level pass); a character trie then reports all keywords, including
+    overlapping ones, beginning there. Keywords must start at a word
+    boundary but may end inside a word (``government`` matches
+    ``governments``), so folded short keywords do not fire inside other
+    words (``haan`` -> ``han`` inside ``pareshan``).
+    """
+
+    def __init__(self, lexicon: Optional[Dict[str, List[str]]] = None, cache_size: int = 4096):
+        self.lexicon = {category: list(keywords) for category, keywords in (lexicon or HINDI_LEXICON).items()}
+        self.version = f"{self.lexicon_hash(self.lexicon)}-n{NORMALIZATION_VERSION}-{MATCHING_VERSION}"
+
+        # Normalized keyword -> [(category, lexicon keyword)]
+        self._keyword_entries = defaultdict(list)
+        for category, keywords in self.lexicon.items():
+            for keyword in keywords:
+                self._keyword_entries[normalize_hindi_text(keyword)].append((category, keyword))
+
+        self._trie = {}
+        for keyword in self._keyword_entries:
+            node = self._trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[_END] = keyword
+
+        self._max_length = max((len(keyword) for keyword in self._keyword_entries), default=0)
+        alternatives = sorted(self._keyword_entries, key=len, reverse=True)
+        self._pattern = re.compile("(?<![a-z0-9])(?=(?:" + "|".join(re.escape(k) for k in alternatives) + "))")
+        self._cached_scan = lru_cache(maxsize=cache_size)(self._scan)
+
+    @staticmethod
+    def lexicon_hash(lexicon: Dict[str, List[str]]) -> str:
+        """Stable hash of a lexicon, used to invalidate anything derived from it"""
+        payload = json.dumps(lexicon, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+    def _scan(self, text: str) -> KeywordMatches:
+        hits = defaultdict(list)
+        trie = self._trie
+        entries = self._keyword_entries
+
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            node = trie
+            for char in text[start:start + self._max_length]:
+                node = node.get(char)
+                if node is None:
+                    break
+                keyword = node.get(_END)
+                if keyword is not None:
+                    for category, lexicon_keyword in entries[keyword]:
+                        hits[category].append((lexicon_keyword, start))
+
+        return KeywordMatches(dict(hits), self.lexicon)
+
+    def scan(self, text: str) -> KeywordMatches:
+        """Find every category hit in a single pass over the normalized text
+
+        Match positions are offsets into ``normalize_hindi_text(text)``.
+        """
+        return self._cached_scan(normalize_hindi_text(text))
+
+_default_matcher = None
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Get the shared matcher compiled from HINDI_LEXICON (built once per process)"""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = KeywordMatcher()
+    return _default_matcher
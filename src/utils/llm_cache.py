@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# USD per 1K tokens, used to report the spend avoided by cache hits
+DEFAULT_TOKEN_PRICES = {
+    'gpt-4': {'prompt': 0.03, 'completion': 0.06},
+    'gpt-4-turbo': {'prompt': 0.01, 'completion': 0.03},
+    'gpt-3.5-turbo': {'prompt': 0.0015, 'completion': 0.002}
+}
+
+class LLMResponseCache:
+    """Persistent exact-match cache for LLM chat completions with TTL and LRU eviction"""
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.path = config.get("path", "data/cache/llm_responses.sqlite")
+        self.ttl_seconds = config.get("ttl_seconds", 7 * 24 * 3600)
+        self.max_entries = config.get("max_entries", 10000)
+        self.token_prices = {**DEFAULT_TOKEN_PRICES, **config.get("token_prices", {})}
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                component TEXT,
+                content TEXT NOT NULL,
+                cost REAL DEFAULT 0,
+                tokens INTEGER DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_accessed ON responses(last_accessed)")
+        self._conn.commit()
+
+        self.metrics = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+            'tokens_saved': 0,
+            'dollars_saved': 0.0,
+            'by_component': {}
+        }
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        """Hash model, messages and sampling params into a cache key
+
+        Messages are hashed verbatim: normalization is lossy, and two prompts
+        that normalize alike can still get different completions.
+        """
+        payload = json.dumps({'model': model, 'messages': messages, 'params': params},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def estimate_cost(self, model: str, usage: Optional[Dict[str, int]]) -> float:
+        """Estimate the USD cost of a completion from its token usage"""
+        if not usage:
+            return 0.0
+
+        prices = self.token_prices.get(model)
+        if prices is None:
+            # Fall back to the longest matching model family (e.g. gpt-4-0613 -> gpt-4)
+            families = [name for name in self.token_prices if model.startswith(name)]
+            prices = self.token_prices[max(families, key=len)] if families else {}
+
+        return (usage.get('prompt_tokens', 0) * prices.get('prompt', 0.0) +
+                usage.get('completion_tokens', 0) * prices.get('completion', 0.0)) / 1000
+
+    def _component_metrics(self, component: str) -> Dict[str, int]:
+        return self.metrics['by_component'].setdefault(component, {'hits': 0, 'misses': 0})
+
+    def get(self, model: str, messages: List[Dict[str, str]], params: Dict[str, Any],
+            component: str = "default") -> Optional[str]:
+        """Look up a cached completion, returning None on a miss"""
+        key = self.make_key(model, messages, params)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, cost, tokens, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.ttl_seconds and now - row[3] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.metrics['expired'] += 1
+                row = None
+
+            if row is None:
+                self.metrics['misses'] += 1
+                self._component_metrics(component)['misses'] += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+        content, cost, tokens, _ = row
+        self.metrics['hits'] += 1
+        self.metrics['tokens_saved'] += tokens
+        self.metrics['dollars_saved'] += cost
+        self._component_metrics(component)['hits'] += 1
+        self.logger.info(f"💾 LLM cache hit ({component})")
+        return content
+
+    def put(self, model: str, messages: List[Dict[str, str]], params: Dict[str, Any], content: str,
+            usage: Optional[Dict[str, int]] = None, component: str = "default"):
+        """Store a completion, evicting least recently used entries past max_entries"""
+        key = self.make_key(model, messages, params)
+        now = time.time()
+        usage = dict(usage or {})
+        cost = self.estimate_cost(model, usage)
+        tokens = usage.get('total_tokens', usage.get('prompt_tokens', 0) + usage.get('completion_tokens', 0))
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, component, content, cost, tokens, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, component, content, cost, tokens, now, now)
+            )
+
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if self.max_entries and count > self.max_entries:
+                overflow = count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_accessed ASC LIMIT ?)", (overflow,)
+                )
+                self.metrics['evictions'] += overflow
+
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit rate and savings"""
+        lookups = self.metrics['hits'] + self.metrics['misses']
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+        return {
+            **self.metrics,
+            'entries': entries,
+            'hit_rate': self.metrics['hits'] / lookups if lookups else 0.0,
+            'dollars_saved': round(self.metrics['dollars_saved'], 4)
+        }
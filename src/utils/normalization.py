@@ -0,0 +1,145 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# Bump when any table or folding rule changes; used to invalidate derived caches
+NORMALIZATION_VERSION = "2"
+
+CONSONANTS = {
+    'क': 'k', 'ख': 'kh', 'ग': 'g', 'घ': 'gh', 'ङ': 'n',
+    'च': 'ch', 'छ': 'chh', 'ज': 'j', 'झ': 'jh', 'ञ': 'n',
+    'ट': 't', 'ठ': 'th', 'ड': 'd', 'ढ': 'dh', 'ण': 'n',
+    'त': 't', 'थ': 'th', 'द': 'd', 'ध': 'dh', 'न': 'n',
+    'प': 'p', 'फ': 'ph', 'ब': 'b', 'भ': 'bh', 'म': 'm',
+    'य': 'y', 'र': 'r', 'ल': 'l', 'ळ': 'l', 'व': 'v',
+    'श': 'sh', 'ष': 'sh', 'स': 's', 'ह': 'h'
+}
+
+# Consonant + nukta (NFC keeps these decomposed)
+NUKTA_CONSONANTS = {
+    'क': 'q', 'ख': 'kh', 'ग': 'g', 'ज': 'z', 'ड': 'r', 'ढ': 'rh', 'फ': 'f', 'य': 'y'
+}
+
+VOWELS = {
+    'अ': 'a', 'आ': 'aa', 'इ': 'i', 'ई': 'ee', 'उ': 'u', 'ऊ': 'oo', 'ऋ': 'ri',
+    'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au', 'ऑ': 'o', 'ऍ': 'e'
+}
+
+MATRAS = {
+    'ा': 'aa', 'ि': 'i', 'ी': 'ee', 'ु': 'u', 'ू': 'oo', 'ृ': 'ri',
+    'े': 'e', 'ै': 'ai', 'ो': 'o', 'ौ': 'au', 'ॉ': 'o', 'ॅ': 'e'
+}
+
+VIRAMA = '्'
+NUKTA = '़'
+NASALS = {'ं': 'n', 'ँ': 'n'}
+VISARGA = 'ः'
+LABIALS = ('p', 'b', 'm', 'f')
+
+DEVANAGARI_DIGITS = str.maketrans('०१२३४५६७८९', '0123456789')
+
+# Spelling variants folded to one canonical romanization (applied in order)
+ROMAN_REPLACEMENTS = [
+    ('chchh', 'ch'), ('chch', 'ch'), ('cch', 'ch'), ('chh', 'ch'),
+    ('aa', 'a'), ('ee', 'i'), ('ii', 'i'), ('oo', 'u'), ('uu', 'u')
+]
+ROMAN_LETTERS = str.maketrans({'z': 'j', 'w': 'v', 'q': 'k'})
+ROMAN_WORD_FOLDS = [
+    (r'\bnahin\b', 'nahi'), (r'\bmein\b', 'men'), (r'iye\b', 'ie'), (r'(?<=[aeiou])y(?=i)', ''),
+    (r'\bcall\b', 'kol')  # Devanagari कॉल (English "call") transliterates to kol
+]
+
+_DEVANAGARI_WORD = re.compile(r'[ऀ-ॣ०-ॿ]+')  # dandas (।॥) fold as punctuation
+_NON_WORD = re.compile(r'[^a-z0-9\s]+')
+_WHITESPACE = re.compile(r'\s+')
+_ROMAN_WORD_FOLDS = [(re.compile(pattern), replacement) for pattern, replacement in ROMAN_WORD_FOLDS]
+
+def _syllables(word: str):
+    """Split a Devanagari word into [consonant, vowel_or_None, has_inherent_schwa] units"""
+    units = []
+    i = 0
+    while i < len(word):
+        char = word[i]
+        if char in CONSONANTS:
+            roman = CONSONANTS[char]
+            if i + 1 < len(word) and word[i + 1] == NUKTA:
+                roman = NUKTA_CONSONANTS.get(char, roman)
+                i += 1
+            vowel = 'a'  # inherent schwa, possibly deleted later
+            if i + 1 < len(word):
+                following = word[i + 1]
+                if following == VIRAMA:
+                    vowel = None
+                    i += 1
+                elif following in MATRAS:
+                    vowel = MATRAS[following]
+                    i += 1
+            units.append([roman, vowel, vowel == 'a'])
+        elif char in VOWELS:
+            units.append(['', VOWELS[char], False])
+        elif char in NASALS:
+            units.append([NASALS[char], None, False])
+        elif char == VISARGA:
+            units.append(['h', None, False])
+        elif char in MATRAS:
+            units.append(['', MATRAS[char], False])
+        else:
+            units.append([char.translate(DEVANAGARI_DIGITS) if char.isdigit() else '', None, False])
+        i += 1
+    return units
+
+@lru_cache(maxsize=65536)
+def transliterate_word(word: str) -> str:
+    """Transliterate one Devanagari word with schwa deletion (memoized per word)"""
+    units = _syllables(word)
+
+    # Word-final schwa is silent (समझ -> samajh)
+    last_consonant = len(units) - 1
+    while last_consonant >= 0 and not units[last_consonant][0]:
+        last_consonant -= 1
+    if last_consonant > 0 and units[last_consonant][2] and last_consonant == len(units) - 1:
+        units[last_consonant][1] = None
+
+    # Medial schwa in V C _ C V context is silent (कितने -> kitne), right to left
+    for index in range(len(units) - 2, 0, -1):
+        unit = units[index]
+        if not unit[2] or unit[1] is None:
+            continue
+        previous, following = units[index - 1], units[index + 1]
+        if previous[1] is not None and following[0] and following[1] is not None:
+            unit[1] = None
+
+    parts = []
+    for index, (roman, vowel, _) in enumerate(units):
+        if roman == 'n' and vowel is None and index + 1 < len(units) and units[index + 1][0].startswith(LABIALS):
+            roman = 'm'  # anusvara before a labial (सम्पर्क -> sampark)
+        parts.append(roman + (vowel or ''))
+    return "".join(parts)
+
+def transliterate_devanagari(text: str) -> str:
+    """Replace every Devanagari run in text with its romanization"""
+    return _DEVANAGARI_WORD.sub(lambda match: transliterate_word(match.group(0)), text)
+
+def fold_romanized(text: str) -> str:
+    """Fold romanized spelling variants (theek/thik, achha/acha, zaroor/jarur)"""
+    for source, replacement in ROMAN_REPLACEMENTS:
+        if source in text:
+            text = text.replace(source, replacement)
+    text = text.translate(ROMAN_LETTERS)
+    for pattern, replacement in _ROMAN_WORD_FOLDS:
+        text = pattern.sub(replacement, text)
+    return text
+
+@lru_cache(maxsize=16384)
+def normalize_hindi_text(text: str) -> str:
+    """Canonical matching form of Hindi/Hinglish text
+
+    Unicode NFC, lowercase, Devanagari transliterated to romanized Hindi,
+    punctuation folded to spaces, spelling variants folded and whitespace
+    collapsed. Used for keyword matching and cache keys, never for display.
+    """
+    text = unicodedata.normalize('NFC', text).lower()
+    text = transliterate_devanagari(text)
+    text = _NON_WORD.sub(' ', text)
+    text = fold_romanized(text)
+    return _WHITESPACE.sub(' ', text).strip()
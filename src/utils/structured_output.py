@@ -0,0 +1,285 @@
+import json
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+DEFAULT_STRUCTURED_OUTPUT_CONFIG = {
+    'function_calling': True,  # Constrain replies to the pydantic schema via OpenAI function calling
+    'stream': True,  # Parse incrementally and stop reading once the JSON object is complete
+    'max_retries': 1  # Corrective re-asks when a reply cannot be parsed or repaired
+}
+
+# A complete JSON literal or number; anything else left at the cut is a partial token
+JSON_SCALAR = re.compile(r'true|false|null|-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?')
+
+class StructuredOutputError(ValueError):
+    """Raised when an LLM reply cannot be parsed or validated against its schema"""
+
+class IncrementalJSONParser:
+    """Track the first top-level JSON object in streamed text
+
+    ``feed`` consumes chunks as they arrive and returns True once the object
+    is closed, so the caller can stop reading. Prose or code fences before
+    the object are skipped.
+    """
+
+    def __init__(self):
+        self.buffer: List[str] = []
+        self.stack: List[str] = []
+        self.started = False
+        self.complete = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> bool:
+        for char in chunk:
+            if self.complete:
+                break
+            if not self.started:
+                if char != '{':
+                    continue
+                self.started = True
+
+            self.buffer.append(char)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.stack.append('}' if char == '{' else ']')
+            elif char in '}]':
+                if self.stack and self.stack[-1] == char:
+                    self.stack.pop()
+                if not self.stack:
+                    self.complete = True
+        return self.complete
+
+    @property
+    def text(self) -> str:
+        return "".join(self.buffer)
+
+def extract_json_object(text: str) -> Tuple[str, bool]:
+    """First balanced JSON object in text, and whether it was closed"""
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.text, parser.complete
+
+def repair_json(text: str) -> str:
+    """Cheap repair of a truncated JSON object
+
+    Closes an open string (dropping a cut escape), drops a literal or
+    number cut mid-token (``tr``, ``0.``), a dangling key or trailing comma
+    and closes every open array/object in order.
+    """
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    repaired = parser.text
+    if parser.complete or not repaired:
+        return repaired
+
+    if parser.in_string:
+        if parser.escaped:
+            repaired = repaired[:-1]
+        escape = re.search(r'(\\+)u[0-9a-fA-F]{0,3}$', repaired)
+        if escape and len(escape.group(1)) % 2:  # Cut inside a \uXXXX escape
+            repaired = repaired[:escape.end(1) - 1]
+        stripped = repaired + '"'
+    else:
+        stripped = repaired.rstrip()
+        token = re.search(r'[A-Za-z0-9.+\-]+$', stripped)
+        if token and not JSON_SCALAR.fullmatch(token.group()):
+            stripped = stripped[:token.start()].rstrip()
+
+    # Dangling `"key":` or `"key"` inside an object, or a trailing comma
+    if parser.stack and parser.stack[-1] == '}':
+        if stripped.endswith(':'):
+            stripped = stripped[:-1].rstrip()
+        if stripped.endswith('"'):
+            before = stripped[:stripped.rfind('"', 0, len(stripped) - 1)].rstrip()
+            if before.endswith(',') or before.endswith('{'):
+                stripped = before
+    stripped = stripped.rstrip(', \n\t')
+
+    return stripped + "".join(reversed(parser.stack))
+
+def validate_model(model_cls: Type[BaseModel], data: Dict) -> BaseModel:
+    """Validate data against a pydantic model (v1 or v2)"""
+    if hasattr(model_cls, "model_validate"):
+        return model_cls.model_validate(data)
+    return model_cls.parse_obj(data)
+
+def model_schema(model_cls: Type[BaseModel]) -> Dict[str, Any]:
+    """JSON schema of a pydantic model (v1 or v2)"""
+    if hasattr(model_cls, "model_json_schema"):
+        return model_cls.model_json_schema()
+    return model_cls.schema()
+
+def model_to_dict(instance: BaseModel) -> Dict[str, Any]:
+    return instance.model_dump() if hasattr(instance, "model_dump") else instance.dict()
+
+def function_spec(name: str, description: str, model_cls: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAI function-calling parameters that force a reply matching the model schema"""
+    schema = {key: value for key, value in model_schema(model_cls).items() if key != "title"}
+    return {
+        "functions": [{"name": name, "description": description, "parameters": schema}],
+        "function_call": {"name": name}
+    }
+
+class StructuredOutputParser:
+    """Parse LLM replies into pydantic models, repairing truncated JSON, with metrics"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.metrics = {
+            'responses': 0,
+            'parsed_clean': 0,
+            'repaired': 0,
+            'parse_failures': 0,
+            'validation_failures': 0,
+            'retries': 0,
+            'retry_successes': 0
+        }
+
+    def parse(self, text: str, model_cls: Type[BaseModel]) -> BaseModel:
+        """Parse and validate one reply, raising StructuredOutputError on failure"""
+        data, repaired = self.parse_json(text)
+
+        try:
+            result = validate_model(model_cls, data)
+        except ValidationError as e:
+            self.metrics['validation_failures'] += 1
+            raise StructuredOutputError(f"LLM response does not match {model_cls.__name__}: {e}")
+
+        if repaired:
+            self.logger.info(f"🩹 Repaired truncated {model_cls.__name__} JSON")
+        return result
+
+    def parse_json(self, text: str) -> Tuple[Dict[str, Any], bool]:
+        """Extract (and if needed repair) the JSON object of one reply
+        
+        Returns (data, repaired); raises StructuredOutputError if no object
+        can be recovered. Callers validating parts of the object themselves
+        use this directly.
+        """
+        self.metrics['responses'] += 1
+        candidate, complete = extract_json_object(text)
+        data, repaired = None, False
+
+        if complete:
+            try:
+                data = json.loads(candidate)
+            except json.JSONDecodeError:
+                data = None
+        if data is None and candidate:
+            try:
+                data = json.loads(repair_json(candidate))
+                repaired = True
+            except json.JSONDecodeError:
+                data = None
+
+        if not isinstance(data, dict):
+            self.metrics['parse_failures'] += 1
+            raise StructuredOutputError("Could not extract JSON from LLM response")
+
+        self.metrics['repaired' if repaired else 'parsed_clean'] += 1
+        return data, repaired
+
+    def record_retry(self, succeeded: bool):
+        self.metrics['retries'] += 1
+        if succeeded:
+            self.metrics['retry_successes'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get parse, repair and retry rates"""
+        responses = self.metrics['responses']
+        failures = self.metrics['parse_failures'] + self.metrics['validation_failures']
+        return {
+            **self.metrics,
+            'parse_failure_rate': failures / responses if responses else 0.0,
+            'repair_rate': self.metrics['repaired'] / responses if responses else 0.0,
+            'retry_rate': self.metrics['retries'] / responses if responses else 0.0
+        }
+
+def corrective_messages(messages: List[Dict[str, str]], reply: str, error: Exception) -> List[Dict[str, str]]:
+    """Messages for a re-ask after an unparseable reply"""
+    return messages + [
+        {"role": "assistant", "content": reply},
+        {"role": "user", "content": f"That reply was not valid JSON for the required schema ({error}). "
+                                    f"Reply with only the corrected, complete JSON object."}
+    ]
+
+async def parse_with_retries(complete: Callable[[List[Dict[str, str]]], Awaitable[Tuple[str, Optional[Dict]]]],
+                             messages: List[Dict[str, str]], model_cls: Type[BaseModel],
+                             parser: StructuredOutputParser, max_retries: int = 1,
+                             validate: Optional[Callable[[BaseModel], None]] = None
+                             ) -> Tuple[BaseModel, str, Optional[Dict], List[Dict[str, str]]]:
+    """Request and parse a structured reply, re-asking with the error on failure
+
+    ``complete`` maps messages to (text, usage). ``validate`` may add checks
+    the schema cannot express by raising StructuredOutputError. Returns the
+    parsed model, the reply text and usage, and the messages that produced it.
+    """
+    attempt = 0
+    while True:
+        text, usage = await complete(messages)
+        try:
+            result = parser.parse(text, model_cls)
+            if validate:
+                validate(result)
+        except StructuredOutputError as e:
+            if attempt:
+                parser.record_retry(False)
+            if attempt >= max_retries:
+                raise
+            attempt += 1
+            parser.logger.warning(f"Retrying unparseable {model_cls.__name__} reply: {e}")
+            messages = corrective_messages(messages, text, e)
+            continue
+        if attempt:
+            parser.record_retry(True)
+        return result, text, usage, messages
+
+async def read_completion(response: Any, stream: bool,
+                          count_tokens: Optional[Callable[[str], int]] = None,
+                          prompt_tokens: int = 0) -> Tuple[str, Dict[str, int]]:
+    """Text (or function arguments) and usage of a chat completion
+
+    For streamed responses chunks are parsed incrementally and reading stops
+    as soon as the JSON object is complete (the stream is then closed);
+    usage is then estimated.
+    """
+    if not stream:
+        message = response.choices[0].message
+        function_call = message.get("function_call")
+        text = function_call.get("arguments", "") if function_call else (message.get("content") or "")
+        return text.strip(), dict(response.get("usage") or {})
+
+    parser = IncrementalJSONParser()
+    pieces = []
+    try:
+        async for chunk in response:
+            delta = chunk.choices[0].get("delta", {})
+            piece = (delta.get("function_call") or {}).get("arguments") or delta.get("content") or ""
+            pieces.append(piece)
+            if parser.feed(piece):
+                break
+    finally:
+        # Stopping early must still release the HTTP stream
+        close = getattr(response, "aclose", None)
+        if close is not None:
+            await close()
+
+    text = "".join(pieces).strip()
+    completion_tokens = count_tokens(text) if count_tokens else 0
+    return text, {
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'total_tokens': prompt_tokens + completion_tokens
+    }
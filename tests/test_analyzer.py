@@ -0,0 +1,61 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.components.call_analyzer import CallAnalyzer
+from src.utils import helpers
+from src.utils.analysis_store import AnalysisMemoStore
+from src.utils.helpers import calculate_effectiveness_score, calculate_effectiveness_scores, scoring_version
+
+def test_scoring_version_follows_the_constant_and_the_tables(monkeypatch):
+    version = scoring_version()
+    assert scoring_version() == version
+
+    monkeypatch.setitem(helpers.OUTCOME_SCORES, 'follow_up', 0.15)
+    changed_table = scoring_version()
+    assert changed_table != version
+
+    monkeypatch.setattr(helpers, 'SCORING_VERSION', helpers.SCORING_VERSION + "-next")
+    assert scoring_version() not in (version, changed_table)
+
+def test_vectorized_scores_match_the_scalar_formula():
+    calls = [('positive', 'high', [], 'success', True),
+             ('neutral', 'confused', ['cost_concern', 'trust_issues'], 'follow_up', False),
+             ('negative', 'low', ['cost_concern'] * 7, 'failure', True)]
+    scalar = [calculate_effectiveness_score(*call) for call in calls]
+    sentiments, interests, objections, outcomes, clarity = zip(*calls)
+    vectorized = calculate_effectiveness_scores(sentiments, interests, [len(items) for items in objections],
+                                                outcomes, clarity)
+    assert np.allclose(vectorized, scalar)
+    assert scalar[0] == pytest.approx(0.9)
+
+AGENT = ["Namaste ji, solar pump yojana ke baare mein baat karni thi"]
+AGREES = ["Haan ji bataiye, kitne paise lagenge?", "Theek hai, register kar dijiye"]
+REFUSES = ["Nahi chahiye"]
+
+def test_rule_based_analysis_without_an_api_key():
+    analysis = asyncio.run(CallAnalyzer("", {}).analyze_conversation(AGENT, AGREES))
+    assert analysis.source == 'rules'
+    assert analysis.call_outcome.value == 'success'
+    assert analysis.objections == ['cost_concern']
+    assert analysis.farmer_responses == AGREES
+
+def test_identical_transcripts_reuse_the_memoized_analysis():
+    memo = AnalysisMemoStore({'path': ':memory:'})
+    analyzer = CallAnalyzer("", {}, memo_store=memo)
+    first = asyncio.run(analyzer.analyze_conversation(AGENT, AGREES))
+    second = asyncio.run(analyzer.analyze_conversation(AGENT, AGREES))
+    assert (second.call_outcome, second.objections, second.source) == (first.call_outcome, first.objections, 'rules')
+    assert memo.metrics['hits'] == 1
+
+def test_batch_results_keep_input_order():
+    results = asyncio.run(CallAnalyzer("", {}).analyze_conversations([(AGENT, REFUSES), (AGENT, AGREES)]))
+    assert [result.farmer_responses for result in results] == [REFUSES, AGREES]
+    assert [result.call_outcome.value for result in results] == ['failure', 'success']
+
+def test_short_transcripts_are_packed_within_limits():
+    analyzer = CallAnalyzer("", {}, batch_config={'pack_size': 2, 'max_transcript_tokens': 50})
+    pending = [(index, "farmer: haan ji", {}) for index in range(3)] + [(3, "farmer: " + "haan ji " * 100, {})]
+    packs = analyzer._pack_conversations(pending)
+    assert [[index for index, _, _ in pack] for pack in packs] == [[0, 1], [3], [2]]
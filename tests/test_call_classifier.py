@@ -0,0 +1,14 @@
+import json
+
+from src.components.call_classifier import LocalCallClassifier
+
+def test_training_samples_are_llm_labelled_only(tmp_path):
+    for source in ("llm", "local", "rules", None):
+        analysis = {"sentiment": "negative", "interest_level": "low", "call_outcome": "failure",
+                    "objections": [], "farmer_responses": ["nahi chahiye"]}
+        if source:
+            analysis["source"] = source
+        (tmp_path / f"{source}.json").write_text(json.dumps({"analysis": analysis}))
+
+    samples = LocalCallClassifier.load_training_samples([str(tmp_path)])
+    assert [analysis["source"] for _, analysis in samples] == ["llm"]
@@ -0,0 +1,41 @@
+from src.utils.convergence import ConvergenceMonitor, difference_interval
+
+FLAT = [0.6, 0.62, 0.58, 0.61, 0.59]
+
+def monitor(**config):
+    return ConvergenceMonitor({'enabled': True, 'window': 5, 'min_improvement': 0.05, 'patience': 2, **config})
+
+def test_flat_effectiveness_converges_after_patience():
+    learning = monitor()
+    assert not any(learning.observe(score) for score in FLAT * 2)  # First check, streak 1
+    assert learning.streak == 1 and learning.should_learn()
+
+    assert learning.observe(0.6)
+    assert learning.converged_at == 11
+    assert not learning.should_learn()
+    assert learning.get_stats()['learning_steps_skipped'] == 1
+    assert not learning.stop_campaign
+
+def test_improving_effectiveness_keeps_learning():
+    learning = monitor()
+    for score in [0.2, 0.22, 0.18, 0.21, 0.19, 0.5, 0.52, 0.48, 0.51, 0.49, 0.8, 0.82]:
+        learning.observe(score)
+    assert not learning.converged
+    assert learning.last_check['improvement'] > 0.05
+
+def test_stop_campaign_action_and_disabled_monitor():
+    campaign = monitor(action='stop_campaign', patience=1)
+    for score in FLAT * 2:
+        campaign.observe(score)
+    assert campaign.stop_campaign
+
+    disabled = monitor(enabled=False)
+    for score in FLAT * 4:
+        disabled.observe(score)
+    assert not disabled.converged and disabled.metrics['checks'] == 0
+
+def test_difference_interval_brackets_the_mean_difference():
+    difference, low, high = difference_interval([0.2, 0.3, 0.25], [0.5, 0.6, 0.55], 0.9)
+    assert round(difference, 6) == 0.3 and low < difference < high
+    difference, low, high = difference_interval([0.4, 0.4], [0.5, 0.5], 0.9)
+    assert low == difference == high  # No variance, no uncertainty
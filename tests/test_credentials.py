@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from src.utils.credentials import CredentialPool, mask_api_key
+
+class APIError(Exception):
+    def __init__(self, http_status):
+        super().__init__(f"HTTP {http_status}")
+        self.http_status = http_status
+
+def pool(**config):
+    return CredentialPool("openai", ["sk-first-key-0001", "sk-second-key-0002", "", "sk-first-key-0001"], config)
+
+def fail_with(keys, status):
+    with pytest.raises(APIError):
+        with keys.lease():
+            raise APIError(status)
+
+def test_keys_are_deduplicated_and_balanced():
+    keys = pool()
+    assert keys.keys == ["sk-first-key-0001", "sk-second-key-0002"]
+    first, second = keys.acquire(), keys.acquire()
+    assert {first, second} == set(keys.keys)
+    keys.release(first)
+    assert keys.acquire() == first
+
+def test_rate_limited_keys_are_quarantined(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr('src.utils.credentials.time.monotonic', lambda: now)
+    keys = pool(rate_limit_cooldown=30)
+
+    fail_with(keys, 429)  # Least loaded picks the first key
+    assert [keys.acquire() for _ in range(3)] == ["sk-second-key-0002"] * 3
+    stats = keys.get_stats()
+    assert stats['available_keys'] == 1
+    assert stats['keys'][mask_api_key("sk-first-key-0001")]['quarantined']
+
+    now += 31
+    assert keys.get_stats()['available_keys'] == 2
+
+def test_rejected_keys_are_revoked():
+    keys = pool()
+    fail_with(keys, 401)
+    fail_with(keys, 403)
+    assert keys.get_stats()['available_keys'] == 0
+    with pytest.raises(RuntimeError, match="revoked"):
+        keys.acquire()
+
+def test_server_errors_and_cancellations_keep_the_key():
+    keys = pool(strategy="round_robin")
+    fail_with(keys, 500)
+    with pytest.raises(asyncio.CancelledError):
+        with keys.lease():
+            raise asyncio.CancelledError()
+
+    stats = keys.get_stats()
+    assert stats['available_keys'] == 2
+    assert [entry['errors'] for entry in stats['keys'].values()] == [1, 0]
+    assert all(entry['in_flight'] == 0 for entry in stats['keys'].values())
+
+def test_all_quarantined_keys_fall_back_to_the_first_to_recover(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr('src.utils.credentials.time.monotonic', lambda: now)
+    keys = pool(rate_limit_cooldown=30)
+    fail_with(keys, 429)
+    now += 10
+    fail_with(keys, 429)
+    assert keys.acquire() == "sk-first-key-0001"
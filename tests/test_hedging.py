@@ -0,0 +1,68 @@
+import asyncio
+
+from src.utils.hedging import RequestHedger
+
+def hedger(**config):
+    return RequestHedger({'enabled': True, 'min_samples': 5, 'initial_delay': 0.05, 'min_delay': 0.01,
+                          'max_hedge_rate': 1.0, **config})
+
+def responder(*delays):
+    """Request factory whose n-th attempt answers after delays[n]"""
+    attempts = []
+
+    async def request():
+        attempt = len(attempts)
+        attempts.append(attempt)
+        await asyncio.sleep(delays[attempt])
+        return f"reply {attempt}"
+    return request, attempts
+
+def test_threshold_is_the_latency_percentile_above_the_floor():
+    requests = hedger(percentile=0.9)
+    assert requests.get_hedge_delay() == 0.05  # Too few samples
+
+    requests.latencies.extend([0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0])
+    assert requests.get_hedge_delay() == 1.0
+    requests.percentile = 0.5
+    assert requests.get_hedge_delay() == 0.6
+
+    requests.latencies.clear()
+    requests.latencies.extend([0.001] * 10)
+    assert requests.get_hedge_delay() == 0.01
+
+def test_slow_primary_is_hedged_and_its_elapsed_time_recorded():
+    requests = hedger()
+    request, attempts = responder(0.5, 0.0)
+    assert asyncio.run(requests.run(request)) == "reply 1"
+    assert len(attempts) == 2
+    assert requests.metrics['hedges_fired'] == requests.metrics['hedge_wins'] == 1
+
+    # Both the hedge and the cancelled primary are observed, so slow calls keep the threshold up
+    assert len(requests.latencies) == 2
+    assert max(requests.latencies) >= 0.05
+
+def test_fast_primary_is_not_hedged():
+    requests = hedger()
+    request, attempts = responder(0.0)
+    assert asyncio.run(requests.run(request)) == "reply 0"
+    assert len(attempts) == 1 and requests.metrics['hedges_fired'] == 0
+
+def test_hedges_stay_under_the_rate_cap():
+    requests = hedger(max_hedge_rate=0.5)
+
+    async def campaign():
+        for _ in range(4):
+            request, _ = responder(0.08, 0.0)
+            await requests.run(request)
+    asyncio.run(campaign())
+
+    # One hedge per two requests: the 1st and 3rd are capped, the 2nd and 4th hedged
+    assert requests.metrics['hedges_fired'] == 2
+    assert requests.metrics['skipped_by_rate_cap'] == 2
+    assert requests.get_stats()['hedge_rate'] == 0.5
+
+def test_disabled_hedger_runs_the_request_once():
+    requests = RequestHedger()
+    request, attempts = responder(0.06)
+    assert asyncio.run(requests.run(request)) == "reply 0"
+    assert len(attempts) == 1 and len(requests.latencies) == 1
@@ -0,0 +1,47 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.utils.intent_router import IntentRouter
+
+PROMPTS = json.loads((Path(__file__).parent.parent / "config" / "prompts.json").read_text(encoding="utf-8"))
+
+@pytest.fixture
+def router():
+    return IntentRouter.from_prompts(PROMPTS)
+
+@pytest.fixture
+def demo_router():
+    return IntentRouter.from_prompts(PROMPTS, "demo_intent_router")
+
+@pytest.mark.parametrize("reply, turn, intent", [
+    ("Aap kaun ho?", 0, "identity"),
+    ("kya ROI hai", 0, "explain"),
+    ("Kitne paise lagenge?", 0, "cost"),
+    ("Documents kya chahiye?", 0, "explain"),
+    ("eligible hun main?", 0, "eligibility"),
+    ("Abhi busy hun", 0, "busy"),
+    ("lagwana hai", 1, "open_questions"),
+    ("lagwana hai", 3, "wrap_interested"),
+    ("theek hai", 3, "wrap_up"),
+])
+def test_production_routes(router, reply, turn, intent):
+    assert router.route(reply, turn).intent == intent
+
+@pytest.mark.parametrize("reply, intent", [
+    ("ROI kitna hai?", "technical"),
+    ("Apply kaise karein?", "process"),
+    ("Government se ho?", "identity"),
+    ("theek hai", "open_questions"),
+])
+def test_demo_routes(demo_router, reply, intent):
+    assert demo_router.route(reply, 3).intent == intent
+
+def test_replies_render_variables(router):
+    assert "Mera naam Raj hai aur main PM-KUSUM scheme coordinator hun" in router.route("kaun ho", 0).reply
+    assert all("{" not in reply for reply in router.replies().values())
+
+def test_missing_route_config_is_an_error():
+    with pytest.raises(ValueError):
+        IntentRouter.from_prompts({"response_templates": {}})
@@ -0,0 +1,56 @@
+from src.utils.llm_cache import LLMResponseCache
+
+PARAMS = {'temperature': 0.7}
+
+def messages(content):
+    return [{'role': 'user', 'content': content}]
+
+def cache(**config):
+    return LLMResponseCache({'path': ':memory:', **config})
+
+def test_keys_hash_messages_verbatim():
+    key = LLMResponseCache.make_key('gpt-4', messages("Kitne paise lagenge?"), PARAMS)
+    assert key == LLMResponseCache.make_key('gpt-4', messages("Kitne paise lagenge?"), dict(PARAMS))
+    assert key != LLMResponseCache.make_key('gpt-4', messages("kitne  paise lagenge"), PARAMS)
+    assert key != LLMResponseCache.make_key('gpt-4', messages("कितने पैसे लगेंगे?"), PARAMS)
+    assert key != LLMResponseCache.make_key('gpt-4', messages("Kitne paise lagenge?"), {'temperature': 0.2})
+
+def test_hits_report_the_saved_spend():
+    responses = cache()
+    assert responses.get('gpt-4', messages("namaste"), PARAMS) is None
+    responses.put('gpt-4', messages("namaste"), PARAMS, "reply",
+                  usage={'prompt_tokens': 1000, 'completion_tokens': 500, 'total_tokens': 1500})
+    assert responses.get('gpt-4', messages("namaste"), PARAMS, component='farmer_persona') == "reply"
+    stats = responses.get_stats()
+    assert (stats['hits'], stats['misses'], stats['tokens_saved']) == (1, 1, 1500)
+    assert stats['dollars_saved'] == 0.06
+    assert stats['by_component']['farmer_persona'] == {'hits': 1, 'misses': 0}
+
+def test_expired_entries_are_dropped(monkeypatch):
+    responses = cache(ttl_seconds=60)
+    now = 1000.0
+    monkeypatch.setattr('src.utils.llm_cache.time.time', lambda: now)
+    responses.put('gpt-4', messages("namaste"), PARAMS, "reply")
+    now += 59
+    assert responses.get('gpt-4', messages("namaste"), PARAMS) == "reply"
+    now += 2
+    assert responses.get('gpt-4', messages("namaste"), PARAMS) is None
+    assert responses.get_stats()['expired'] == 1
+    assert responses.get_stats()['entries'] == 0
+
+def test_least_recently_used_entries_are_evicted(monkeypatch):
+    responses = cache(max_entries=2)
+    now = 1000.0
+    monkeypatch.setattr('src.utils.llm_cache.time.time', lambda: now)
+    for content in ("first", "second"):
+        now += 1
+        responses.put('gpt-4', messages(content), PARAMS, content)
+    now += 1
+    assert responses.get('gpt-4', messages("first"), PARAMS) == "first"
+    now += 1
+    responses.put('gpt-4', messages("third"), PARAMS, "third")
+
+    assert responses.get('gpt-4', messages("second"), PARAMS) is None
+    assert responses.get('gpt-4', messages("first"), PARAMS) == "first"
+    assert responses.get('gpt-4', messages("third"), PARAMS) == "third"
+    assert responses.get_stats()['evictions'] == 1
@@ -0,0 +1,46 @@
+import pytest
+
+from src.components.turn_analyzer import rule_based_labels
+from src.utils.keyword_matcher import get_keyword_matcher
+from src.utils.normalization import normalize_hindi_text
+
+def categories(text):
+    return set(get_keyword_matcher().scan(text).categories())
+
+def sentiment(text):
+    return rule_based_labels(get_keyword_matcher().scan(text))['sentiment']
+
+@pytest.mark.parametrize("devanagari, romanized", [
+    ("नहीं चाहिए", "nahi chahiye"),
+    ("ज़रूर बताइए", "zaroor batayiye"),
+    ("बाद में कॉल करना", "baad mein call karna"),
+    ("हाँ जी", "haan ji"),
+    ("ठीक है", "theek hai"),
+])
+def test_devanagari_and_romanized_normalize_alike(devanagari, romanized):
+    assert normalize_hindi_text(devanagari) == normalize_hindi_text(romanized)
+
+@pytest.mark.parametrize("text", ["नहीं चाहिए", "nahi chahiye", "बंद करो", "band karo"])
+def test_reject_phrases(text):
+    assert {'negative', 'end.reject', 'outcome.failure'} <= categories(text)
+
+@pytest.mark.parametrize("text", ["ज़रूर बताइए", "zaroor batayiye", "हाँ जी, अच्छा है", "haan ji, achha hai"])
+def test_positive_phrases(text):
+    assert 'positive' in categories(text)
+    assert sentiment(text) == 'positive'
+
+@pytest.mark.parametrize("text", ["pareshan hun", "बहुत परेशान हूँ", "Rajasthan se hun"])
+def test_short_keywords_do_not_match_inside_words(text):
+    # haan folds to han, which must not fire inside pareshan / Rajasthan
+    assert 'positive' not in categories(text)
+
+@pytest.mark.parametrize("text", ["pareshan hun", "बहुत परेशान हूँ"])
+def test_negative_phrases(text):
+    assert sentiment(text) == 'negative'
+
+@pytest.mark.parametrize("text", ["बाद में कॉल करना", "baad mein call karna"])
+def test_call_later_phrases(text):
+    assert {'end.call_later', 'outcome.follow_up'} <= categories(text)
+
+def test_keywords_may_end_inside_a_word():
+    assert get_keyword_matcher().scan("governments ka scheme").keywords('objection.trust_issues') == ['government']
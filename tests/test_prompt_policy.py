@@ -0,0 +1,49 @@
+from src.components.prompt_policy import ContextualPromptPolicy
+from src.models.data_models import (AgentPrompt, CallAnalysis, CallOutcome, InterestLevel,
+                                    SentimentType)
+
+def prompt(version, intro="Namaste ji"):
+    return AgentPrompt(intro=intro, benefits=["90% subsidy"], call_to_action="Register karein?", version=version)
+
+def analysis(effectiveness):
+    return CallAnalysis(
+        sentiment=SentimentType.POSITIVE, interest_level=InterestLevel.HIGH, intro_clarity=True,
+        objections=[], call_outcome=CallOutcome.SUCCESS, farmer_responses=["haan ji"],
+        agent_effectiveness=effectiveness
+    )
+
+def test_seed_versions_are_shared_across_segments():
+    policy = ContextualPromptPolicy(prompt(1), {'prior_arms': 2})
+    first = policy.segment('skeptical')
+    for _ in range(3):
+        first.select()
+        policy.record('skeptical', 1, analysis(0.2))
+    learned = policy.add_variant('skeptical', prompt(1, intro="Namaste kisan bhai"), parent_version=1)
+    for _ in range(3):
+        policy.record('skeptical', learned.version, analysis(0.9))
+
+    # The learned variant now has the best pooled mean, so it seeds the new segment first
+    second = policy.segment('progressive')
+    assert sorted(second.arms) == sorted(policy.pooled) == [1, learned.version]
+    for version, arm in second.arms.items():
+        assert arm.prompt == policy.pooled[version].prompt
+
+    # Results in either segment credit the pooled arm of the same prompt
+    policy.record('progressive', 1, analysis(0.5))
+    assert policy.pooled[1].pulls == 4
+
+    # Learned variants in either segment take fresh versions from the shared counter
+    other = policy.add_variant('progressive', prompt(1, intro="Ram Ram ji"), parent_version=1)
+    assert other.version not in (1, learned.version)
+    assert policy.pooled[other.version].prompt.intro == "Ram Ram ji"
+
+def test_variants_identical_to_a_live_arm_are_skipped():
+    policy = ContextualPromptPolicy(prompt(1))
+    bandit = policy.segment('all')
+    assert policy.add_variant('all', prompt(1), parent_version=1) is None
+    assert sorted(bandit.arms) == sorted(policy.pooled) == [1]
+    assert bandit.metrics['duplicates_skipped'] == 1
+
+    variant = policy.add_variant('all', prompt(1, intro="Namaste kisan bhai"), parent_version=1)
+    assert policy.add_variant('all', prompt(variant.version, intro="Namaste kisan bhai"), parent_version=1) is None
+    assert sorted(bandit.arms) == [1, variant.version]
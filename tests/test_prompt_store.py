@@ -0,0 +1,61 @@
+from src.components.prompt_store import PromptVersionStore, join_intro, split_intro
+from src.models.data_models import AgentPrompt
+
+INTRO = "Namaste ji!  Main Kisan Seva se bol raha hun.\nKya aapke paas do minute hain?  "
+
+def prompt(version, intro=INTRO, benefits=None, improvements=None):
+    return AgentPrompt(intro=intro, benefits=benefits or ["90% subsidy", "Free maintenance"],
+                       call_to_action="Register karein?", version=version, improvements=improvements or [])
+
+def store():
+    return PromptVersionStore({"path": ":memory:"}, run_id="test")
+
+def test_intro_whitespace_survives_the_round_trip():
+    for text in [INTRO, "", "   ", "Ek hi vakya", "  Pehla.\n\nDoosra!  Teesra?"]:
+        assert join_intro(*split_intro(text)) == text
+
+    versions = store()
+    versions.put(prompt(1))
+    stored = versions.get(1)
+    assert (stored.intro, stored.benefits, stored.call_to_action) == (INTRO, ["90% subsidy", "Free maintenance"],
+                                                                      "Register karein?")
+
+def test_get_returns_copies():
+    versions = store()
+    versions.put(prompt(1))
+    versions.get(1).benefits.append("changed")
+    versions.get(1).improvements.append("changed")
+    assert versions.get(1).benefits == ["90% subsidy", "Free maintenance"]
+    assert versions.get(1).improvements == []
+
+def test_versions_keep_their_own_changes_and_the_store_rebuilds_the_history():
+    versions = store()
+    versions.put(prompt(1))
+    versions.put(prompt(2, improvements=["Added trust line"]), parent_version=1)
+    versions.put(prompt(3, improvements=["Shorter intro"]), parent_version=2)
+    assert versions.get(3).improvements == ["Shorter intro"]
+    assert versions.improvements(3) == ["Added trust line", "Shorter intro"]
+
+def test_diff_reports_changed_sentences_benefits_and_improvements():
+    versions = store()
+    versions.put(prompt(1))
+    versions.put(prompt(2, intro="Namaste ji!  Main sarkari yojana se bol raha hun.\nKya aapke paas do minute hain?  ",
+                        benefits=["90% subsidy"], improvements=["Added government authorization"]), parent_version=1)
+    changes = versions.diff(1, 2)
+    assert changes['intro'] == [{'op': 'replace', 'old': ["Main Kisan Seva se bol raha hun."],
+                                 'new': ["Main sarkari yojana se bol raha hun."]}]
+    assert changes['benefits'] == [{'op': 'delete', 'old': ["Free maintenance"], 'new': []}]
+    assert changes['improvements_added'] == ["Added government authorization"]
+    assert 'call_to_action' not in changes
+
+def test_rollback_shares_content_and_extends_the_history():
+    versions = store()
+    versions.put(prompt(1))
+    versions.put(prompt(2, intro="Ram Ram ji.", improvements=["New greeting"]), parent_version=1)
+    rolled_back = versions.rollback(1)
+    assert rolled_back.version == 3 and versions.head == 3
+    assert versions.get(3).intro == INTRO
+    assert versions.diff(1, 3) == {'improvements_added': ["Rolled back to v1 from v2"]}
+    assert versions.improvements(3) == ["Rolled back to v1 from v2"]
+    assert [entry['version'] for entry in versions.lineage(3)] == [1, 3]
+    assert versions.get_stats()['contents'] == 2
@@ -0,0 +1,60 @@
+from src.components.reinforcement_engine import ReinforcementEngine, aggregate_analyses
+from src.models.data_models import (AgentPrompt, CallAnalysis, CallOutcome, InterestLevel,
+                                    SentimentType)
+
+def prompt():
+    return AgentPrompt(intro="Namaste ji", benefits=["90% subsidy"], call_to_action="Register karein?", version=1)
+
+def analysis(objections=(), sentiment=SentimentType.NEUTRAL, effectiveness=0.6):
+    return CallAnalysis(
+        sentiment=sentiment, interest_level=InterestLevel.MEDIUM, intro_clarity=True, objections=list(objections),
+        call_outcome=CallOutcome.FOLLOW_UP, farmer_responses=["theek hai"], agent_effectiveness=effectiveness
+    )
+
+def engine(**learning_config):
+    return ReinforcementEngine("", {}, {}, learning_config=learning_config)
+
+def history(**issue_shares):
+    return {'calls': 100, 'success_rate': 0.2, 'average_effectiveness': 0.5, 'objections': {},
+            'issue_shares': issue_shares}
+
+def test_single_call_issues_are_acted_on_without_history():
+    improved = engine()._rule_based_improvement(prompt(), analysis(['trust_issues']))
+    assert improved.improvements == ["Added government authorization and identity for trust building"]
+
+def test_learning_rate_applies_to_the_blended_weight():
+    # One call against 10 pseudo-calls of history: (1 + 0.0 * 10) / 11 < 0.1
+    rare = engine()
+    rare.warm_start(history(trust_issues=0.0), prior_calls=10)
+    assert rare._rule_based_improvement(prompt(), analysis(['trust_issues'])).improvements == []
+
+    # A recurring issue passes: (1 + 0.2 * 10) / 11 >= 0.1
+    recurring = engine()
+    recurring.warm_start(history(trust_issues=0.2), prior_calls=10)
+    assert len(recurring._rule_based_improvement(prompt(), analysis(['trust_issues'])).improvements) == 1
+
+def test_batch_issues_below_learning_rate_are_ignored():
+    assert engine(learning_rate=0.3)._apply_rules(prompt(), {'trust_issues': 0.2}, 5).improvements == []
+    assert engine(learning_rate=0.2)._apply_rules(prompt(), {'trust_issues': 0.2}, 5).improvements
+
+def test_improvements_are_capped_per_step():
+    issues = {'trust_issues': 1.0, 'negative_sentiment': 1.0, 'process_complexity': 1.0, 'technical_confusion': 1.0}
+    assert len(engine(max_improvements_per_iteration=2)._apply_rules(prompt(), issues).improvements) == 2
+
+def test_aggregate_shares_are_per_call():
+    stats = aggregate_analyses([
+        analysis(['cost_concern', 'cost_concern', 'wants_free'], SentimentType.NEGATIVE, 0.2),
+        analysis(['trust_issues'], SentimentType.POSITIVE, 0.8),
+        analysis([], SentimentType.POSITIVE, 0.5),
+        analysis(['trust_issues', 'cost_concern'], SentimentType.NEUTRAL, 0.5)
+    ])
+    assert stats['calls'] == 4 and stats['success_rate'] == 0.0
+    assert stats['effectiveness'] == {'mean': 0.5, 'min': 0.2, 'max': 0.8}
+    assert stats['sentiment'] == {'positive': 0.5, 'negative': 0.25, 'neutral': 0.25}
+    assert stats['objections'] == {'cost_concern': 0.5, 'trust_issues': 0.5, 'wants_free': 0.25}
+    # wants_free and cost_concern are one issue; one low call does not make a low-effectiveness batch
+    assert stats['issues'] == {'cost_concern': 0.5, 'trust_issues': 0.5, 'negative_sentiment': 0.25}
+
+def test_low_effectiveness_counts_when_the_batch_averages_low():
+    stats = aggregate_analyses([analysis(effectiveness=0.2), analysis(effectiveness=0.5)])
+    assert stats['issues'] == {'low_effectiveness': 0.5}
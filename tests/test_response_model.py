@@ -0,0 +1,28 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Replies for agent messages covering several topics, so the candidate pool mixes topics
+GENERATE = """
+import json
+from src.components.response_model import FarmerResponseModel
+from src.utils.config import ConfigManager
+model = FarmerResponseModel.from_sources(ConfigManager("config").farmer_personas, log_dirs=["logs"], seed=7)
+messages = ["Solar pump ki cost sirf 10,000 hai, government subsidy ke saath", "Process simple hai, documents aur form"]
+print(json.dumps([model.generate(persona, message, turn)
+                  for persona in sorted(model.models) for turn in range(4) for message in messages]))
+"""
+
+def generate_replies(hash_seed: str):
+    env = {**os.environ, "PYTHONHASHSEED": hash_seed}
+    result = subprocess.run([sys.executable, "-c", GENERATE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_seeded_replies_do_not_depend_on_hash_seed():
+    replies = generate_replies("1")
+    assert replies == generate_replies("2") == generate_replies("3")
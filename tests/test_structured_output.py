@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+import pytest
+
+from src.models.data_models import CallAnalysisLabels
+from src.utils.structured_output import StructuredOutputParser, read_completion, repair_json
+
+@pytest.mark.parametrize("truncated, expected", [
+    ('{"a": "x", "b": tr', {'a': "x"}),
+    ('{"a": "x", "b": 0.', {'a': "x"}),
+    ('{"a": 1, "b": -', {'a': 1}),
+    ('{"a": [1, 2, nu', {'a': [1, 2]}),
+    ('{"a": {"b": fals', {'a': {}}),
+    ('{"a": 0.85', {'a': 0.85}),
+    ('{"a": true', {'a': True}),
+    ('{"a": "x\\u09', {'a': "x"}),
+    ('{"a": "x\\\\u09', {'a': "x\\u09"}),
+    ('{"a": "x\\', {'a': "x"}),
+    ('{"a": "x", "ke', {'a': "x"}),
+    ('{"a": "x", "b":', {'a': "x"}),
+    ('{"a": ["x", "y",', {'a': ["x", "y"]}),
+])
+def test_truncated_objects_are_repaired(truncated, expected):
+    assert json.loads(repair_json(truncated)) == expected
+
+def test_complete_objects_are_left_alone():
+    assert repair_json('Sure! {"a": [1, {"b": "}"}]} trailing') == '{"a": [1, {"b": "}"}]}'
+
+def test_parser_repairs_a_reply_cut_inside_a_literal():
+    parser = StructuredOutputParser()
+    labels = parser.parse('{"sentiment": "positive", "interest_level": "high", "intro_clarity": true, '
+                          '"call_outcome": "success", "conversation_flow": {"engaged": tr', CallAnalysisLabels)
+    assert labels.intro_clarity and labels.conversation_flow == {}
+    assert parser.metrics['repaired'] == 1
+
+class Chunk:
+    def __init__(self, content):
+        self.choices = [{'delta': {'content': content}}]
+
+class Stream:
+    """Async chunk stream that records how far it was read and whether it was closed"""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.read = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed or self.read == len(self.pieces):
+            raise StopAsyncIteration
+        self.read += 1
+        return Chunk(self.pieces[self.read - 1])
+
+    async def aclose(self):
+        self.closed = True
+
+def test_streams_stop_at_the_closed_object_and_are_closed():
+    stream = Stream(['{"a": ', '1}', ' and more', ' text'])
+    text, usage = asyncio.run(read_completion(stream, True, count_tokens=len, prompt_tokens=10))
+    assert text == '{"a": 1}'
+    assert stream.read == 2 and stream.closed
+    assert usage == {'prompt_tokens': 10, 'completion_tokens': 8, 'total_tokens': 18}
+
+def test_streams_are_closed_when_reading_fails():
+    class FailingStream(Stream):
+        async def __anext__(self):
+            raise ConnectionError("reset")
+
+    stream = FailingStream([])
+    with pytest.raises(ConnectionError):
+        asyncio.run(read_completion(stream, True))
+    assert stream.closed
@@ -0,0 +1,107 @@
+import asyncio
+import dataclasses
+import json
+from pathlib import Path
+
+import pytest
+
+from src.components.turn_analyzer import IncrementalCallAnalyzer
+from src.components.voice_agent import VoiceAgent, render_opening_message
+from src.models.data_models import AgentPrompt, EducationLevel, FarmerProfile, IncomeLevel
+from src.utils.intent_router import IntentRouter
+
+PROMPTS = json.loads((Path(__file__).parent.parent / "config" / "prompts.json").read_text(encoding="utf-8"))
+
+class RecordingAudio:
+    """Audio processor double that writes placeholder files and counts syntheses"""
+
+    def __init__(self):
+        self.synthesized = []
+
+    async def text_to_speech(self, text, output_path):
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(output_path).write_text(text, encoding="utf-8")
+        self.synthesized.append(text)
+        return True
+
+class ScriptedFarmer:
+    """Farmer persona double replying from a fixed script"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.ended = []
+
+    async def generate_response(self, farmer_profile, agent_message, conversation_context, conversation_id=None):
+        return self.replies[len(conversation_context) // 2]
+
+    def end_conversation(self, conversation_id):
+        self.ended.append(conversation_id)
+
+def prompt(version=1):
+    return AgentPrompt(intro="Namaste ji, main Kisan Seva se bol raha hun.",
+                       benefits=["90% subsidy", "Free maintenance"], call_to_action="Kya aap register karna chahenge?", version=version)
+
+def farmer():
+    return FarmerProfile(id="F001", name="Ramesh", age=45, education=EducationLevel.LOW, income=IncomeLevel.LOW,
+                         location="Nashik", crops=["wheat"], land_size="2 acre", skepticism=0.5,
+                         govt_experience="No earlier scheme", family_size=5)
+
+def agent(replies, termination=None, router=True):
+    return VoiceAgent(RecordingAudio(), ScriptedFarmer(replies), prompt(),
+                      turn_analyzer=IncrementalCallAnalyzer(termination),
+                      intent_router=IntentRouter.from_prompts(PROMPTS) if router else None)
+
+@pytest.fixture(autouse=True)
+def temp_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+def test_opening_segments_point_into_the_message():
+    rendered = render_opening_message(prompt())
+    assert [(name, rendered.text[start:end]) for name, start, end in rendered.segments] == [
+        ("intro", "Namaste ji, main Kisan Seva se bol raha hun."),
+        ("benefit", "90% subsidy"),
+        ("benefit", "Free maintenance"),
+        ("call_to_action", "Kya aap register karna chahenge?")
+    ]
+
+def test_rendering_is_cached_per_prompt_object():
+    voice_agent = agent([])
+    first = voice_agent.render_opening()
+    assert voice_agent.render_opening() is first
+    assert voice_agent.render_opening(dataclasses.replace(prompt(), intro="Ram Ram ji.")).text != first.text
+
+    voice_agent.update_prompt(prompt(version=2))
+    assert voice_agent.render_opening().text == first.text
+    assert voice_agent.render_metrics['renders'] == 3
+
+def test_call_ends_when_the_farmer_agrees():
+    voice_agent = agent(["Kitne paise lagenge?", "Theek hai, lagwana hai"])
+    record = asyncio.run(voice_agent.conduct_call(farmer(), max_turns=5))
+    assert record.end_reason == 'agreed'
+    assert [turn.farmer_response for turn in record.conversation_turns] == voice_agent.farmer_persona.replies
+    assert record.prompt_hash == voice_agent.render_opening().content_hash
+    assert voice_agent.farmer_persona.ended == [record.call_id]
+    assert len(record.audio_files) == 4
+
+def test_repeated_agent_messages_reuse_their_audio():
+    voice_agent = agent(["Hmm"] * 5)
+    record = asyncio.run(voice_agent.conduct_call(farmer(), max_turns=5))
+    agent_messages = [turn.agent_message for turn in record.conversation_turns]
+    assert record.end_reason == 'max_turns' and len(agent_messages) == 5
+    assert voice_agent.render_metrics['audio_reused'] == len(agent_messages) - len(set(agent_messages))
+
+def test_early_termination_is_off_by_default():
+    hopeless = ["Nahi nahi, bekaar hai", "Nahi, bilkul bekaar", "Nahi", "Nahi", "Nahi"]
+    default = asyncio.run(agent(hopeless).conduct_call(farmer(), max_turns=5))
+    assert default.end_reason == 'max_turns'
+
+    voice_agent = agent(hopeless, {'enabled': True})
+    early = asyncio.run(voice_agent.conduct_call(farmer(), max_turns=5))
+    assert early.end_reason == 'hopeless'
+    stats = voice_agent.turn_analyzer.get_stats()
+    assert stats['turns_saved'] == 5 - len(early.conversation_turns) > 0
+    assert 'llm_calls_saved' not in stats
+
+def test_follow_ups_need_an_intent_router():
+    with pytest.raises(ValueError, match="intent router"):
+        asyncio.run(agent(["Hmm", "Hmm"], router=False).conduct_call(farmer(), max_turns=2))